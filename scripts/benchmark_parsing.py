@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the TiddlyWiki table parsers in parse_logs_enhanced.
+
+Times each table parser over every session in an extracted logs directory
+(or over synthetic sessions when no directory is given) and the whole
+per-session parse.
+
+Usage:
+    python scripts/benchmark_parsing.py [extracted_logs/] [--repeat N]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root and src to Python path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'src'))
+
+from gw2_leaderboard.parsers import parse_logs_enhanced as ple
+from gw2_leaderboard.utils import json_io
+
+TABLE_PARSERS = [
+    ('Damage', ple.parse_damage_table),
+    ('Offensive', ple.parse_offensive_table),
+    ('Heal-Stats', ple.parse_heal_table),
+    ('Support', ple.parse_support_table),
+    ('Squad-Generation', ple.parse_boon_generation_table),
+    ('DPS-Stats-Bur-Total', ple.parse_burst_damage_table),
+    ('DPS-Stats-Ch5Ca-Total', ple.parse_burst_consistency_table),
+    ('On-Tag-Review', ple.parse_on_tag_review_table),
+]
+
+
+def load_texts(log_dirs):
+    """Load every table tiddler's text up front so file I/O is not timed."""
+    texts = {name: [] for name, _ in TABLE_PARSERS}
+    for log_dir in log_dirs:
+        for name, _ in TABLE_PARSERS:
+            path = log_dir / f"{log_dir.name}-{name}.json"
+            if path.exists():
+                texts[name].append(json_io.load_file(path).get('text', ''))
+    return texts
+
+
+def time_call(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark TiddlyWiki table parsing')
+    parser.add_argument('logs_dir', nargs='?', help='Extracted logs directory (default: synthetic sessions)')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions per measurement (best is reported)')
+    parser.add_argument('--sessions', type=int, default=20, help='Synthetic sessions to generate')
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.logs_dir:
+        logs_path = Path(args.logs_dir)
+    else:
+        from tests.session_fixtures import write_session, make_players
+        temp_dir = tempfile.TemporaryDirectory()
+        logs_path = Path(temp_dir.name)
+        for i in range(args.sessions):
+            write_session(logs_path, f'2025{i // 28 + 1:02d}{i % 28 + 1:02d}2000', make_players(seed=i, count=50))
+
+    log_dirs = ple.iter_session_dirs(logs_path)
+    texts = load_texts(log_dirs)
+    print(f"Benchmarking {len(log_dirs)} sessions from {logs_path} (best of {args.repeat}, "
+          f"JSON backend: {json_io.backend_name()})")
+
+    tiddler_files = [path for log_dir in log_dirs for path in log_dir.glob('*.json')]
+    elapsed = time_call(lambda: [json_io.load_file(path) for path in tiddler_files], args.repeat)
+    print(f"  {'Tiddler JSON load':<24} {elapsed * 1000:8.2f} ms ({len(tiddler_files)} files)")
+
+    total = 0.0
+    for name, func in TABLE_PARSERS:
+        elapsed = time_call(lambda: [func(text) for text in texts[name]], args.repeat)
+        total += elapsed
+        print(f"  {name:<24} {elapsed * 1000:8.2f} ms")
+    print(f"  {'All tables':<24} {total * 1000:8.2f} ms")
+
+    elapsed = time_call(lambda: [ple.parse_log_directory(d) for d in log_dirs], args.repeat)
+    print(f"  {'parse_log_directory':<24} {elapsed * 1000:8.2f} ms "
+          f"({elapsed * 1000 / max(len(log_dirs), 1):.2f} ms/session)")
+
+    if temp_dir:
+        temp_dir.cleanup()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Migrate extracted_logs to compressed session archives.
+
+Packs the JSON files of every extracted session directory into one
+<timestamp>.tar.gz (see parsers/session_archive.py) and reports disk usage
+and cold-cache parse time before and after. Packed sessions keep their
+content fingerprint, so the next incremental ingest does not re-parse them.
+
+Usage:
+    python scripts/migration/migrate_compress_extracted_logs.py [extracted_logs/] [--report-only] [--unpack]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root and src to Python path
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'src'))
+
+from gw2_leaderboard.parsers.parse_logs_enhanced import iter_session_dirs, parse_log_directory
+from gw2_leaderboard.parsers.session_archive import is_archived, pack_session_dir, unpack_session_dir
+
+
+def disk_usage(log_dirs):
+    """(file count, apparent bytes, allocated bytes) of the sessions' files."""
+    count = apparent = allocated = 0
+    for log_dir in log_dirs:
+        for path in log_dir.iterdir():
+            if path.is_file():
+                stat = path.stat()
+                count += 1
+                apparent += stat.st_size
+                allocated += stat.st_blocks * 512
+    return count, apparent, allocated
+
+
+def evict_from_page_cache(log_dirs) -> bool:
+    """Ask the kernel to drop the sessions' files from the page cache; False where unsupported."""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    for log_dir in log_dirs:
+        for path in log_dir.iterdir():
+            if path.is_file():
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+                finally:
+                    os.close(fd)
+    return True
+
+
+def time_parse(log_dirs) -> float:
+    """Seconds to parse every session, starting from a cold page cache where possible."""
+    evict_from_page_cache(log_dirs)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for log_dir in log_dirs:
+            parse_log_directory(log_dir)
+    return time.perf_counter() - start
+
+
+def report(label: str, log_dirs):
+    count, apparent, allocated = disk_usage(log_dirs)
+    packed = sum(1 for log_dir in log_dirs if is_archived(log_dir))
+    print(f"📊 {label}: {len(log_dirs)} sessions ({packed} packed), {count} files, "
+          f"{apparent / 1024 / 1024:.1f} MB apparent, {allocated / 1024 / 1024:.1f} MB on disk, "
+          f"cold parse {time_parse(log_dirs):.2f}s")
+
+
+def migrate(logs_path: Path, unpack: bool = False) -> int:
+    """Pack (or unpack) every session directory; returns the number changed."""
+    changed = 0
+    for log_dir in iter_session_dirs(logs_path):
+        if unpack:
+            if is_archived(log_dir):
+                unpack_session_dir(log_dir)
+                changed += 1
+            continue
+        result = pack_session_dir(log_dir)
+        if result:
+            files, size_before, archive_size = result
+            print(f"📦 {log_dir.name}: {files} files, {size_before // 1024} KB -> {archive_size // 1024} KB")
+            changed += 1
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack extracted_logs sessions into compressed archives')
+    parser.add_argument('logs_dir', nargs='?', default='extracted_logs', help='Extracted logs directory')
+    parser.add_argument('--report-only', action='store_true', help='Only report disk usage and parse time')
+    parser.add_argument('--unpack', action='store_true', help='Restore loose JSON files from the archives')
+    args = parser.parse_args()
+
+    logs_path = Path(args.logs_dir)
+    if not logs_path.is_dir():
+        print(f"❌ Extracted logs directory not found: {logs_path}")
+        return 1
+
+    log_dirs = iter_session_dirs(logs_path)
+    if not log_dirs:
+        print(f"✅ No sessions in {logs_path}")
+        return 0
+
+    report("Before", log_dirs)
+    if args.report_only:
+        return 0
+
+    try:
+        changed = migrate(logs_path, unpack=args.unpack)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return 1
+
+    print(f"🎉 {'Unpacked' if args.unpack else 'Packed'} {changed} sessions")
+    report("After", log_dirs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,6 +25,10 @@ setup(
         "beautifulsoup4>=4.9.0",
     ],
     extras_require={
+        "fast": [
+            "orjson>=3.6",
+            "numpy>=1.17",
+        ],
         "dev": [
             "pytest>=6.0",
             "black>=21.0",
@@ -7,15 +7,22 @@ Uses session-relative z-scores to handle varying combat contexts (GvG vs keep ta
 import argparse
 import math
 import sqlite3
-import statistics
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
-from gw2_leaderboard.core.rating_history import (
-    create_rating_history_table, save_rating_to_history)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
+from gw2_leaderboard.core.rating_history import create_rating_history_table
+from gw2_leaderboard.core.rating_store import RatingStore
+
+# Rated sessions between rating checkpoints (see rebuild_ratings_from)
+CHECKPOINT_INTERVAL = 25
 
 
 @dataclass
@@ -128,6 +135,41 @@ class GlickoSystem:
         new_rd = self.rd_from_phi(new_phi)
         
         return new_rating, new_rd, new_volatility
+    
+    def update_ratings_batch(self, ratings: Sequence[float], rds: Sequence[float], volatilities: Sequence[float],
+                             z_scores: Sequence[float]) -> Tuple[List[float], List[float], List[float]]:
+        """
+        Update the ratings of a whole session's players at once, one z-score each.
+        
+        Gives what update_rating(rating, rd, volatility, [z_score]) gives for
+        each player, to floating-point tolerance. With NumPy installed the
+        session is computed as arrays; the opponent terms are the same for
+        every player and are computed once.
+        """
+        if not NUMPY_AVAILABLE:
+            results = [self.update_rating(rating, rd, volatility, [z_score])
+                       for rating, rd, volatility, z_score in zip(ratings, rds, volatilities, z_scores)]
+            return [r[0] for r in results], [r[1] for r in results], [r[2] for r in results]
+        
+        mu = (np.asarray(ratings, dtype=float) - 1500) / 173.7178
+        phi = np.asarray(rds, dtype=float) / 173.7178
+        volatility = np.asarray(volatilities, dtype=float)
+        outcome = 1.0 / (1.0 + np.exp(-np.asarray(z_scores, dtype=float) * 1.5))
+        
+        # Session average as opponent (rating=1500, rd=150), as in update_rating
+        opponent_mu = self.mu(1500)
+        g_val = self.g(self.phi(150))
+        E_val = 1 / (1 + np.exp(-g_val * (mu - opponent_mu)))
+        
+        with np.errstate(divide='ignore'):
+            v = 1 / (g_val * g_val * E_val * (1 - E_val))
+        delta = v * (g_val * (outcome - E_val))
+        
+        phi_star = np.sqrt(phi * phi + volatility * volatility)
+        new_phi = 1 / np.sqrt(1 / (phi_star * phi_star) + 1 / v)
+        new_mu = mu + new_phi * new_phi * (delta / v)
+        
+        return (new_mu * 173.7178 + 1500).tolist(), (new_phi * 173.7178).tolist(), volatility.tolist()
 
 
 # Define metric categories and their database column names
@@ -233,91 +275,51 @@ def build_date_filter_clause(date_filter: str = None) -> Tuple[str, List]:
     return "AND parsed_date >= ?", [cutoff_date.isoformat()]
 
 
-def calculate_session_stats(db_path: str, timestamp: str, metric_category: str, guild_filter: bool = False) -> Tuple[float, float, List[Dict]]:
-    """Calculate session mean, std dev, and player data with rankings for a metric."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    metric_column = METRIC_CATEGORIES[metric_category]
-    
-    # Determine sort order based on metric type
-    sort_order = "ASC" if metric_category in ['Distance to Tag'] else "DESC"
-    
-    # Get values for dynamic floor calculation. For Distance to Tag, include 0 values (tag driver)
-    value_filter = ">= 0" if metric_category == 'Distance to Tag' else "> 0"
-    
-    if guild_filter:
-        initial_query = f'''
-            SELECT p.{metric_column}
-            FROM player_performances p
-            INNER JOIN guild_members g ON p.account_name = g.account_name
-            WHERE p.timestamp = ? AND p.{metric_column} {value_filter}
-            ORDER BY p.{metric_column} {sort_order}
-        '''
-    else:
-        initial_query = f'''
-            SELECT {metric_column}
-            FROM player_performances 
-            WHERE timestamp = ? AND {metric_column} {value_filter}
-            ORDER BY {metric_column} {sort_order}
-        '''
-    
-    cursor.execute(initial_query, (timestamp,))
-    all_values = [row[0] for row in cursor.fetchall()]
-    
-    # Calculate dynamic floor for support metrics (non-DPS)
-    dynamic_floor = 0
-    support_metrics = ['Healing', 'Barrier', 'Cleanses', 'Strips', 'Stability', 'Resistance', 'Might', 'Protection']
-    
+# Metrics whose dynamic floor drops players who barely contributed
+SUPPORT_METRICS = ['Healing', 'Barrier', 'Cleanses', 'Strips', 'Stability', 'Resistance', 'Might', 'Protection']
+
+# Metrics where lower values are better
+LOWER_IS_BETTER_METRICS = ['Distance to Tag']
+
+# (mean, std dev, ranked players) for one metric of one session
+SessionStats = Tuple[float, float, List[Dict]]
+
+
+def _dynamic_floor(metric_category: str, values: List[float]) -> float:
+    """Value a player has to beat to be scored for a metric; values are the session's values above 0."""
     # For Distance to Tag, don't apply dynamic floor filtering - include all values including 0 (tag driver)
-    if metric_category == 'Distance to Tag':
-        dynamic_floor = 0  # Include tag drivers with 0 distance
-    elif metric_category in support_metrics and len(all_values) >= 4:
-        # Use 25th percentile as dynamic floor to exclude low outliers
-        # This ensures we only include players who are meaningfully contributing to this metric
-        all_values_sorted = sorted(all_values)
-        percentile_25_index = max(0, int(len(all_values_sorted) * 0.25) - 1)
-        dynamic_floor = all_values_sorted[percentile_25_index]
-        
-        # Fallback: if 25th percentile is still very low, use median for stricter filtering
-        if dynamic_floor < (statistics.mean(all_values_sorted) * 0.1):  # Less than 10% of mean
-            median_index = len(all_values_sorted) // 2
-            dynamic_floor = all_values_sorted[median_index]
-    
-    # Now get filtered results using the dynamic floor
-    # Use appropriate comparison operator based on metric type
-    comparison_op = ">=" if metric_category == 'Distance to Tag' else ">"
-    
-    if guild_filter:
-        query = f'''
-            SELECT p.account_name, p.profession, p.{metric_column}
-            FROM player_performances p
-            INNER JOIN guild_members g ON p.account_name = g.account_name
-            WHERE p.timestamp = ? AND p.{metric_column} {comparison_op} ?
-            ORDER BY p.{metric_column} {sort_order}
-        '''
+    if metric_category not in SUPPORT_METRICS or len(values) < 4:
+        return 0
+    
+    # Use 25th percentile as dynamic floor to exclude low outliers
+    # This ensures we only include players who are meaningfully contributing to this metric
+    values_sorted = sorted(values)
+    percentile_25_index = max(0, int(len(values_sorted) * 0.25) - 1)
+    dynamic_floor = values_sorted[percentile_25_index]
+    
+    # Fallback: if 25th percentile is still very low, use median for stricter filtering
+    if dynamic_floor < (math.fsum(values_sorted) / len(values_sorted) * 0.1):  # Less than 10% of mean
+        dynamic_floor = values_sorted[len(values_sorted) // 2]
+    return dynamic_floor
+
+
+def _rank_session_metric(metric_category: str, rows: List[Tuple[str, str, float]], dynamic_floor: float) -> SessionStats:
+    """Rank (account, profession, value) rows above the floor and z-score them."""
+    lower_is_better = metric_category in LOWER_IS_BETTER_METRICS
+    if lower_is_better:
+        results = [row for row in rows if row[2] >= dynamic_floor]
     else:
-        query = f'''
-            SELECT account_name, profession, {metric_column}
-            FROM player_performances 
-            WHERE timestamp = ? AND {metric_column} {comparison_op} ?
-            ORDER BY {metric_column} {sort_order}
-        '''
-    
-    cursor.execute(query, (timestamp, dynamic_floor))
-    results = cursor.fetchall()
-    conn.close()
+        results = [row for row in rows if row[2] > dynamic_floor]
+    # Stable, so tied players keep their storage order
+    results.sort(key=lambda row: row[2], reverse=not lower_is_better)
     
     # Ensure we have minimum participants for meaningful z-scores
     if len(results) < 2:
-        # If dynamic floor filtered too aggressively, fall back to simple > 0 filter
-        if dynamic_floor > 0:
-            return calculate_session_stats_fallback(db_path, timestamp, metric_category, guild_filter)
         return 0.0, 1.0, []  # Not enough data
     
     values = [row[2] for row in results]
-    mean_val = statistics.mean(values)
-    std_val = statistics.stdev(values) if len(values) > 1 else 1.0
+    mean_val = math.fsum(values) / len(values)
+    std_val = math.sqrt(math.fsum((value - mean_val) ** 2 for value in values) / (len(values) - 1))
     
     # Avoid division by zero
     if std_val == 0:
@@ -330,7 +332,7 @@ def calculate_session_stats(db_path: str, timestamp: str, metric_category: str,
         z_score = (metric_value - mean_val) / std_val
         
         # For metrics where lower values are better, invert the z-score
-        if metric_category in ['Distance to Tag']:
+        if lower_is_better:
             z_score = -z_score
         
         # Calculate normalized rank as percentile (0-100)
@@ -349,70 +351,187 @@ def calculate_session_stats(db_path: str, timestamp: str, metric_category: str,
     return mean_val, std_val, players
 
 
-def calculate_session_stats_fallback(db_path: str, timestamp: str, metric_category: str, guild_filter: bool = False) -> Tuple[float, float, List[Dict]]:
-    """Fallback function using simple > 0 filter when dynamic floor is too aggressive."""
+def _session_rows(db_path: str, timestamp: str, metric_categories: List[str], guild_filter: bool = False) -> List[Tuple]:
+    """(account, profession, metric values...) for every player of a session, in storage order."""
+    columns = ', '.join(f'p.{METRIC_CATEGORIES[metric_category]}' for metric_category in metric_categories)
+    guild_join = 'INNER JOIN guild_members g ON p.account_name = g.account_name' if guild_filter else ''
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    metric_column = METRIC_CATEGORIES[metric_category]
-    
-    # Determine sort order and filter based on metric type
-    sort_order = "ASC" if metric_category in ['Distance to Tag'] else "DESC"
-    value_filter = ">= 0" if metric_category == 'Distance to Tag' else "> 0"
-    
-    if guild_filter:
-        query = f'''
-            SELECT p.account_name, p.profession, p.{metric_column}
+    try:
+        cursor = conn.execute(f'''
+            SELECT p.account_name, p.profession, {columns}
             FROM player_performances p
-            INNER JOIN guild_members g ON p.account_name = g.account_name
-            WHERE p.timestamp = ? AND p.{metric_column} {value_filter}
-            ORDER BY p.{metric_column} {sort_order}
-        '''
-    else:
-        query = f'''
-            SELECT account_name, profession, {metric_column}
-            FROM player_performances 
-            WHERE timestamp = ? AND {metric_column} {value_filter}
-            ORDER BY {metric_column} {sort_order}
-        '''
+            {guild_join}
+            WHERE p.timestamp = ?
+            ORDER BY p.id
+        ''', (timestamp,))
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def score_session(db_path: str, timestamp: str, guild_filter: bool = False,
+                  metric_categories: Optional[List[str]] = None) -> Dict[str, SessionStats]:
+    """
+    Session statistics for every metric from one read of the session's rows.
     
-    cursor.execute(query, (timestamp,))
-    results = cursor.fetchall()
-    conn.close()
+    Returns {metric category: (mean, std dev, players)} for
+    metric_categories (default: all of METRIC_CATEGORIES), where players
+    are ranked best first with their z-scores, as calculate_session_stats.
     
-    if len(results) < 2:
-        return 0.0, 1.0, []  # Not enough data
-    
-    values = [row[2] for row in results]
-    mean_val = statistics.mean(values)
-    std_val = statistics.stdev(values) if len(values) > 1 else 1.0
+    For each metric, players with a value above 0 are scored (0 counts for
+    Distance to Tag: the tag driver). Support metrics with at least 4 such
+    players first drop everyone at or below the 25th percentile, or the
+    median when the 25th percentile is under 10% of the mean; if that
+    leaves fewer than 2 players the floor is not applied.
+    """
+    metric_categories = list(metric_categories or METRIC_CATEGORIES)
+    rows = _session_rows(db_path, timestamp, metric_categories, guild_filter)
     
-    if std_val == 0:
-        std_val = 1.0
+    stats = {}
+    for index, metric_category in enumerate(metric_categories, start=2):
+        if metric_category in LOWER_IS_BETTER_METRICS:
+            scored = [(row[0], row[1], row[index]) for row in rows if row[index] is not None and row[index] >= 0]
+        else:
+            scored = [(row[0], row[1], row[index]) for row in rows if row[index] is not None and row[index] > 0]
+        
+        dynamic_floor = _dynamic_floor(metric_category, [row[2] for row in scored])
+        metric_stats = _rank_session_metric(metric_category, scored, dynamic_floor)
+        if not metric_stats[2] and dynamic_floor > 0:
+            # If dynamic floor filtered too aggressively, fall back to simple > 0 filter
+            metric_stats = _rank_session_metric(metric_category, scored, 0)
+        stats[metric_category] = metric_stats
+    return stats
+
+
+def calculate_session_stats(db_path: str, timestamp: str, metric_category: str, guild_filter: bool = False) -> SessionStats:
+    """Calculate session mean, std dev, and player data with rankings for a metric."""
+    return score_session(db_path, timestamp, guild_filter, [metric_category])[metric_category]
+
+
+def calculate_session_stats_fallback(db_path: str, timestamp: str, metric_category: str, guild_filter: bool = False) -> SessionStats:
+    """Session stats using simple > 0 filter, without the dynamic floor."""
+    rows = _session_rows(db_path, timestamp, [metric_category], guild_filter)
+    if metric_category in LOWER_IS_BETTER_METRICS:
+        scored = [row for row in rows if row[2] is not None and row[2] >= 0]
+    else:
+        scored = [row for row in rows if row[2] is not None and row[2] > 0]
+    return _rank_session_metric(metric_category, scored, 0)
+
+
+# Session scores as score_session computes them (without the guild filter),
+# stored at ingest so rating replays read outcomes instead of re-deriving
+# them. A session's rows are deleted whenever its performances change.
+SESSION_SCORES_SCHEMA = [
+    '''
+        CREATE TABLE IF NOT EXISTS session_metric_scores (
+            timestamp TEXT NOT NULL,
+            metric_category TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            account_name TEXT NOT NULL,
+            profession TEXT NOT NULL,
+            metric_value REAL NOT NULL,
+            total_players INTEGER NOT NULL,
+            percentile REAL NOT NULL,
+            z_score REAL NOT NULL,
+            PRIMARY KEY (timestamp, metric_category, rank)
+        ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_session_metric_scores_player '
+    'ON session_metric_scores(account_name, profession, metric_category)',
+]
+
+
+def store_session_scores(db_path: str, timestamps: Iterable[str]) -> int:
+    """Score sessions with score_session and store the results, replacing any stored ones; returns rows written."""
+    rows = []
+    timestamps = list(timestamps)
+    for timestamp in timestamps:
+        for metric_category, (_, _, players) in score_session(db_path, timestamp).items():
+            rows.extend((timestamp, metric_category, player['rank'], player['account_name'], player['profession'],
+                         player['metric_value'], player['total_players'], player['normalized_rank'],
+                         player['z_score'])
+                        for player in players)
     
-    total_players = len(results)
-    players = []
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            for statement in SESSION_SCORES_SCHEMA:
+                conn.execute(statement)
+            conn.executemany('DELETE FROM session_metric_scores WHERE timestamp = ?',
+                             [(timestamp,) for timestamp in timestamps])
+            conn.executemany('INSERT INTO session_metric_scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def fill_session_scores(db_path: str, timestamps: Iterable[str]) -> int:
+    """Store scores for those of timestamps that have none stored, in one transaction; returns rows written."""
+    timestamps = list(timestamps)
+    conn = sqlite3.connect(db_path)
+    try:
+        stored = {row[0] for row in conn.execute('SELECT DISTINCT timestamp FROM session_metric_scores')}
+    except sqlite3.OperationalError:
+        stored = set()
+    finally:
+        conn.close()
+    missing = [timestamp for timestamp in timestamps if timestamp not in stored]
+    return store_session_scores(db_path, missing) if missing else 0
+
+
+def load_session_scores(db_path: str, timestamp: str) -> Optional[Dict[str, List[Dict]]]:
+    """
+    Stored scores of a session: {metric category: players, best first}, as
+    in score_session's results. None when the session has none stored
+    (never scored, or changed since).
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute('''
+            SELECT metric_category, rank, account_name, profession, metric_value, total_players, percentile, z_score
+            FROM session_metric_scores
+            WHERE timestamp = ?
+            ORDER BY metric_category, rank
+        ''', (timestamp,))
+        rows = cursor.fetchall()
+    except sqlite3.OperationalError:
+        # Database from before session scores were stored
+        return None
+    finally:
+        conn.close()
+    if not rows:
+        return None
     
-    for rank, (account_name, profession, metric_value) in enumerate(results, 1):
-        z_score = (metric_value - mean_val) / std_val
-        
-        # For metrics where lower values are better, invert the z-score
-        if metric_category in ['Distance to Tag']:
-            z_score = -z_score
-        
-        normalized_rank = (rank / total_players) * 100
-        
-        players.append({
+    scores: Dict[str, List[Dict]] = {}
+    for metric_category, rank, account_name, profession, metric_value, total_players, percentile, z_score in rows:
+        scores.setdefault(metric_category, []).append({
             'account_name': account_name,
             'profession': profession,
             'metric_value': metric_value,
             'z_score': z_score,
             'rank': rank,
             'total_players': total_players,
-            'normalized_rank': normalized_rank
+            'normalized_rank': percentile
         })
+    return scores
+
+
+def session_outcomes(db_path: str, timestamp: str, guild_filter: bool = False) -> Dict[str, List[Dict]]:
+    """
+    {metric category: ranked players with z-scores} for rating a session.
     
-    return mean_val, std_val, players
+    Read from session_metric_scores, scoring and storing the session first
+    if it has nothing stored. Guild-filtered scores depend on the current
+    guild roster and are always computed.
+    """
+    if guild_filter:
+        return {metric_category: players
+                for metric_category, (_, _, players) in score_session(db_path, timestamp, True).items()}
+    scores = load_session_scores(db_path, timestamp)
+    if scores is None:
+        store_session_scores(db_path, [timestamp])
+        scores = load_session_scores(db_path, timestamp) or {}
+    return scores
 
 
 def get_current_glicko_rating(db_path: str, account_name: str, profession: str, metric_category: str) -> Tuple[float, float, float, int, float, float]:
@@ -476,8 +595,9 @@ def calculate_profession_session_performance(db_path: str, timestamp: str, profe
     
     # Calculate session performance for each metric
     metric_session_data = {}
+    session_stats = score_session(db_path, timestamp, guild_filter, metrics)
     for metric in metrics:
-        mean_val, std_val, session_players = calculate_session_stats(db_path, timestamp, metric, guild_filter)
+        mean_val, std_val, session_players = session_stats[metric]
         if session_players:
             # Filter to only players of this profession
             prof_players = [p for p in session_players if p['account_name'] in players]
@@ -709,6 +829,29 @@ def create_glicko_database(db_path: str):
     conn.close()
 
 
+def _apply_session_metric(store: RatingStore, glicko: GlickoSystem, timestamp: str, metric_category: str,
+                          players: List[Dict], history_mode: bool = False):
+    """Apply one metric's session results to the players' ratings in the store."""
+    keys = [(player['account_name'], player['profession'], metric_category) for player in players]
+    
+    # Get current rating and stat tracking
+    current = [store.get(key) for key in keys]
+    
+    # Update every player's rating from their z-score in one batch
+    new_ratings, new_rds, new_volatilities = glicko.update_ratings_batch(
+        [c[0] for c in current], [c[1] for c in current], [c[2] for c in current],
+        [player['z_score'] for player in players])
+    
+    for key, player, (_, _, _, games, total_rank_sum, total_stat_value), new_rating, new_rd, new_volatility in zip(
+            keys, players, current, new_ratings, new_rds, new_volatilities):
+        # Update rank and stat tracking; averages are derived when the store is flushed
+        store.set(key, new_rating, new_rd, new_volatility, games + 1,
+                  total_rank_sum + player['rank'], total_stat_value + player['metric_value'])
+        
+        if history_mode:
+            store.record_history(key, timestamp, new_rating, new_rd, new_volatility)
+
+
 def _process_metric_for_session(db_path: str, timestamp: str, metric_category: str, guild_filter: bool = False):
     """Process a single metric category for a session."""
     import threading
@@ -721,86 +864,33 @@ def _process_metric_for_session(db_path: str, timestamp: str, metric_category: s
     if len(players) < 2:
         return f"[{thread_name}] {metric_category}: skipped (insufficient players)"
     
-    # Update each player's rating
-    for player in players:
-        account_name = player['account_name']
-        profession = player['profession']
-        z_score = player['z_score']
-        normalized_rank = player['normalized_rank']
-        rank = player['rank']
-        metric_value = player['metric_value']
-        
-        # Get current rating and stat tracking
-        rating, rd, volatility, games, total_rank_sum, total_stat_value = get_current_glicko_rating(
-            db_path, account_name, profession, metric_category)
-        
-        # Update rating based on this z-score
-        new_rating, new_rd, new_volatility = glicko.update_rating(
-            rating, rd, volatility, [z_score])
-        
-        # Update rank tracking
-        new_total_rank_sum = total_rank_sum + rank
-        new_games = games + 1
-        new_average_rank = new_total_rank_sum / new_games
-        
-        # Update stat tracking
-        new_total_stat_value = total_stat_value + metric_value
-        new_average_stat_value = new_total_stat_value / new_games
-        
-        # Store updated rating, rank, and stat data
-        update_glicko_rating(db_path, account_name, profession, metric_category,
-                           new_rating, new_rd, new_volatility, new_games, 
-                           new_total_rank_sum, new_average_rank, new_total_stat_value, new_average_stat_value)
+    with RatingStore(db_path) as store:
+        _apply_session_metric(store, glicko, timestamp, metric_category, players)
     
     return f"[{thread_name}] {metric_category}: processed {len(players)} players"
 
 
-def calculate_glicko_ratings_for_session(db_path: str, timestamp: str, guild_filter: bool = False, history_mode: bool = False):
-    """Calculate Glicko rating changes for all players in a session."""
-    # Due to SQLite write locking, process metrics sequentially but optimize individual operations
-    glicko = GlickoSystem()
+def calculate_glicko_ratings_for_session(db_path: str, timestamp: str, guild_filter: bool = False, history_mode: bool = False,
+                                         store: Optional[RatingStore] = None):
+    """
+    Calculate Glicko rating changes for all players in a session.
     
-    for metric_category in METRIC_CATEGORIES.keys():
-        # Get session statistics and z-scores
-        mean_val, std_val, players = calculate_session_stats(db_path, timestamp, metric_category, guild_filter)
-        
+    Updates go to store when one is given (the caller flushes it, typically
+    once per run); otherwise a store is loaded for this session and flushed
+    in one transaction at the end.
+    """
+    if store is None:
+        with RatingStore(db_path) as session_store:
+            calculate_glicko_ratings_for_session(db_path, timestamp, guild_filter, history_mode, session_store)
+        return
+    
+    glicko = GlickoSystem()
+    # Ranked players and z-scores for every metric
+    for metric_category, players in session_outcomes(db_path, timestamp, guild_filter).items():
         if len(players) < 2:
             continue
         
-        # Update each player's rating
-        for player in players:
-            account_name = player['account_name']
-            profession = player['profession']
-            z_score = player['z_score']
-            normalized_rank = player['normalized_rank']
-            rank = player['rank']
-            metric_value = player['metric_value']
-            
-            # Get current rating and stat tracking
-            rating, rd, volatility, games, total_rank_sum, total_stat_value = get_current_glicko_rating(
-                db_path, account_name, profession, metric_category)
-            
-            # Update rating based on this z-score
-            new_rating, new_rd, new_volatility = glicko.update_rating(
-                rating, rd, volatility, [z_score])
-            
-            # Update rank tracking
-            new_total_rank_sum = total_rank_sum + rank
-            new_games = games + 1
-            new_average_rank = new_total_rank_sum / new_games
-            
-            # Update stat tracking
-            new_total_stat_value = total_stat_value + metric_value
-            new_average_stat_value = new_total_stat_value / new_games
-            
-            # Store updated rating, rank, and stat data
-            update_glicko_rating(db_path, account_name, profession, metric_category,
-                               new_rating, new_rd, new_volatility, new_games, 
-                               new_total_rank_sum, new_average_rank, new_total_stat_value, new_average_stat_value)
-
-            if history_mode:
-                save_rating_to_history(db_path, account_name, profession, metric_category, timestamp, new_rating, new_rd, new_volatility)
-
+        _apply_session_metric(store, glicko, timestamp, metric_category, players, history_mode)
 
 
 def get_most_recent_session_timestamp(db_path: str) -> str:
@@ -899,7 +989,25 @@ def calculate_rating_deltas_dual_glicko(db_path: str, metric_category: str = Non
             pass
 
 
-def update_ratings_incrementally(db_path: str, guild_filter: bool = False, progress_callback=None):
+def _rate_sessions(db_path: str, store: RatingStore, timestamps: List[str], guild_filter: bool = False,
+                   progress_callback=None, checkpoint_interval: int = CHECKPOINT_INTERVAL):
+    """Rate sessions in order into store, with a checkpoint every checkpoint_interval rated sessions (0: none)."""
+    if not guild_filter:
+        fill_session_scores(db_path, timestamps)
+    since_checkpoint = store.sessions_since_checkpoint()
+    total_sessions = len(timestamps)
+    for i, timestamp in enumerate(timestamps):
+        if progress_callback:
+            progress_callback(i + 1, total_sessions, timestamp)
+        calculate_glicko_ratings_for_session(db_path, timestamp, guild_filter, history_mode=True, store=store)
+        since_checkpoint += 1
+        if checkpoint_interval and since_checkpoint >= checkpoint_interval:
+            store.checkpoint(timestamp)
+            since_checkpoint = 0
+
+
+def update_ratings_incrementally(db_path: str, guild_filter: bool = False, progress_callback=None,
+                                 checkpoint_interval: int = CHECKPOINT_INTERVAL):
     """Incrementally updates Glicko ratings for unprocessed sessions."""
     create_rating_history_table(db_path)
     last_processed_timestamp = get_last_processed_timestamp(db_path)
@@ -910,22 +1018,67 @@ def update_ratings_incrementally(db_path: str, guild_filter: bool = False, progr
             print("No new sessions to process.")
         return
 
-    total_sessions = len(unprocessed_sessions)
-    for i, timestamp in enumerate(unprocessed_sessions):
-        if progress_callback:
-            progress_callback(i + 1, total_sessions, timestamp)
-        calculate_glicko_ratings_for_session(db_path, timestamp, guild_filter, history_mode=True)
+    # One load and one write for the whole run; an interrupted run writes
+    # nothing, so the history still marks where the next run resumes
+    with RatingStore(db_path) as store:
+        _rate_sessions(db_path, store, unprocessed_sessions, guild_filter, progress_callback, checkpoint_interval)
 
-def rebuild_rating_history(db_path: str, guild_filter: bool = False, progress_callback=None):
+def rebuild_rating_history(db_path: str, guild_filter: bool = False, progress_callback=None,
+                           checkpoint_interval: int = CHECKPOINT_INTERVAL):
     """Recalculates all Glicko ratings and rebuilds the history table."""
     print("Rebuilding rating history...")
     with sqlite3.connect(db_path) as conn:
         cursor = conn.cursor()
         cursor.execute("DROP TABLE IF EXISTS player_rating_history")
+        cursor.execute("DROP TABLE IF EXISTS rating_checkpoints")
     create_glicko_database(db_path)
-    update_ratings_incrementally(db_path, guild_filter, progress_callback)
+    update_ratings_incrementally(db_path, guild_filter, progress_callback, checkpoint_interval)
 
 
+def rebuild_ratings_from(db_path: str, timestamp: str, guild_filter: bool = False, progress_callback=None,
+                         checkpoint_interval: int = CHECKPOINT_INTERVAL) -> Optional[str]:
+    """
+    Re-rate every session from timestamp onward, e.g. after that session was
+    re-parsed or classification rules changed from that date.
+    
+    Ratings resume from the latest checkpoint before timestamp, or from the
+    first session if there is none. Returns the checkpoint resumed from
+    (None for a full replay). Like a rebuild, an interrupted run writes
+    nothing.
+    """
+    initialize_database_schema(db_path)
+    with RatingStore(db_path) as store:
+        resumed_from = store.rewind(timestamp)
+        sessions = get_unprocessed_sessions(db_path, resumed_from)
+        _rate_sessions(db_path, store, sessions, guild_filter, progress_callback, checkpoint_interval)
+    return resumed_from
+
+
+def update_ratings_for_sessions(db_path: str, timestamps: List[str], guild_filter: bool = False,
+                                progress_callback=None) -> str:
+    """
+    Bring ratings up to date after the given sessions were (re)ingested.
+
+    Ratings are applied in timestamp order, so sessions newer than anything
+    rated so far are added incrementally. A session at or before the last
+    rated one (a backfilled or re-parsed log) changes every later update, so
+    ratings are re-rated from the latest checkpoint before it ("resume"), or
+    rebuilt if there is none. Returns "incremental", "resume" or "rebuild".
+    """
+    initialize_database_schema(db_path)
+    last_processed_timestamp = get_last_processed_timestamp(db_path)
+
+    if last_processed_timestamp is None:
+        rebuild_rating_history(db_path, guild_filter, progress_callback)
+        return "rebuild"
+
+    if timestamps and min(timestamps) <= last_processed_timestamp:
+        resumed_from = rebuild_ratings_from(db_path, min(timestamps), guild_filter, progress_callback)
+        return "rebuild" if resumed_from is None else "resume"
+
+    update_ratings_incrementally(db_path, guild_filter, progress_callback)
+    return "incremental"
+
 
 def calculate_date_filtered_ratings(db_path: str, date_filter: str, guild_filter: bool = False, progress_callback=None) -> str:
     """
@@ -979,11 +1132,13 @@ def calculate_date_filtered_ratings(db_path: str, date_filter: str, guild_filter
     # Recalculate ratings using only filtered sessions
     create_glicko_database(temp_db_path)
     
-    glicko = GlickoSystem()
-    for i, timestamp in enumerate(filtered_timestamps):
-        if progress_callback:
-            progress_callback(i + 1, total_sessions, timestamp)
-        calculate_glicko_ratings_for_session(temp_db_path, timestamp, guild_filter)
+    if not guild_filter:
+        fill_session_scores(temp_db_path, filtered_timestamps)
+    with RatingStore(temp_db_path) as store:
+        for i, timestamp in enumerate(filtered_timestamps):
+            if progress_callback:
+                progress_callback(i + 1, total_sessions, timestamp)
+            calculate_glicko_ratings_for_session(temp_db_path, timestamp, guild_filter, store=store)
     
     return temp_db_path
 
@@ -1219,6 +1374,8 @@ def initialize_database_schema(db_path: str):
                 UNIQUE(account_name, profession, metric_category)
             )
         ''')
+        for statement in SESSION_SCORES_SCHEMA:
+            cursor.execute(statement)
         # History table (managed by rating_history.py but good to ensure it's here)
         create_rating_history_table(db_path)
     conn.close()
@@ -1229,6 +1386,10 @@ def main():
     parser.add_argument('--recalculate', action='store_true', help='Recalculate all Glicko ratings')
     parser.add_argument('--rebuild-history', action='store_true', help='Rebuild the entire rating history from scratch')
     parser.add_argument('--incremental', action='store_true', help='Incrementally update ratings for new sessions')
+    parser.add_argument('--rebuild-from', metavar='TIMESTAMP',
+                        help='Re-rate sessions from TIMESTAMP (YYYYMMDDHHMM) onward, resuming from the nearest checkpoint')
+    parser.add_argument('--checkpoint-interval', type=int, default=CHECKPOINT_INTERVAL,
+                        help=f'Rated sessions between rating checkpoints, 0 for none (default: {CHECKPOINT_INTERVAL})')
     parser.add_argument('--leaderboard', help='Show Glicko leaderboard for specific category')
     parser.add_argument('--all-leaderboards', action='store_true', help='Show leaderboards for all categories')
     parser.add_argument('--player', help='Show Glicko profile for specific player')
@@ -1247,11 +1408,17 @@ def main():
     initialize_database_schema(args.database)
     
     if args.rebuild_history:
-        rebuild_rating_history(args.database)
+        rebuild_rating_history(args.database, checkpoint_interval=args.checkpoint_interval)
         print("Glicko rating history rebuild complete!")
 
+    if args.rebuild_from:
+        resumed_from = rebuild_ratings_from(args.database, args.rebuild_from,
+                                            checkpoint_interval=args.checkpoint_interval)
+        print(f"Glicko ratings re-rated from {args.rebuild_from} "
+              f"(resumed from checkpoint {resumed_from or 'none, full replay'})")
+
     if args.incremental:
-        update_ratings_incrementally(args.database)
+        update_ratings_incrementally(args.database, checkpoint_interval=args.checkpoint_interval)
         print("Glicko rating incremental update complete!")
     
     if args.leaderboard:
@@ -88,8 +88,8 @@ class SessionSummary:
     """Summary of a single combat session."""
     timestamp: str
     profession: str
-    session_rank: int
-    total_players: int
+    session_rank: Optional[int]  # DPS rank in the session; None when none is stored
+    total_players: Optional[int]
     key_stats: Dict[str, float]
     performance_grade: str  # A, B, C, D, F based on z-scores
 
@@ -115,6 +115,10 @@ class PlayerSummaryGenerator:
         self.date_clause, self.date_params = build_date_filter_clause(date_filter)
         self.conn = sqlite3.connect(db_path)
         self.conn.row_factory = sqlite3.Row
+        # Per-session ranks stored at ingest (absent in databases not yet re-parsed)
+        self.has_session_scores = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'session_metric_scores'"
+        ).fetchone() is not None
         
     def close(self):
         """Close database connection."""
@@ -407,7 +411,16 @@ class PlayerSummaryGenerator:
         """Get recent session summaries."""
         cursor = self.conn.cursor()
         
-        # Get recent sessions with context
+        # Get recent sessions with context; the DPS rank comes from the stored session scores
+        if self.has_session_scores:
+            rank_columns = "sms.rank AS session_rank, sms.total_players"
+            rank_join = """
+            LEFT JOIN session_metric_scores sms
+                ON sms.timestamp = pp.timestamp AND sms.account_name = pp.account_name
+               AND sms.profession = pp.profession AND sms.metric_category = 'DPS'"""
+        else:
+            rank_columns = "NULL AS session_rank, NULL AS total_players"
+            rank_join = ""
         cursor.execute(f"""
             SELECT 
                 pp.timestamp,
@@ -415,8 +428,9 @@ class PlayerSummaryGenerator:
                 pp.target_dps,
                 pp.healing_per_sec,
                 pp.barrier_per_sec,
-                pp.stability_gen_per_sec
-            FROM player_performances pp
+                pp.stability_gen_per_sec,
+                {rank_columns}
+            FROM player_performances pp{rank_join}
             WHERE pp.account_name = ? {self.date_clause}
             ORDER BY pp.timestamp DESC
             LIMIT ?
@@ -424,9 +438,9 @@ class PlayerSummaryGenerator:
         
         sessions = []
         for row in cursor.fetchall():
-            # Calculate session context (simplified)
-            session_rank = 1  # Placeholder
-            total_players = 20  # Placeholder
+            # Session context; None when the player has no stored DPS rank for the session
+            session_rank = row['session_rank']
+            total_players = row['total_players']
             
             key_stats = {
                 'DPS': row['target_dps'],
@@ -593,8 +607,9 @@ def format_console_output(summary: PlayerSummary) -> str:
         for session in summary.recent_sessions[:5]:
             date_str = session.timestamp[:8]
             formatted_date = f"{date_str[4:6]}/{date_str[6:8]}/{date_str[2:4]}"
+            rank = session.session_rank if session.session_rank is not None else '-'
             output.append(f"{formatted_date:<12} {session.profession:<15} "
-                         f"{session.session_rank:<6} {session.key_stats.get('DPS', 0):<8.0f} "
+                         f"{rank:<6} {session.key_stats.get('DPS', 0):<8.0f} "
                          f"{session.performance_grade:<5}")
     
     output.append("\n" + "=" * 80)
@@ -0,0 +1,225 @@
+"""
+In-memory view of glicko_ratings for replaying sessions.
+
+Rating a session reads and writes one glicko_ratings row per player and
+metric. Done row by row against SQLite that is a connection, a query and a
+commit each time, and a history rebuild does it for every player of every
+session. RatingStore loads the table once, applies updates to a dict and
+writes the changed rows, together with their player_rating_history rows, in
+one transaction when flushed.
+
+A store can also write checkpoints of the rating state as it stood after a
+given session. Re-rating from a session onward then rewinds to the latest
+checkpoint before it rather than replaying from the first session. To keep
+them small, a checkpoint holds only the ratings that changed since the one
+before; a player's state at a checkpoint is their latest row at or before it.
+"""
+
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .rating_history import create_rating_history_table
+except ImportError:
+    # Fall back to absolute imports for standalone execution
+    from gw2_leaderboard.core.rating_history import create_rating_history_table
+
+# (account_name, profession, metric_category)
+RatingKey = Tuple[str, str, str]
+
+# What get_current_glicko_rating returns for a player with no rating yet
+DEFAULT_RATING = (1500.0, 350.0, 0.06, 0, 0.0, 0.0)
+
+# Rating state after the session at timestamp, for ratings changed since the previous checkpoint
+CHECKPOINT_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS rating_checkpoints (
+        timestamp TEXT NOT NULL,
+        account_name TEXT NOT NULL,
+        profession TEXT NOT NULL,
+        metric_category TEXT NOT NULL,
+        rating REAL NOT NULL,
+        rd REAL NOT NULL,
+        volatility REAL NOT NULL,
+        games_played INTEGER NOT NULL,
+        total_rank_sum REAL NOT NULL,
+        total_stat_value REAL NOT NULL,
+        PRIMARY KEY (account_name, profession, metric_category, timestamp)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_rating_checkpoints_timestamp ON rating_checkpoints(timestamp)',
+]
+
+# Every rating as of the checkpoint at or before ?
+CHECKPOINT_STATE_QUERY = '''
+    SELECT account_name, profession, metric_category, MAX(timestamp),
+           rating, rd, volatility, games_played, total_rank_sum, total_stat_value
+    FROM rating_checkpoints
+    WHERE timestamp <= ?
+    GROUP BY account_name, profession, metric_category
+'''
+
+
+class RatingStore:
+    """
+    glicko_ratings held in memory: rating, rd, volatility, games played,
+    rank sum and stat sum per (account, profession, metric).
+
+    Use as a context manager to flush on a clean exit; on an exception
+    nothing is written, so the database keeps its last flushed state.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.ratings: Dict[RatingKey, Tuple[float, float, float, int, float, float]] = {}
+        # Changed keys in the order they were first updated
+        self._changed: Dict[RatingKey, None] = {}
+        self._history: List[Tuple] = []
+        self._checkpoints: List[Tuple] = []
+        # Ratings as of the latest checkpoint, loaded on first use
+        self._checkpointed: Optional[Dict[RatingKey, Tuple]] = None
+        # Set by rewind(): ratings, history and checkpoints after it are replaced on flush
+        self._rewound_to: Optional[str] = None
+
+        conn = sqlite3.connect(db_path)
+        try:
+            cursor = conn.execute('''
+                SELECT account_name, profession, metric_category,
+                       rating, rd, volatility, games_played, total_rank_sum, total_stat_value
+                FROM glicko_ratings
+            ''')
+            for row in cursor:
+                self.ratings[row[:3]] = row[3:]
+        finally:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def get(self, key: RatingKey) -> Tuple[float, float, float, int, float, float]:
+        """(rating, rd, volatility, games, total_rank_sum, total_stat_value), as get_current_glicko_rating."""
+        return self.ratings.get(key, DEFAULT_RATING)
+
+    def set(self, key: RatingKey, rating: float, rd: float, volatility: float, games: int,
+            total_rank_sum: float, total_stat_value: float):
+        self.ratings[key] = (rating, rd, volatility, games, total_rank_sum, total_stat_value)
+        self._changed[key] = None
+
+    def record_history(self, key: RatingKey, timestamp: str, rating: float, rd: float, volatility: float):
+        """Queue a player_rating_history row, as save_rating_to_history."""
+        self._history.append(key + (timestamp, rating, rd, volatility))
+
+    def _checkpoint_state(self, conn: sqlite3.Connection, timestamp: str) -> Dict[RatingKey, Tuple]:
+        try:
+            return {row[:3]: row[4:] for row in conn.execute(CHECKPOINT_STATE_QUERY, (timestamp,))}
+        except sqlite3.OperationalError:
+            # Database from before checkpoints were written
+            return {}
+
+    def checkpoint(self, timestamp: str):
+        """Queue a checkpoint of the ratings as they stand after the session at timestamp."""
+        if self._checkpointed is None:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                # Timestamps are YYYYMMDDHHMM, so this is every checkpoint
+                self._checkpointed = self._checkpoint_state(conn, '~')
+            finally:
+                conn.close()
+        for key, state in self.ratings.items():
+            if self._checkpointed.get(key) != state:
+                self._checkpoints.append(key + (timestamp,) + state)
+                self._checkpointed[key] = state
+
+    def sessions_since_checkpoint(self) -> int:
+        """Rated sessions in the database after its latest checkpoint (or after the rewind point)."""
+        if self._rewound_to is not None:
+            return 0
+        conn = sqlite3.connect(self.db_path)
+        try:
+            try:
+                latest = conn.execute('SELECT MAX(timestamp) FROM rating_checkpoints').fetchone()[0]
+            except sqlite3.OperationalError:
+                latest = None
+            return conn.execute('SELECT COUNT(DISTINCT timestamp) FROM player_rating_history WHERE timestamp > ?',
+                                (latest or '',)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def rewind(self, before: str) -> Optional[str]:
+        """
+        Go back to the latest checkpoint taken before the session at before
+        and return its timestamp, or to no ratings at all (None) if there is
+        none. Until the store is flushed the database is untouched; the flush
+        then replaces glicko_ratings and drops the history and checkpoints
+        after that point.
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            try:
+                checkpoint = conn.execute('SELECT MAX(timestamp) FROM rating_checkpoints WHERE timestamp < ?',
+                                          (before,)).fetchone()[0]
+            except sqlite3.OperationalError:
+                checkpoint = None
+            self.ratings = self._checkpoint_state(conn, checkpoint) if checkpoint is not None else {}
+        finally:
+            conn.close()
+
+        self._checkpointed = dict(self.ratings)
+        self._changed.clear()
+        self._history.clear()
+        self._checkpoints.clear()
+        self._rewound_to = checkpoint or ''
+        return checkpoint
+
+    def flush(self):
+        """Write changed ratings, queued history rows and checkpoints in one transaction."""
+        if not self._changed and not self._history and not self._checkpoints and self._rewound_to is None:
+            return
+        rows = []
+        # After a rewind every rating is rewritten, since glicko_ratings is replaced
+        for key in (self.ratings if self._rewound_to is not None else self._changed):
+            rating, rd, volatility, games, total_rank_sum, total_stat_value = self.ratings[key]
+            rows.append(key + (rating, rd, volatility, games,
+                               total_rank_sum, total_rank_sum / games if games else 0.0,
+                               total_stat_value, total_stat_value / games if games else 0.0))
+
+        if self._history or self._rewound_to is not None:
+            create_rating_history_table(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                if self._checkpoints or self._rewound_to is not None:
+                    for statement in CHECKPOINT_SCHEMA:
+                        conn.execute(statement)
+                if self._rewound_to is not None:
+                    conn.execute('DELETE FROM glicko_ratings')
+                    conn.execute('DELETE FROM player_rating_history WHERE timestamp > ?', (self._rewound_to,))
+                    conn.execute('DELETE FROM rating_checkpoints WHERE timestamp > ?', (self._rewound_to,))
+                conn.executemany('''
+                    INSERT OR REPLACE INTO glicko_ratings
+                    (account_name, profession, metric_category, rating, rd, volatility, games_played,
+                     total_rank_sum, average_rank, total_stat_value, average_stat_value)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                conn.executemany('''
+                    INSERT OR REPLACE INTO player_rating_history
+                    (account_name, profession, metric_category, timestamp, rating, rating_deviation, volatility)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', self._history)
+                if self._checkpoints:
+                    conn.executemany('''
+                        INSERT OR REPLACE INTO rating_checkpoints
+                        (account_name, profession, metric_category, timestamp,
+                         rating, rd, volatility, games_played, total_rank_sum, total_stat_value)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', self._checkpoints)
+        finally:
+            conn.close()
+        self._changed.clear()
+        self._history.clear()
+        self._checkpoints.clear()
+        self._rewound_to = None
@@ -0,0 +1,220 @@
+"""
+Batched, transactional writes for the ingest tables.
+
+BulkWriter replaces per-row ``cursor.execute`` loops with ``executemany`` in
+batches, one transaction per batch, and accepts rows as a stream so callers
+never need to hold more than one batch in memory. Whole sessions are never
+split across transactions, so a session's old rows, new rows and manifest
+entry always change together.
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+# Rows per transaction. Larger batches stop helping well before this on
+# typical hardware, and a batch is still small enough to keep memory flat.
+DEFAULT_BATCH_SIZE = 2000
+
+# Connection-scoped PRAGMAs for a full rebuild, where the database is being
+# recreated from the logs anyway and durability of partial writes does not
+# matter. They reset when the connection closes.
+BULK_LOAD_PRAGMAS = [
+    'PRAGMA journal_mode = MEMORY',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA cache_size = -65536',
+    'PRAGMA temp_store = MEMORY',
+]
+
+# Incremental writes go into an existing database, so keep a real journal.
+INCREMENTAL_PRAGMAS = [
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA cache_size = -65536',
+]
+
+_INSERT_PERFORMANCE_TEMPLATE = '''
+    INSERT OR REPLACE INTO {table}
+    (timestamp, parsed_date, player_name, account_name, profession, party, fight_time,
+     target_damage, target_dps, all_damage, target_condition_damage, target_condition_dps,
+     healing_per_sec, barrier_per_sec, condition_cleanses_per_sec, boon_strips_per_sec,
+     stability_gen_per_sec, resistance_gen_per_sec, might_gen_per_sec, protection_gen_per_sec, down_contribution_per_sec,
+     burst_damage_1s, burst_consistency_1s, distance_from_tag_avg, apm_total, apm_no_auto, base_profession)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_PERFORMANCE_SQL = _INSERT_PERFORMANCE_TEMPLATE.format(table='player_performances')
+
+# Fight time outliers go to a table of the same shape
+INSERT_OUTLIER_SQL = _INSERT_PERFORMANCE_TEMPLATE.format(table='player_performance_outliers')
+
+INSERT_HIGH_SCORE_SQL = '''
+    INSERT OR REPLACE INTO high_scores (
+        timestamp, parsed_date, player_account, player_name, profession,
+        fight_number, metric_type, skill_name, skill_icon_url, score_value
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_MANIFEST_SQL = '''
+    INSERT OR REPLACE INTO ingested_sessions
+    (timestamp, file_signature, content_fingerprint, performance_count, high_score_count, ingested_at,
+     damage_key, duplicate_of)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def performance_row(perf) -> tuple:
+    """Parameters for INSERT_PERFORMANCE_SQL from a PlayerPerformance."""
+    return (
+        perf.timestamp, perf.parsed_date.isoformat() if perf.parsed_date else None,
+        perf.player_name, perf.account_name, perf.profession,
+        perf.party, perf.fight_time, perf.target_damage, perf.target_dps,
+        perf.all_damage, perf.target_condition_damage, perf.target_condition_dps,
+        perf.healing_per_sec, perf.barrier_per_sec, perf.condition_cleanses_per_sec,
+        perf.boon_strips_per_sec, perf.stability_gen_per_sec, perf.resistance_gen_per_sec,
+        perf.might_gen_per_sec, perf.protection_gen_per_sec, perf.down_contribution_per_sec,
+        perf.burst_damage_1s, perf.burst_consistency_1s, perf.distance_from_tag_avg,
+        perf.apm_total, perf.apm_no_auto, perf.base_profession or perf.profession
+    )
+
+
+def high_score_row(entry) -> tuple:
+    """Parameters for INSERT_HIGH_SCORE_SQL from a HighScoreEntry."""
+    return (
+        entry.timestamp,
+        str(entry.timestamp[:8]),  # Convert YYYYMMDDHHMM to YYYYMMDD
+        entry.player_account,
+        entry.player_name,
+        entry.profession,
+        entry.fight_number,
+        entry.metric_type,
+        entry.skill_name,
+        entry.skill_icon_url,
+        entry.score_value
+    )
+
+
+class BulkWriter:
+    """
+    Stream sessions or rows into the ingest tables in batched transactions.
+
+    Use as a context manager; pending rows are flushed on a clean exit and
+    discarded (rolled back) if the block raises.
+    """
+
+    def __init__(self, db_path: str, batch_size: int = DEFAULT_BATCH_SIZE, bulk_load: bool = False):
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.pragmas = BULK_LOAD_PRAGMAS if bulk_load else INCREMENTAL_PRAGMAS
+        self.conn: Optional[sqlite3.Connection] = None
+        self._performance_rows: List[tuple] = []
+        self._outlier_rows: List[tuple] = []
+        self._high_score_rows: List[tuple] = []
+        self._replaced_timestamps: List[Tuple[str]] = []
+        self._manifest_rows: List[tuple] = []
+        self.performances_written = 0
+        self.outliers_written = 0
+        self.high_scores_written = 0
+        self.sessions_written = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        self.close()
+        return False
+
+    def open(self):
+        self.conn = sqlite3.connect(self.db_path)
+        for pragma in self.pragmas:
+            self.conn.execute(pragma)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    @property
+    def pending_rows(self) -> int:
+        return len(self._performance_rows) + len(self._outlier_rows) + len(self._high_score_rows)
+
+    def add_session(self, timestamp: str, performances: Iterable, high_scores: Iterable,
+                    signature: str, fingerprint: str, replace: bool = True,
+                    damage_key: Optional[str] = None, duplicate_of: Optional[str] = None):
+        """
+        Queue one session's rows and manifest entry.
+
+        With replace, the session's existing rows are deleted in the same
+        transaction that inserts the new ones. Performances flagged as
+        fight_time_outlier go to player_performance_outliers and are not
+        counted in the manifest. A session recorded as a duplicate_of another
+        is added with no rows.
+        """
+        performance_rows = []
+        for perf in performances:
+            rows = self._outlier_rows if perf.fight_time_outlier else performance_rows
+            rows.append(performance_row(perf))
+        high_score_rows = [high_score_row(entry) for entry in high_scores]
+
+        if replace:
+            self._replaced_timestamps.append((timestamp,))
+        self._performance_rows.extend(performance_rows)
+        self._high_score_rows.extend(high_score_rows)
+        self._manifest_rows.append((timestamp, signature, fingerprint, len(performance_rows),
+                                    len(high_score_rows), datetime.now().isoformat(timespec='seconds'),
+                                    damage_key, duplicate_of))
+        self.sessions_written += 1
+
+        if self.pending_rows >= self.batch_size:
+            self.flush()
+
+    def write_performances(self, performances: Iterable):
+        """Stream PlayerPerformance rows (no session replacement or manifest)."""
+        for perf in performances:
+            rows = self._outlier_rows if perf.fight_time_outlier else self._performance_rows
+            rows.append(performance_row(perf))
+            if self.pending_rows >= self.batch_size:
+                self.flush()
+
+    def write_high_scores(self, high_scores: Iterable):
+        """Stream HighScoreEntry rows (no session replacement or manifest)."""
+        for entry in high_scores:
+            self._high_score_rows.append(high_score_row(entry))
+            if self.pending_rows >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """Write everything queued in a single transaction."""
+        if not (self.pending_rows or self._manifest_rows or self._replaced_timestamps):
+            return
+
+        with self.conn:
+            cursor = self.conn.cursor()
+            # Stored session scores of sessions getting new rows are stale
+            changed = set(self._replaced_timestamps) | {(row[0],) for row in self._performance_rows}
+            if changed:
+                cursor.executemany('DELETE FROM session_metric_scores WHERE timestamp = ?', sorted(changed))
+            if self._replaced_timestamps:
+                cursor.executemany('DELETE FROM player_performances WHERE timestamp = ?', self._replaced_timestamps)
+                cursor.executemany('DELETE FROM player_performance_outliers WHERE timestamp = ?',
+                                   self._replaced_timestamps)
+                cursor.executemany('DELETE FROM high_scores WHERE timestamp = ?', self._replaced_timestamps)
+            if self._performance_rows:
+                cursor.executemany(INSERT_PERFORMANCE_SQL, self._performance_rows)
+            if self._outlier_rows:
+                cursor.executemany(INSERT_OUTLIER_SQL, self._outlier_rows)
+            if self._high_score_rows:
+                cursor.executemany(INSERT_HIGH_SCORE_SQL, self._high_score_rows)
+            if self._manifest_rows:
+                cursor.executemany(INSERT_MANIFEST_SQL, self._manifest_rows)
+
+        self.performances_written += len(self._performance_rows)
+        self.outliers_written += len(self._outlier_rows)
+        self.high_scores_written += len(self._high_score_rows)
+        self._performance_rows = []
+        self._outlier_rows = []
+        self._high_score_rows = []
+        self._replaced_timestamps = []
+        self._manifest_rows = []
@@ -0,0 +1,276 @@
+"""
+Session rows straight from Elite Insights JSON exports.
+
+The markup path recovers every figure from the TopStats TiddlyWiki tables:
+positional cells, tooltips, spans and thousands separators. Elite Insights,
+the combat-log parser TopStats itself is built on, writes the same figures
+as structured JSON, one file per fight. This adapter aggregates those fights
+into the per-player session totals the markup tables show, so
+parse_logs_enhanced builds the same PlayerPerformance rows and high score
+entries from either source.
+
+Only the main phase (index 0) of each fight is read. Per-second rates are
+session totals divided by the player's summed active time, rounded the way
+the TopStats tables print them.
+
+Burst consistency (the Ch5Ca DPS-Stats table) is computed by TopStats from
+its own damage-over-time analysis and has no counterpart in the exports. It
+is left NULL (None) rather than 0, so these sessions are visibly not
+measured for it; every Burst Consistency query filters on a value above 0,
+which leaves them out of that leaderboard.
+
+This is a robustness path, not a faster one. The exports carry rotations,
+skill maps, buff timelines and damage distributions for every fight, tens of
+times the bytes of the TopStats tables, and json decodes them whole; with
+orjson a session still takes several times as long as parsing its markup.
+Only the decoded fight, never the session, is held in memory at a time.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+try:
+    from .high_scores_parser import HighScoreEntry
+except ImportError:
+    # Fall back to absolute imports for standalone execution
+    from gw2_leaderboard.parsers.high_scores_parser import HighScoreEntry
+
+# Boon buff ids in squadBuffs -> PlayerPerformance field
+BOON_FIELDS = {
+    740: 'might_gen_per_sec',
+    717: 'protection_gen_per_sec',
+    1122: 'stability_gen_per_sec',
+    26980: 'resistance_gen_per_sec',
+}
+
+# Session totals that are plain sums over fights
+SUMMED_FIELDS = ('target_damage', 'target_condition_damage', 'all_damage', 'down_contribution',
+                 'healing', 'barrier', 'cleanses', 'strips', 'casts', 'skill_casts')
+
+# Session figures that are averages over fights, weighted by active time
+AVERAGED_FIELDS = tuple(BOON_FIELDS.values()) + ('distance_from_tag_avg',)
+
+# HighScoreEntry.metric_type values, as HighScoresParser.TARGET_METRICS names them
+HIGH_SCORE_METRICS = ('highest_outgoing_skill_damage', 'highest_incoming_skill_damage', 'highest_single_fight_dps')
+
+# Entries kept per high score metric and session
+HIGH_SCORE_ROWS = 10
+
+
+class SessionSummary(NamedTuple):
+    """What a session's exports contribute: per-player rows and high score entries."""
+    player_rows: List[Dict]
+    high_scores: List[HighScoreEntry]
+
+
+def _main_phase(values: Optional[List], default=None):
+    return values[0] if values else default
+
+
+def squad_players(fight: Dict) -> Iterable[Dict]:
+    """Squad members of a fight; allies outside the squad are not ranked."""
+    return (player for player in fight.get('players', []) if not player.get('notInSquad'))
+
+
+def _auto_attack_ids(fight: Dict) -> set:
+    return {int(key[1:]) for key, skill in fight.get('skillMap', {}).items()
+            if key.startswith('s') and skill.get('autoAttack')}
+
+
+def _best_second(player: Dict) -> int:
+    """Most damage dealt to all targets together within one second."""
+    per_target = [_main_phase(target, []) for target in player.get('targetDamage1S', [])]
+    if not per_target:
+        return 0
+    totals = [sum(column) for column in zip(*per_target)]
+    return max((later - earlier for earlier, later in zip(totals, totals[1:])), default=0)
+
+
+def _biggest_hit(distribution: Optional[List], skill_map: Dict) -> Optional[tuple]:
+    """(damage, skill name, icon URL) of the hardest single hit in a damage distribution."""
+    best = max(_main_phase(distribution, []), key=lambda skill: skill.get('max', 0), default=None)
+    if not best or not best.get('max'):
+        return None
+    skill = skill_map.get(f"s{best['id']}", {})
+    return best['max'], skill.get('name', f"Skill {best['id']}"), skill.get('icon')
+
+
+def _player_digest(player: Dict, auto_attack_ids: set, skill_map: Dict) -> Dict:
+    """The handful of figures this adapter needs from one player's fight."""
+    active_ms = _main_phase(player.get('activeTimes'), 0)
+    sums = dict.fromkeys(SUMMED_FIELDS, 0)
+    for target in player.get('dpsTargets', []):
+        phase = _main_phase(target, {})
+        sums['target_damage'] += phase.get('damage', 0)
+        sums['target_condition_damage'] += phase.get('condiDamage', 0)
+    sums['all_damage'] = _main_phase(player.get('dpsAll'), {}).get('damage', 0)
+    for target in player.get('statsTargets', []):
+        sums['down_contribution'] += _main_phase(target, {}).get('downContribution', 0)
+    healing = player.get('extHealingStats', {}).get('outgoingHealing')
+    sums['healing'] = _main_phase(healing, {}).get('healing', 0)
+    barrier = player.get('extBarrierStats', {}).get('outgoingBarrier')
+    sums['barrier'] = _main_phase(barrier, {}).get('barrier', 0)
+    support = _main_phase(player.get('support'), {})
+    # Cleanses on others, as in the TopStats Support table
+    sums['cleanses'] = support.get('condiCleanse', 0)
+    sums['strips'] = support.get('boonStrips', 0)
+    for skill in player.get('rotation', []):
+        casts = len(skill.get('skills', []))
+        sums['casts'] += casts
+        if skill['id'] not in auto_attack_ids:
+            sums['skill_casts'] += casts
+
+    # Averaged over the session weighted by active time
+    averages = dict.fromkeys(AVERAGED_FIELDS, 0.0)
+    for boon in player.get('squadBuffs', []):
+        field = BOON_FIELDS.get(boon['id'])
+        if field:
+            averages[field] = _main_phase(boon.get('buffData'), {}).get('generation', 0.0)
+    averages['distance_from_tag_avg'] = _main_phase(player.get('statsAll'), {}).get('distToCom', 0.0)
+
+    return {
+        'key': (player['account'], player['profession']),
+        'player_name': player['name'],
+        'party': player.get('group', 0),
+        'active_ms': active_ms,
+        'sums': sums,
+        'averages': averages,
+        'burst_damage_1s': _best_second(player),
+        'highest_outgoing_skill_damage': _biggest_hit(player.get('totalDamageDist'), skill_map),
+        'highest_incoming_skill_damage': _biggest_hit(player.get('totalDamageTaken'), skill_map),
+        'highest_single_fight_dps': sum(_main_phase(target, {}).get('dps', 0)
+                                        for target in player.get('dpsTargets', [])),
+    }
+
+
+def fight_digest(fight: Dict) -> Dict:
+    """
+    Reduce one decoded export to what the session totals need.
+
+    Exports run to megabytes, mostly rotations, buff timelines and damage
+    distributions; keeping only digests lets a session be summarized with
+    one decoded fight in memory at a time.
+    """
+    auto_attack_ids = _auto_attack_ids(fight)
+    skill_map = fight.get('skillMap', {})
+    return {
+        'start': fight.get('timeStartStd', ''),
+        'players': [_player_digest(player, auto_attack_ids, skill_map) for player in squad_players(fight)],
+    }
+
+
+class _PlayerTotals:
+    """One account and profession's figures summed over a session's fights."""
+
+    def __init__(self, digest: Dict):
+        self.account_name, self.profession = digest['key']
+        self.player_name = digest['player_name']
+        self.party = digest['party']
+        self.active_ms = 0
+        self.sums = dict.fromkeys(SUMMED_FIELDS, 0)
+        self.weighted = dict.fromkeys(AVERAGED_FIELDS, 0.0)
+        self.burst_damage_1s = 0
+
+    def add(self, digest: Dict):
+        active_ms = digest['active_ms']
+        self.active_ms += active_ms
+        for field, value in digest['sums'].items():
+            self.sums[field] += value
+        for field, value in digest['averages'].items():
+            self.weighted[field] += value * active_ms
+        self.burst_damage_1s = max(self.burst_damage_1s, digest['burst_damage_1s'])
+
+    def row(self) -> Dict:
+        """PlayerPerformance fields other than timestamp and parsed_date."""
+        fight_time = round(self.active_ms / 1000, 1)
+        sums = self.sums
+
+        def per_sec(total):
+            return round(total / fight_time, 2) if fight_time > 0 else 0.0
+
+        def per_minute(total):
+            return float(round(total * 60 / fight_time)) if fight_time > 0 else 0.0
+
+        def time_average(field):
+            return self.weighted[field] / self.active_ms if self.active_ms else 0.0
+
+        row = {
+            'player_name': self.player_name,
+            'account_name': self.account_name,
+            'profession': self.profession,
+            'party': self.party,
+            'fight_time': fight_time,
+            'target_damage': sums['target_damage'],
+            'target_dps': int(sums['target_damage'] / fight_time) if fight_time > 0 else 0,
+            'all_damage': sums['all_damage'],
+            'target_condition_damage': sums['target_condition_damage'],
+            'target_condition_dps': int(sums['target_condition_damage'] / fight_time) if fight_time > 0 else 0,
+            'healing_per_sec': per_sec(sums['healing']),
+            'barrier_per_sec': per_sec(sums['barrier']),
+            'condition_cleanses_per_sec': per_sec(sums['cleanses']),
+            'boon_strips_per_sec': per_sec(sums['strips']),
+            'down_contribution_per_sec': sums['down_contribution'] / fight_time if fight_time > 0 else 0.0,
+            'burst_damage_1s': self.burst_damage_1s,
+            # Not in the exports; see the module docstring
+            'burst_consistency_1s': None,
+            'distance_from_tag_avg': float(round(time_average('distance_from_tag_avg'))),
+            'apm_total': per_minute(sums['casts']),
+            'apm_no_auto': per_minute(sums['skill_casts']),
+        }
+        for field in BOON_FIELDS.values():
+            row[field] = round(time_average(field), 2)
+        return row
+
+
+def _player_rows(digests: List[Dict]) -> List[Dict]:
+    totals: Dict[tuple, _PlayerTotals] = {}
+    for digest in digests:
+        for player in digest['players']:
+            if player['key'] not in totals:
+                totals[player['key']] = _PlayerTotals(player)
+            totals[player['key']].add(player)
+    return [player_totals.row() for player_totals in totals.values()]
+
+
+def _high_scores(digests: List[Dict], timestamp: str) -> List[HighScoreEntry]:
+    candidates = {metric: [] for metric in HIGH_SCORE_METRICS}
+    for fight_number, digest in enumerate(digests, start=1):
+        for player in digest['players']:
+            account, profession = player['key']
+            identity = (account, player['player_name'], profession, fight_number)
+            for metric in HIGH_SCORE_METRICS:
+                score = player[metric]
+                if isinstance(score, tuple):
+                    candidates[metric].append(identity + score)
+                elif score:
+                    candidates[metric].append(identity + (score, None, None))
+
+    entries = []
+    for metric, rows in candidates.items():
+        rows.sort(key=lambda row: (-row[4], row[3], row[0]))
+        for account, name, profession, fight_number, score, skill_name, skill_icon_url in rows[:HIGH_SCORE_ROWS]:
+            entries.append(HighScoreEntry(
+                timestamp=timestamp,
+                player_account=account,
+                player_name=name,
+                profession=profession,
+                fight_number=fight_number,
+                metric_type=metric,
+                skill_name=skill_name,
+                skill_icon_url=skill_icon_url,
+                score_value=float(score),
+            ))
+    return entries
+
+
+def summarize(fights: Iterable[Dict], timestamp: str) -> SessionSummary:
+    """
+    Per-player session rows and High Scores entries for a session's fights.
+
+    fights may be a generator; each fight is reduced to its digest before
+    the next is read. Fights are numbered from 1 in the order they were
+    fought, like TopStats. A player who swapped profession during the
+    session gets one row per profession, as in the TopStats tables. High
+    scores are the best HIGH_SCORE_ROWS (player, fight) pairs per metric.
+    """
+    digests = sorted((fight_digest(fight) for fight in fights), key=lambda digest: digest['start'])
+    return SessionSummary(_player_rows(digests), _high_scores(digests, timestamp))
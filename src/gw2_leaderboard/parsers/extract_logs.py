@@ -3,97 +3,184 @@
 Extract individual GW2 log summaries from TiddlyWiki HTML file.
 """
 
-import json
 import re
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from bs4 import BeautifulSoup
+from typing import Container, Dict, Iterable, List, Optional, Set, Tuple
 import argparse
 
+try:
+    from . import tiddler_store
+    from .parse_logs_enhanced import ingest_sessions
+    from .session_archive import ARCHIVE_SUFFIX, session_archive_path, write_archive
+    from .session_source import MemorySession, tiddler_file_name
+    from ..utils import json_io
+except ImportError:
+    # Fall back to absolute imports for standalone execution
+    from gw2_leaderboard.parsers import tiddler_store
+    from gw2_leaderboard.parsers.parse_logs_enhanced import ingest_sessions
+    from gw2_leaderboard.parsers.session_archive import ARCHIVE_SUFFIX, session_archive_path, write_archive
+    from gw2_leaderboard.parsers.session_source import MemorySession, tiddler_file_name
+    from gw2_leaderboard.utils import json_io
+
+# Titles of tiddlers that belong to a log session start with its YYYYMMDDHHMM timestamp
+SESSION_TITLE_PATTERN = re.compile(r'^\d{12}')
+
+# Threads writing session directories; the work is file I/O, not CPU
+DEFAULT_WRITE_WORKERS = 8
+
 
 def extract_tiddler_data(html_file_path):
-    """Extract tiddler data from TiddlyWiki HTML file."""
+    """Yield tiddlers from a TiddlyWiki HTML file one at a time."""
     print(f"Reading {html_file_path}...")
+    return tiddler_store.iter_tiddlers(html_file_path)
+
+
+def session_timestamp(title: str) -> Optional[str]:
+    """The YYYYMMDDHHMM prefix of a session tiddler's title, or None."""
+    return title[:12] if SESSION_TITLE_PATTERN.match(title) else None
+
+
+def group_session_tiddlers(tiddler_data: Iterable[Dict], skip: Container[str] = ()) -> Tuple[Dict[str, List[Dict]], Dict[str, Dict], int]:
+    """
+    Group tiddlers by session in a single pass.
+
+    Returns (tiddlers by timestamp, Log-Summary tiddler by timestamp, number
+    of tiddlers seen). Tiddlers of timestamps in skip are not kept.
+    """
+    groups = {}
+    summaries = {}
+    tiddler_count = 0
+    for tiddler in tiddler_data:
+        tiddler_count += 1
+        title = tiddler.get('title', '')
+        timestamp = session_timestamp(title)
+        if timestamp is None or timestamp in skip:
+            continue
+        groups.setdefault(timestamp, []).append(tiddler)
+        if title == f"{timestamp}-Log-Summary":
+            summaries[timestamp] = tiddler
+    return groups, summaries, tiddler_count
+
+
+def write_session_files(log_dir: Path, timestamp: str, related_tiddlers: List[Dict], main_tiddler: Dict,
+                        compress: bool = False):
+    """
+    Write a session's tiddlers, one JSON file each, then its summary.json.
+
+    summary.json is written last, so its presence marks a complete session.
+    With compress the same files go into one ``<timestamp>.tar.gz`` instead,
+    written atomically. Whichever copy of the session was there before, loose
+    files or archive, is removed so readers cannot pick up the old one.
+    """
+    log_dir.mkdir(parents=True, exist_ok=True)
     
-    with open(html_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    # Create a summary info file
+    summary_info = {
+        'timestamp': timestamp,
+        'main_tiddler': main_tiddler.get('title'),
+        'tiddler_count': len(related_tiddlers),
+        'tiddler_titles': [t.get('title') for t in related_tiddlers],
+        'created': main_tiddler.get('created'),
+        'modified': main_tiddler.get('modified')
+    }
     
-    # Find the tiddler store script tag
-    soup = BeautifulSoup(content, 'html.parser')
-    tiddler_store = soup.find('script', {'class': 'tiddlywiki-tiddler-store'})
+    if compress:
+        files = [(tiddler_file_name(t.get('title', '')), json_io.dumps_bytes(t, indent=True)) for t in related_tiddlers]
+        files.append(('summary.json', json_io.dumps_bytes(summary_info, indent=True)))
+        write_archive(session_archive_path(log_dir), files)
+        for path in log_dir.glob('*.json'):
+            path.unlink()
+        return
     
-    if not tiddler_store:
-        raise ValueError("Could not find tiddler store in HTML file")
+    session_archive_path(log_dir).unlink(missing_ok=True)
     
-    # Parse the JSON data
-    tiddler_data = json.loads(tiddler_store.string)
-    print(f"Found {len(tiddler_data)} tiddlers")
+    # Save each tiddler as a separate file
+    for tiddler in related_tiddlers:
+        json_io.dump_file(tiddler, log_dir / tiddler_file_name(tiddler.get('title', '')))
     
-    return tiddler_data
+    json_io.dump_file(summary_info, log_dir / 'summary.json')
 
 
-def extract_log_summaries(tiddler_data, output_dir):
-    """Extract individual log summaries and related tiddlers."""
+def extracted_sessions(output_dir) -> Set[str]:
+    """Timestamps of sessions already fully extracted (or packed) under output_dir."""
+    output_path = Path(output_dir)
+    if not output_path.exists():
+        return set()
+    complete = [path.parent for path in output_path.glob('*/summary.json')]
+    complete += [path.parent for path in output_path.glob(f'*/*{ARCHIVE_SUFFIX}')
+                 if path == session_archive_path(path.parent)]
+    return {log_dir.name for log_dir in complete if SESSION_TITLE_PATTERN.match(log_dir.name)}
+
+
+def extract_log_summaries(tiddler_data, output_dir, workers: int = DEFAULT_WRITE_WORKERS,
+                          force: bool = False, compress: bool = False) -> List[str]:
+    """
+    Extract individual log summaries and related tiddlers.
+
+    Sessions already on disk are skipped unless force is set. Session
+    directories are written by a pool of `workers` threads. Returns the
+    timestamps that were extracted. With compress each session is written
+    as one .tar.gz archive.
+    """
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
     
-    # Pattern to match log summary timestamps
-    log_pattern = re.compile(r'^(\d{12})-Log-Summary$')
-    
-    # Find all log summaries
-    log_summaries = []
-    for tiddler in tiddler_data:
-        title = tiddler.get('title', '')
-        match = log_pattern.match(title)
-        if match:
-            timestamp = match.group(1)
-            log_summaries.append((timestamp, tiddler))
+    existing = set() if force else extracted_sessions(output_path)
+    tiddler_groups, log_summaries, tiddler_count = group_session_tiddlers(tiddler_data, skip=existing)
     
+    print(f"Found {tiddler_count} tiddlers")
     print(f"Found {len(log_summaries)} log summaries")
+    if existing:
+        print(f"Skipping {len(existing)} sessions already extracted (use --force to re-extract)")
     
-    # Group all tiddlers by timestamp
-    tiddler_groups = {}
-    for tiddler in tiddler_data:
-        title = tiddler.get('title', '')
-        # Check if this tiddler belongs to a log session
-        for timestamp, _ in log_summaries:
-            if title.startswith(timestamp):
-                if timestamp not in tiddler_groups:
-                    tiddler_groups[timestamp] = []
-                tiddler_groups[timestamp].append(tiddler)
-                break
+    return write_sessions(output_path, tiddler_groups, log_summaries, workers, compress)
+
+
+def write_sessions(output_path: Path, tiddler_groups: Dict[str, List[Dict]], log_summaries: Dict[str, Dict],
+                   workers: int = DEFAULT_WRITE_WORKERS, compress: bool = False) -> List[str]:
+    """Write every session in log_summaries to output_path with a thread pool; returns their timestamps."""
+    def extract_session(timestamp: str) -> str:
+        write_session_files(output_path / timestamp, timestamp, tiddler_groups[timestamp], log_summaries[timestamp],
+                            compress)
+        return timestamp
     
     # Extract each log session
-    for timestamp, main_tiddler in log_summaries:
-        log_dir = output_path / timestamp
-        log_dir.mkdir(exist_ok=True)
-        
-        # Get all related tiddlers for this timestamp
-        related_tiddlers = tiddler_groups.get(timestamp, [])
-        
-        print(f"Extracting {timestamp}: {len(related_tiddlers)} tiddlers")
-        
-        # Save each tiddler as a separate file
-        for tiddler in related_tiddlers:
-            tiddler_title = tiddler.get('title', '')
-            # Clean filename
-            filename = re.sub(r'[^\w\-_.]', '_', tiddler_title) + '.json'
-            
-            with open(log_dir / filename, 'w', encoding='utf-8') as f:
-                json.dump(tiddler, f, indent=2, ensure_ascii=False)
-        
-        # Create a summary info file
-        summary_info = {
-            'timestamp': timestamp,
-            'main_tiddler': main_tiddler.get('title'),
-            'tiddler_count': len(related_tiddlers),
-            'tiddler_titles': [t.get('title') for t in related_tiddlers],
-            'created': main_tiddler.get('created'),
-            'modified': main_tiddler.get('modified')
-        }
-        
-        with open(log_dir / 'summary.json', 'w', encoding='utf-8') as f:
-            json.dump(summary_info, f, indent=2, ensure_ascii=False)
+    extracted = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for timestamp in executor.map(extract_session, log_summaries):
+            print(f"Extracting {timestamp}: {len(tiddler_groups[timestamp])} tiddlers")
+            extracted.append(timestamp)
+    
+    return extracted
+
+
+def ingest_log_summaries(tiddler_data, db_path: str, archive_dir=None,
+                         workers: int = DEFAULT_WRITE_WORKERS, compress: bool = False) -> List[str]:
+    """
+    Parse log sessions straight from the tiddlers into the database.
+    
+    No tiddler files are written unless archive_dir is given, in which case
+    sessions not yet archived there are written afterwards. Returns the
+    timestamps that were ingested.
+    """
+    tiddler_groups, log_summaries, tiddler_count = group_session_tiddlers(tiddler_data)
+    print(f"Found {tiddler_count} tiddlers")
+    print(f"Found {len(log_summaries)} log summaries")
+    
+    sessions = [MemorySession(timestamp, tiddler_groups[timestamp]) for timestamp in sorted(log_summaries)]
+    ingested = ingest_sessions(sessions, db_path)
+    
+    if archive_dir:
+        archive_path = Path(archive_dir)
+        archive_path.mkdir(exist_ok=True)
+        existing = extracted_sessions(archive_path)
+        to_archive = {ts: tiddler for ts, tiddler in log_summaries.items() if ts not in existing}
+        archived = write_sessions(archive_path, tiddler_groups, to_archive, workers, compress)
+        print(f"Archived {len(archived)} sessions to {archive_path}")
+    
+    return ingested
 
 
 def main():
@@ -101,13 +188,30 @@ def main():
     parser.add_argument('input_file', help='Path to TiddlyWiki HTML file')
     parser.add_argument('-o', '--output', default='extracted_logs', 
                         help='Output directory (default: extracted_logs)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WRITE_WORKERS,
+                        help=f'Threads writing session directories (default: {DEFAULT_WRITE_WORKERS})')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-extract sessions that already exist in the output directory')
+    parser.add_argument('-d', '--database',
+                        help='Parse sessions straight into this database instead of writing JSON files')
+    parser.add_argument('--archive', action='store_true',
+                        help='With --database, also write the session JSON files to the output directory')
+    parser.add_argument('--compress', action='store_true',
+                        help='Write each session as one <timestamp>.tar.gz instead of loose JSON files')
     
     args = parser.parse_args()
     
     try:
         tiddler_data = extract_tiddler_data(args.input_file)
-        extract_log_summaries(tiddler_data, args.output)
-        print(f"Extraction complete! Check {args.output} directory.")
+        if args.database:
+            ingest_log_summaries(tiddler_data, args.database,
+                                 archive_dir=args.output if args.archive else None, workers=args.workers,
+                                 compress=args.compress)
+            print(f"Ingest complete! Sessions stored in {args.database}.")
+        else:
+            extract_log_summaries(tiddler_data, args.output, workers=args.workers, force=args.force,
+                                  compress=args.compress)
+            print(f"Extraction complete! Check {args.output} directory.")
         
     except Exception as e:
         print(f"Error: {e}")
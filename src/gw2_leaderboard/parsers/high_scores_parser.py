@@ -12,12 +12,23 @@ The parser handles TiddlyWiki table markup and extracts player information,
 skill details, and performance scores.
 """
 
-import json
+import io
 import re
-from typing import Dict, List, Optional, Tuple
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
+try:
+    from .session_archive import ARCHIVE_SUFFIX, read_session_file
+    from ..utils import json_io
+except ImportError:
+    # Fall back to absolute imports for standalone execution
+    from gw2_leaderboard.parsers.session_archive import ARCHIVE_SUFFIX, read_session_file
+    from gw2_leaderboard.utils import json_io
+
 
 @dataclass
 class HighScoreEntry:
@@ -33,6 +44,13 @@ class HighScoreEntry:
     score_value: float
 
 
+# Every High Scores table sits in its own flex column
+SECTION_START = '<div class="flex-col">'
+
+# Files a pool worker parses per task; the files are small
+WORKER_CHUNK_SIZE = 8
+
+
 class HighScoresParser:
     """Parser for High-Scores.json files from GW2 TiddlyWiki logs"""
     
@@ -52,6 +70,8 @@ class HighScoresParser:
             r"\[img width=24 \[([^|]+)\|([^]]+)\]\]-([^|]+)"
         )
         self.score_pattern = re.compile(r'[\d,]+\.?\d*')
+        # Table titles as they appear in the markup, in TARGET_METRICS order
+        self.metric_titles = [(f"''{name}''", key) for name, key in self.TARGET_METRICS.items()]
         
     def extract_player_info(self, player_text: str) -> Optional[Tuple[str, str, str, int]]:
         """
@@ -191,72 +211,153 @@ class HighScoresParser:
         
         return entries
     
+    def metric_sections(self, html_content: str) -> Iterator[Tuple[str, str]]:
+        """
+        (metric key, section text) for each flex column holding a target metric table.
+        
+        Pages carry dozens of score tables but only three are read, so the
+        titles are searched for directly and each one's column is found
+        around it, rather than splitting the page and testing every column.
+        A column naming several target metrics counts as the one listed
+        first in TARGET_METRICS.
+        """
+        # Column start offset -> metric key; the text before the first column starts at 0
+        sections: Dict[int, str] = {}
+        for title, metric_key in self.metric_titles:
+            position = html_content.find(title)
+            while position != -1:
+                column = html_content.rfind(SECTION_START, 0, position)
+                section_start = column + len(SECTION_START) if column != -1 else 0
+                sections.setdefault(section_start, metric_key)
+                position = html_content.find(title, position + len(title))
+        
+        for section_start in sorted(sections):
+            section_end = html_content.find(SECTION_START, section_start)
+            if section_end == -1:
+                section_end = len(html_content)
+            yield sections[section_start], html_content[section_start:section_end]
+    
     def parse_high_scores_file(self, file_path: Path) -> List[HighScoreEntry]:
         """
         Parse a High-Scores.json file and extract all target metrics.
         
         Args:
-            file_path: Path to the High-Scores.json file
+            file_path: Path to the High-Scores.json file; read from the
+                session's .tar.gz archive when the directory was packed
             
         Returns:
             List of HighScoreEntry objects for all target metrics
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Extract timestamp from filename
-            timestamp = file_path.stem.split('-')[0]
+            data = json_io.loads(read_session_file(file_path))
+        except Exception as e:
+            print(f"Error parsing {file_path}: {e}")
+            return []
+        
+        # Extract timestamp from filename
+        timestamp = file_path.stem.split('-')[0]
+        return self.parse_high_scores_data(data, timestamp, source=file_path)
+    
+    def parse_high_scores_data(self, data: Dict, timestamp: str, source=None) -> List[HighScoreEntry]:
+        """
+        Extract all target metrics from a High-Scores tiddler that is already loaded.
+        
+        Args:
+            data: The tiddler dict (its 'text' holds the high score tables)
+            timestamp: Session timestamp (YYYYMMDDHHMM)
+            source: Where the tiddler came from, for error messages
             
+        Returns:
+            List of HighScoreEntry objects for all target metrics
+        """
+        try:
             # Get the HTML content
             html_content = data.get('text', '')
             
             all_entries = []
             
-            # Split content into sections by finding each div with flex-col
-            sections = html_content.split('<div class="flex-col">')
-            
-            for i, section in enumerate(sections):
-                # Check if this section contains one of our target metrics
-                for metric_name, metric_key in self.TARGET_METRICS.items():
-                    pattern = f"''{metric_name}''"
-                    if pattern in section:
-                        # Parse this section
-                        entries = self.parse_table_section(section, metric_key, timestamp)
-                        all_entries.extend(entries)
-                        break
+            for metric_key, section in self.metric_sections(html_content):
+                all_entries.extend(self.parse_table_section(section, metric_key, timestamp))
             
             return all_entries
             
         except Exception as e:
-            print(f"Error parsing {file_path}: {e}")
+            print(f"Error parsing {source or f'{timestamp}-High-Scores'}: {e}")
             return []
     
-    def parse_directory(self, extracted_logs_dir: Path) -> List[HighScoreEntry]:
+    def parse_directory(self, extracted_logs_dir: Path, workers: int = 1,
+                        db_path: Optional[str] = None) -> List[HighScoreEntry]:
         """
         Parse all High-Scores.json files in an extracted_logs directory.
         
         Args:
             extracted_logs_dir: Path to the extracted_logs directory
+            workers: Parse files in this many worker processes
+            db_path: Skip sessions that already have rows in this database's
+                high_scores table
             
         Returns:
-            List of all HighScoreEntry objects from all files
+            List of all HighScoreEntry objects from the parsed files, in
+            timestamp order
         """
         all_entries = []
         
-        # Find all High-Scores.json files
-        high_scores_files = list(extracted_logs_dir.glob('*/*High-Scores.json'))
+        # Find all High-Scores.json files, loose or inside packed sessions
+        high_scores_files = set(extracted_logs_dir.glob('*/*High-Scores.json'))
+        for archive_path in extracted_logs_dir.glob(f'*/*{ARCHIVE_SUFFIX}'):
+            high_scores_files.add(archive_path.parent / f"{archive_path.parent.name}-High-Scores.json")
+        high_scores_files = sorted(high_scores_files)
         
         print(f"Found {len(high_scores_files)} High-Scores.json files")
         
-        for file_path in high_scores_files:
-            entries = self.parse_high_scores_file(file_path)
-            all_entries.extend(entries)
-            print(f"Parsed {len(entries)} entries from {file_path.name}")
+        if db_path:
+            stored = stored_high_score_timestamps(db_path)
+            high_scores_files = [path for path in high_scores_files if path.stem.split('-')[0] not in stored]
+            print(f"Parsing {len(high_scores_files)} files not yet in the database")
+        
+        if workers <= 1 or len(high_scores_files) <= 1:
+            for file_path in high_scores_files:
+                entries = self.parse_high_scores_file(file_path)
+                all_entries.extend(entries)
+                print(f"Parsed {len(entries)} entries from {file_path.name}")
+            return all_entries
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_parse_file_job, high_scores_files, chunksize=WORKER_CHUNK_SIZE)
+            for file_path, (entries, output) in zip(high_scores_files, results):
+                print(output, end='')
+                all_entries.extend(entries)
+                print(f"Parsed {len(entries)} entries from {file_path.name}")
         
         return all_entries
 
 
+def stored_high_score_timestamps(db_path: str) -> set:
+    """Timestamps of sessions with rows in the high_scores table (none if it does not exist yet)."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute('SELECT DISTINCT timestamp FROM high_scores')}
+    except sqlite3.OperationalError:
+        return set()
+    finally:
+        conn.close()
+
+
+# One parser per worker process, built on its first file
+_worker_parser: Optional[HighScoresParser] = None
+
+
+def _parse_file_job(file_path: Path) -> Tuple[List[HighScoreEntry], str]:
+    """Process-pool worker: parse one file, capturing its console output."""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = HighScoresParser()
+    output = io.StringIO()
+    with redirect_stdout(output):
+        entries = _worker_parser.parse_high_scores_file(file_path)
+    return entries, output.getvalue()
+
+
 def main():
     """Test the parser with a sample file"""
     parser = HighScoresParser()
@@ -0,0 +1,62 @@
+"""
+On-disk cache of the raw per-player rows extracted from a session.
+
+Text extraction is the expensive part of parsing a session, while rule
+changes (build-variant detection, outlier filtering) only affect the cheap
+classification step that runs afterwards. The cache keeps one file per
+session holding the merged rows, tagged with the parser version and a hash
+of the session's tiddler files; an entry is only used when both match.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..utils import json_io
+
+
+class ParseCache:
+    """Raw per-session rows stored as ``<cache_dir>/<timestamp>.json``."""
+
+    def __init__(self, cache_dir: str, parser_version: int):
+        self.cache_dir = Path(cache_dir)
+        self.parser_version = parser_version
+
+    def _path(self, timestamp: str) -> Path:
+        return self.cache_dir / f"{timestamp}.json"
+
+    def load(self, timestamp: str, fingerprint: str) -> Optional[List[Dict]]:
+        """Cached rows for this exact session content and parser version, or None."""
+        try:
+            entry = json_io.load_file(self._path(timestamp))
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('parser_version') != self.parser_version or entry.get('fingerprint') != fingerprint:
+            return None
+
+        columns = entry['columns']
+        return [dict(zip(columns, values)) for values in entry['rows']]
+
+    def store(self, timestamp: str, fingerprint: str, rows: List[Dict]):
+        """Write a session's rows, replacing any older entry for the timestamp."""
+        columns = list(rows[0].keys()) if rows else []
+        entry = {
+            'parser_version': self.parser_version,
+            'fingerprint': fingerprint,
+            'columns': columns,
+            'rows': [[row[column] for column in columns] for row in rows],
+        }
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write atomically so a crashed or concurrent writer never leaves a torn file
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{timestamp}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json_io.dumps_bytes(entry))
+            os.replace(temp_path, self._path(timestamp))
+        except OSError as e:
+            print(f"Warning: Could not write parse cache for {timestamp}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
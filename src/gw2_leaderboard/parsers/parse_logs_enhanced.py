@@ -4,18 +4,38 @@ Enhanced parser for GW2 log summaries to extract comprehensive player performanc
 Extracts 8 performance metrics: DPS, Healing/sec, Barrier/sec, Cleanses/sec, Strips/sec, Stability/sec, Resistance/sec, Might/sec
 """
 
-import json
+import hashlib
+import io
+import os
 import re
 import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
 from pathlib import Path
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional
 import argparse
 from datetime import datetime, date
+from . import tiddly_table
+from ..core.glicko_rating_system import SESSION_SCORES_SCHEMA, store_session_scores
+from .bulk_writer import BulkWriter, DEFAULT_BATCH_SIZE
 from .high_scores_parser import HighScoresParser
+from .parse_cache import ParseCache
+from .session_source import EliteInsightsSession, SessionSource, as_session_source
 
+# Version of the table extraction in extract_raw_performances(). Bump it when
+# extraction output changes so cached raw rows are parsed again.
+PARSER_VERSION = 2
 
-@dataclass
+
+# Slotted rows drop the per-instance __dict__, which is most of a row's
+# footprint; dataclass(slots=True) needs Python 3.10+.
+_ROW_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_ROW_DATACLASS_OPTIONS)
 class PlayerPerformance:
     timestamp: str
     player_name: str
@@ -44,12 +64,15 @@ class PlayerPerformance:
     down_contribution_per_sec: float = 0.0
     # Burst Metrics
     burst_damage_1s: int = 0  # Bur-Total (1)s - for High Scores section
-    burst_consistency_1s: int = 0  # Ch5Ca-Total (1)s - for Glicko rating
+    burst_consistency_1s: Optional[int] = 0  # Ch5Ca-Total (1)s - for Glicko rating; None for Elite Insights sessions
     # Positioning Metrics
     distance_from_tag_avg: float = 0.0  # Average distance from tag in game units
     # APM Metrics (Actions Per Minute)
     apm_total: float = 0.0  # Total actions per minute
     apm_no_auto: float = 0.0  # Actions per minute excluding auto-attacks
+    # Classification (see classify_performances)
+    base_profession: Optional[str] = None  # Profession as logged, before build variant detection
+    fight_time_outlier: bool = False  # Stored apart from the rated rows
     # Date fields
     parsed_date: date = None
 
@@ -69,38 +92,23 @@ def parse_timestamp_to_date(timestamp: str) -> date:
 
 def extract_tooltip(text: str) -> str:
     """Extract account name from tooltip attribute."""
-    # Try both single and double quotes
-    match = re.search(r'data-tooltip=["\']([^"\']+)["\']', text)
-    return match.group(1) if match else ""
+    return tiddly_table.tooltip(text)
 
 
 def extract_span_value(text: str) -> float:
     """Extract numeric value from HTML span tags, handling tooltips."""
-    # Handle cases like: <span data-tooltip="X.XX Wasted">Y.Y</span>
-    span_match = re.search(r'<span[^>]*>([0-9,]+\.?[0-9]*)</span>', text)
-    if span_match:
-        return float(span_match.group(1).replace(',', ''))
-    
-    # Handle direct numeric values
-    direct_match = re.search(r'([0-9,]+\.?[0-9]*)', text.strip())
-    if direct_match and text.strip() != '-':
-        return float(direct_match.group(1).replace(',', ''))
-    
-    return 0.0
+    return tiddly_table.span_number(text)
 
 
 def parse_damage_table(damage_text: str) -> List[Dict]:
     """Parse the damage table from TiddlyWiki markup."""
     players = []
     
-    lines = damage_text.split('\n')
-    data_rows = [line for line in lines if line.startswith('|') and not line.startswith('|!') and not line.startswith('|thead')]
-    
-    for row in data_rows:
-        if '|h' in row or not row.strip():
+    for row in tiddly_table.data_rows(damage_text.split('\n')):
+        if '|h' in row.line:
             continue
             
-        cells = [cell.strip() for cell in row.split('|') if cell.strip()]
+        cells = row.cells
         
         if len(cells) < 14:
             continue
@@ -108,25 +116,19 @@ def parse_damage_table(damage_text: str) -> List[Dict]:
         try:
             party = int(cells[0]) if cells[0].isdigit() else 0
             
-            # Parse player name and account
-            name_cell = cells[1]
-            account_name = extract_tooltip(name_cell)
-            display_match = re.search(r'>([^<]+)</span>', name_cell)
-            player_name = display_match.group(1) if display_match else ""
-            
-            # Parse profession
-            prof_cell = cells[2]
-            prof_match = re.search(r'{{(\w+)}}', prof_cell)
-            profession = prof_match.group(1) if prof_match else ""
+            # Parse player name, account and profession
+            account_name, profession = row.identity(1, 2)
+            player_name = tiddly_table.display_name(cells[1])
             
             # Parse numeric values
-            fight_time = float(cells[3].replace(',', '')) if cells[3].replace(',', '').replace('.', '').isdigit() else 0
-            target_damage = int(cells[4].replace(',', '')) if cells[4].replace(',', '').isdigit() else 0
-            target_dps = int(cells[5].replace(',', '')) if cells[5].replace(',', '').isdigit() else 0
+            fight_time_text = cells[3].replace(',', '')
+            fight_time = float(fight_time_text) if fight_time_text.replace('.', '').isdigit() else 0
+            target_damage = tiddly_table.int_cell(cells[4])
+            target_dps = tiddly_table.int_cell(cells[5])
             # Condition damage columns (Target_Condition and Target_Condition_PS)
-            target_condition_damage = int(cells[8].replace(',', '')) if len(cells) > 8 and cells[8].replace(',', '').isdigit() else 0
-            target_condition_dps = int(cells[9].replace(',', '')) if len(cells) > 9 and cells[9].replace(',', '').isdigit() else 0
-            all_damage = int(cells[11].replace(',', '')) if cells[11].replace(',', '').isdigit() else 0
+            target_condition_damage = tiddly_table.int_cell(cells[8])
+            target_condition_dps = tiddly_table.int_cell(cells[9])
+            all_damage = tiddly_table.int_cell(cells[11])
             players.append({
                 'party': party,
                 'player_name': player_name,
@@ -141,7 +143,7 @@ def parse_damage_table(damage_text: str) -> List[Dict]:
             })
             
         except (ValueError, IndexError) as e:
-            print(f"Error parsing damage row: {row[:100]}... - {e}")
+            print(f"Error parsing damage row: {row.line[:100]}... - {e}")
             continue
     
     return players
@@ -156,40 +158,27 @@ def parse_offensive_table(offensive_text: str) -> Dict[str, Dict]:
     total_section_end = offensive_text.find('</$reveal>', total_section_start)
     
     if total_section_start == -1 or total_section_end == -1:
-        print(f"Warning: Could not find Total section in offensive table for {timestamp}")
+        print("Warning: Could not find Total section in offensive table")
         return offensive_stats
         
     total_section = offensive_text[total_section_start:total_section_end]
     
-    lines = total_section.split('\n')
-    data_rows = [line for line in lines if line.startswith('|') and not line.startswith('|!') and not line.startswith('|thead')]
-    
-    
-    for row in data_rows:
-        if '|h' in row or not row.strip() or '<$radio' in row:
+    for row in tiddly_table.data_rows(total_section.split('\n')):
+        if '|h' in row.line or '<$radio' in row.line:
             continue
             
-        cells = [cell.strip() for cell in row.split('|') if cell.strip()]
+        cells = row.cells
         
         if len(cells) < 22:  # Need at least 22 columns for downContribution
             continue
             
         try:
-            # Parse player name and account
-            name_cell = cells[1]
-            account_name = extract_tooltip(name_cell)
+            account_name, profession = row.identity(1, 2)
             if not account_name:
                 continue
-                
-            # Parse profession
-            prof_cell = cells[2]
-            prof_match = re.search(r'{{(\w+)}}', prof_cell)
-            profession = prof_match.group(1) if prof_match else ""
-            
             
             # Extract downContribution from column 21 (0-based indexing)
-            down_contribution = int(cells[21].replace(',', '')) if len(cells) > 21 and cells[21].replace(',', '').isdigit() else 0
-            
+            down_contribution = tiddly_table.int_cell(cells[21])
             
             key = f"{account_name}_{profession}"
             offensive_stats[key] = {
@@ -198,9 +187,8 @@ def parse_offensive_table(offensive_text: str) -> Dict[str, Dict]:
                 'down_contribution': down_contribution
             }
             
-            
         except (ValueError, IndexError) as e:
-            print(f"Error parsing offensive row: {row[:100]}... - {e}")
+            print(f"Error parsing offensive row: {row.line[:100]}... - {e}")
             continue
     
     return offensive_stats
@@ -211,44 +199,28 @@ def parse_heal_table(heal_text: str) -> Dict[str, Dict]:
     heal_stats = {}
     
     # Find the Squad section specifically
-    squad_section_start = heal_text.find('stateField="category_heal" type="match" text="Squad"')
-    if squad_section_start == -1:
+    squad_text = tiddly_table.section(heal_text, 'stateField="category_heal" type="match" text="Squad"')
+    if squad_text is None:
         return heal_stats
     
-    # Find the end of the Squad section
-    squad_section_end = heal_text.find('</$reveal>', squad_section_start)
-    if squad_section_end == -1:
-        squad_section_end = len(heal_text)
-    
-    squad_text = heal_text[squad_section_start:squad_section_end]
-    
-    lines = squad_text.split('\n')
-    data_rows = [line for line in lines if line.startswith('|') and not line.startswith('|!') and not line.startswith('|thead')]
-    
-    for row in data_rows:
-        if '|h' in row or not row.strip() or 'Total' in row or 'Squad' in row or '</$radio>' in row:
+    for row in tiddly_table.data_rows(squad_text.split('\n')):
+        line = row.line
+        if '|h' in line or 'Total' in line or 'Squad' in line or '</$radio>' in line:
             continue
             
-        cells = [cell.strip() for cell in row.split('|') if cell.strip()]
+        cells = row.cells
         
         if len(cells) < 7:
             continue
             
         try:
-            # Parse player name and account
-            name_cell = cells[1]
-            account_name = extract_tooltip(name_cell)
+            account_name, profession = row.identity(1, 2)
             if not account_name:
                 continue
-                
-            # Parse profession
-            prof_cell = cells[2]
-            prof_match = re.search(r'{{(\w+)}}', prof_cell)
-            profession = prof_match.group(1) if prof_match else ""
             
             # Parse healing and barrier per second
-            healing_ps = extract_span_value(cells[5]) if len(cells) > 5 else 0.0
-            barrier_ps = extract_span_value(cells[7]) if len(cells) > 7 else 0.0
+            healing_ps = tiddly_table.span_number(cells[5])
+            barrier_ps = tiddly_table.span_number(cells[7]) if len(cells) > 7 else 0.0
             
             key = f"{account_name}_{profession}"
             heal_stats[key] = {
@@ -259,7 +231,7 @@ def parse_heal_table(heal_text: str) -> Dict[str, Dict]:
             }
             
         except (ValueError, IndexError) as e:
-            print(f"Error parsing heal row: {row[:100]}... - {e}")
+            print(f"Error parsing heal row: {line[:100]}... - {e}")
             continue
     
     return heal_stats
@@ -269,45 +241,26 @@ def parse_support_table(support_text: str) -> Dict[str, Dict]:
     """Parse condition cleanses and boon strips from support table."""
     support_stats = {}
     
-    # Look for the "Stat/1s" section which has per-second values
-    lines = support_text.split('\n')
-    in_stats_section = False
+    # Only the "Stat/1s" section has per-second values
+    stats_lines = tiddly_table.reveal_block_lines(support_text, 'Stat/1s')
     
-    for line in lines:
-        if 'Stat/1s' in line and 'animate="yes"' in line:
-            in_stats_section = True
-            continue
-        elif 'animate="yes"' in line and in_stats_section:
-            break
-        elif not in_stats_section:
-            continue
-            
-        if not line.startswith('|') or line.startswith('|!') or line.startswith('|thead'):
+    for row in tiddly_table.data_rows(stats_lines):
+        if '|h' in row.line:
             continue
             
-        if '|h' in line or not line.strip():
-            continue
-            
-        cells = [cell.strip() for cell in line.split('|') if cell.strip()]
+        cells = row.cells
         
         if len(cells) < 10:
             continue
             
         try:
-            # Parse player name and account
-            name_cell = cells[1]
-            account_name = extract_tooltip(name_cell)
+            account_name, profession = row.identity(1, 2)
             if not account_name:
                 continue
-                
-            # Parse profession
-            prof_cell = cells[2]
-            prof_match = re.search(r'{{(\w+)}}', prof_cell)
-            profession = prof_match.group(1) if prof_match else ""
             
             # Parse cleanses and strips per second (already per-second in this table)
-            cleanses_ps = extract_span_value(cells[4]) if len(cells) > 4 else 0.0
-            strips_ps = extract_span_value(cells[8]) if len(cells) > 8 else 0.0
+            cleanses_ps = tiddly_table.span_number(cells[4])
+            strips_ps = tiddly_table.span_number(cells[8])
             
             key = f"{account_name}_{profession}"
             support_stats[key] = {
@@ -318,7 +271,7 @@ def parse_support_table(support_text: str) -> Dict[str, Dict]:
             }
             
         except (ValueError, IndexError) as e:
-            print(f"Error parsing support row: {line[:100]}... - {e}")
+            print(f"Error parsing support row: {row.line[:100]}... - {e}")
             continue
     
     return support_stats
@@ -328,48 +281,29 @@ def parse_boon_generation_table(boon_text: str) -> Dict[str, Dict]:
     """Parse boon generation stats (Stability, Resistance, Might) from squad generation table."""
     boon_stats = {}
     
-    # Look for the "Average" section which has per-second values
-    lines = boon_text.split('\n')
-    in_average_section = False
+    # Only the "Average" section has per-second values
+    average_lines = tiddly_table.reveal_block_lines(boon_text, '"Average"')
     
-    for line in lines:
-        if '"Average"' in line and 'animate="yes"' in line:
-            in_average_section = True
-            continue
-        elif 'animate="yes"' in line and in_average_section:
-            break
-        elif not in_average_section:
-            continue
-            
-        if not line.startswith('|') or line.startswith('|!') or line.startswith('|thead'):
-            continue
-            
-        if '|h' in line or not line.strip():
+    for row in tiddly_table.data_rows(average_lines):
+        if '|h' in row.line:
             continue
             
-        cells = [cell.strip() for cell in line.split('|') if cell.strip()]
+        cells = row.cells
         
         if len(cells) < 15:  # Need enough columns for boon data
             continue
             
         try:
-            # Parse player name and account
-            name_cell = cells[1]
-            account_name = extract_tooltip(name_cell)
+            account_name, profession = row.identity(1, 2)
             if not account_name:
                 continue
-                
-            # Parse profession
-            prof_cell = cells[2]
-            prof_match = re.search(r'{{(\w+)}}', prof_cell)
-            profession = prof_match.group(1) if prof_match else ""
             
             # Find boon columns based on header pattern
             # Standard order: Might, Fury, Quickness, Alacrity, Protection, Regeneration, Vigor, Aegis, Stability, Swiftness, Resistance, Resolution, Superspeed, Stealth
-            might_ps = extract_span_value(cells[4]) if len(cells) > 4 else 0.0  # Might column
-            protection_ps = extract_span_value(cells[8]) if len(cells) > 8 else 0.0  # Protection column
-            stability_ps = extract_span_value(cells[12]) if len(cells) > 12 else 0.0  # Stability column
-            resistance_ps = extract_span_value(cells[14]) if len(cells) > 14 else 0.0  # Resistance column
+            might_ps = tiddly_table.span_number(cells[4])  # Might column
+            protection_ps = tiddly_table.span_number(cells[8])  # Protection column
+            stability_ps = tiddly_table.span_number(cells[12])  # Stability column
+            resistance_ps = tiddly_table.span_number(cells[14])  # Resistance column
             
             key = f"{account_name}_{profession}"
             boon_stats[key] = {
@@ -382,132 +316,78 @@ def parse_boon_generation_table(boon_text: str) -> Dict[str, Dict]:
             }
             
         except (ValueError, IndexError) as e:
-            print(f"Error parsing boon row: {line[:100]}... - {e}")
+            print(f"Error parsing boon row: {row.line[:100]}... - {e}")
             continue
     
     return boon_stats
 
 
-def parse_burst_damage_table(burst_text: str) -> Dict[str, Dict]:
-    """Parse Bur-Total (1)s data for highest 1-second burst damage."""
-    burst_stats = {}
-    
-    lines = burst_text.split('\n')
-    data_rows = [line for line in lines if line.startswith('|') and not line.startswith('|!') and not line.startswith('|thead')]
-    
-    for row in data_rows:
-        if '|h' in row or not row.strip() or '|!' in row or '|c' in row:
+def _parse_dps_stats_table(text: str, field: str, label: str) -> Dict[str, Dict]:
+    """Parse the (1)s column of a DPS-Stats table into {key: {field: value}}."""
+    stats = {}
+    
+    # Keep empty columns so indexes stay positional
+    for row in tiddly_table.data_rows(text.split('\n'), tiddly_table.positional_cells):
+        line = row.line
+        if '|h' in line or '|!' in line or '|c' in line:
             continue
             
         try:
-            cells = [cell.strip() for cell in row.split('|')[1:-1]]  # Remove empty first/last
+            cells = row.cells
             if len(cells) < 6:
                 continue
             
-            # Extract account name from tooltip
-            name_cell = cells[0]
-            account_name = extract_tooltip(name_cell)
+            account_name, profession = row.identity(0, 1)
             if not account_name:
                 continue
-                
-            # Parse profession
-            prof_cell = cells[1]
-            prof_match = re.search(r'{{(\w+)}}', prof_cell)
-            profession = prof_match.group(1) if prof_match else ""
             
-            # Extract Bur-Total (1)s value - should be column 5 (0-indexed)
-            burst_1s_cell = cells[5] if len(cells) > 5 else ""
-            burst_1s = extract_span_value(burst_1s_cell) if burst_1s_cell else 0
+            # The (1)s value is column 5 (0-indexed)
+            value = tiddly_table.span_number(cells[5]) if cells[5] else 0
             
             key = f"{account_name}_{profession}"
-            burst_stats[key] = {
+            stats[key] = {
                 'account_name': account_name,
                 'profession': profession,
-                'burst_damage_1s': int(burst_1s)
+                field: int(value)
             }
             
         except (ValueError, IndexError) as e:
-            print(f"Error parsing burst damage row: {row[:100]}... - {e}")
+            print(f"Error parsing {label} row: {line[:100]}... - {e}")
             continue
     
-    return burst_stats
+    return stats
+
+
+def parse_burst_damage_table(burst_text: str) -> Dict[str, Dict]:
+    """Parse Bur-Total (1)s data for highest 1-second burst damage."""
+    return _parse_dps_stats_table(burst_text, 'burst_damage_1s', 'burst damage')
 
 
 def parse_burst_consistency_table(consistency_text: str) -> Dict[str, Dict]:
     """Parse Ch5Ca-Total (1)s data for burst consistency (Glicko rating)."""
-    consistency_stats = {}
-    
-    lines = consistency_text.split('\n')
-    data_rows = [line for line in lines if line.startswith('|') and not line.startswith('|!') and not line.startswith('|thead')]
-    
-    for row in data_rows:
-        if '|h' in row or not row.strip() or '|!' in row or '|c' in row:
-            continue
-            
-        try:
-            cells = [cell.strip() for cell in row.split('|')[1:-1]]  # Remove empty first/last
-            if len(cells) < 6:
-                continue
-            
-            # Extract account name from tooltip
-            name_cell = cells[0]
-            account_name = extract_tooltip(name_cell)
-            if not account_name:
-                continue
-                
-            # Parse profession
-            prof_cell = cells[1]
-            prof_match = re.search(r'{{(\w+)}}', prof_cell)
-            profession = prof_match.group(1) if prof_match else ""
-            
-            # Extract Ch5Ca-Total (1)s value - should be column 5 (0-indexed)
-            consistency_1s_cell = cells[5] if len(cells) > 5 else ""
-            consistency_1s = extract_span_value(consistency_1s_cell) if consistency_1s_cell else 0
-            
-            key = f"{account_name}_{profession}"
-            consistency_stats[key] = {
-                'account_name': account_name,
-                'profession': profession,
-                'burst_consistency_1s': int(consistency_1s)
-            }
-            
-        except (ValueError, IndexError) as e:
-            print(f"Error parsing burst consistency row: {row[:100]}... - {e}")
-            continue
-    
-    return consistency_stats
+    return _parse_dps_stats_table(consistency_text, 'burst_consistency_1s', 'burst consistency')
 
 
 def parse_on_tag_review_table(on_tag_text: str) -> Dict[str, Dict]:
     """Parse Player On Tag Review data for average distance from tag."""
     on_tag_stats = {}
     
-    lines = on_tag_text.split('\n')
-    data_rows = [line for line in lines if line.startswith('|') and not line.startswith('|!') and not line.startswith('|thead')]
-    
-    for row in data_rows:
-        if '|h' in row or not row.strip() or '|!' in row or '|c' in row or 'On Tag Review' in row:
+    for row in tiddly_table.data_rows(on_tag_text.split('\n')):
+        line = row.line
+        if '|h' in line or '|!' in line or '|c' in line or 'On Tag Review' in line:
             continue
             
         try:
-            cells = [cell.strip() for cell in row.split('|') if cell.strip()]
+            cells = row.cells
             if len(cells) < 3:
                 continue
             
-            # Extract account name from tooltip
-            name_cell = cells[0]
-            account_name = extract_tooltip(name_cell)
+            account_name, profession = row.identity(0, 1)
             if not account_name:
                 continue
-                
-            # Parse profession
-            prof_cell = cells[1]
-            prof_match = re.search(r'{{(\w+)}}', prof_cell)
-            profession = prof_match.group(1) if prof_match else ""
             
             # Extract Avg Dist value (column 2, 0-indexed)
-            avg_dist_cell = cells[2] if len(cells) > 2 else "0"
-            avg_dist = float(avg_dist_cell) if avg_dist_cell.isdigit() else 0.0
+            avg_dist = float(cells[2]) if cells[2].isdigit() else 0.0
             
             key = f"{account_name}_{profession}"
             on_tag_stats[key] = {
@@ -517,7 +397,7 @@ def parse_on_tag_review_table(on_tag_text: str) -> Dict[str, Dict]:
             }
             
         except (ValueError, IndexError) as e:
-            print(f"Error parsing on-tag review row: {row[:100]}... - {e}")
+            print(f"Error parsing on-tag review row: {line[:100]}... - {e}")
             continue
     
     return on_tag_stats
@@ -530,147 +410,126 @@ def parse_skill_usage_apm(skill_usage_text: str) -> Dict[str, Dict]:
     if not skill_usage_text:
         return apm_data
         
-    # Find table rows containing player data
-    # Look for pattern: |Player Name | Profession |Account | FightTime | APM |
-    lines = skill_usage_text.split('\n')
-    
-    for line in lines:
-        # Skip header lines and empty lines
-        if not line.strip() or line.startswith('|!') or line.startswith('|thead') or line.startswith('|c'):
+    # Data rows look like: |Player Name | Profession |Account | FightTime | APM |
+    for row in tiddly_table.data_rows(skill_usage_text.split('\n'), tiddly_table.all_fields):
+        if row.line.startswith('|c'):
+            continue
+            
+        parts = row.cells
+        if len(parts) < 6:  # Need at least player, prof, account, fight_time, apm
             continue
             
-        # Look for data rows (should start with |)
-        if line.startswith('|') and '|' in line:
-            parts = [part.strip() for part in line.split('|')]
-            if len(parts) >= 6:  # Need at least player, prof, account, fight_time, apm
-                try:
-                    player_name = parts[1]
-                    account = parts[3]
-                    apm_raw = parts[5]  # Should be format like "51/29"
-                    
-                    # Skip empty or header rows
-                    if not player_name or not account or not apm_raw or 'APM' in apm_raw:
-                        continue
-                        
-                    # Parse APM format "total/no_auto"
-                    if '/' in apm_raw:
-                        apm_parts = apm_raw.split('/')
-                        if len(apm_parts) == 2:
-                            try:
-                                apm_total = float(apm_parts[0])
-                                apm_no_auto = float(apm_parts[1])
-                                
-                                apm_data[account] = {
-                                    'apm_total': apm_total,
-                                    'apm_no_auto': apm_no_auto
-                                }
-                            except ValueError:
-                                continue  # Skip invalid APM values
-                                
-                except (IndexError, ValueError):
-                    continue  # Skip malformed rows
+        player_name = parts[1]
+        account = parts[3]
+        apm_raw = parts[5]  # Should be format like "51/29"
+        
+        # Skip empty or header rows
+        if not player_name or not account or not apm_raw or 'APM' in apm_raw:
+            continue
+            
+        # Parse APM format "total/no_auto"
+        apm_parts = apm_raw.split('/')
+        if len(apm_parts) == 2:
+            try:
+                apm_data[account] = {
+                    'apm_total': float(apm_parts[0]),
+                    'apm_no_auto': float(apm_parts[1])
+                }
+            except ValueError:
+                continue  # Skip invalid APM values
     
     return apm_data
 
 
-def parse_log_directory(log_dir: Path) -> List[PlayerPerformance]:
-    """Parse a single log directory and extract comprehensive player performance data."""
-    timestamp = log_dir.name
+def extract_raw_performances(source) -> List[PlayerPerformance]:
+    """
+    Extract merged per-player rows from a session's tables, before filtering and build detection.
+    
+    source is a session directory or a session_source.MemorySession.
+    Elite Insights sessions are read by ei_json_adapter instead of the
+    table parsers.
+    """
+    session = as_session_source(source)
+    timestamp = session.timestamp
+    if isinstance(session, EliteInsightsSession):
+        return _performances_from_ei_exports(session)
+    
+    def table_text(suffix: str) -> Optional[str]:
+        tiddler = session.tiddler(suffix)
+        return tiddler.get('text', '') if tiddler is not None else None
     
     # Read damage data (base data)
-    damage_file = log_dir / f"{timestamp}-Damage.json"
-    if not damage_file.exists():
+    damage_text = table_text('Damage')
+    if damage_text is None:
         print(f"No damage file found for {timestamp}")
         return []
     
-    with open(damage_file, 'r', encoding='utf-8') as f:
-        damage_data = json.load(f)
-    
-    damage_text = damage_data.get('text', '')
     players_data = parse_damage_table(damage_text)
     
     # Read offensive data for downContribution
     offensive_stats = {}
-    offensive_file = log_dir / f"{timestamp}-Offensive.json"
-    if offensive_file.exists():
-        with open(offensive_file, 'r', encoding='utf-8') as f:
-            offensive_data = json.load(f)
-        offensive_stats = parse_offensive_table(offensive_data.get('text', ''))
+    offensive_text = table_text('Offensive')
+    if offensive_text is not None:
+        offensive_stats = parse_offensive_table(offensive_text)
     
     # Read healing data
     heal_stats = {}
-    heal_file = log_dir / f"{timestamp}-Heal-Stats.json"
-    if heal_file.exists():
-        with open(heal_file, 'r', encoding='utf-8') as f:
-            heal_data = json.load(f)
-        heal_stats = parse_heal_table(heal_data.get('text', ''))
+    heal_text = table_text('Heal-Stats')
+    if heal_text is not None:
+        heal_stats = parse_heal_table(heal_text)
     
     # Read support data
     support_stats = {}
-    support_file = log_dir / f"{timestamp}-Support.json"
-    if support_file.exists():
-        with open(support_file, 'r', encoding='utf-8') as f:
-            support_data = json.load(f)
-        support_stats = parse_support_table(support_data.get('text', ''))
+    support_text = table_text('Support')
+    if support_text is not None:
+        support_stats = parse_support_table(support_text)
     
     # Read boon generation data
     boon_stats = {}
-    boon_file = log_dir / f"{timestamp}-Squad-Generation.json"
-    if boon_file.exists():
-        with open(boon_file, 'r', encoding='utf-8') as f:
-            boon_data = json.load(f)
-        boon_stats = parse_boon_generation_table(boon_data.get('text', ''))
+    boon_text = table_text('Squad-Generation')
+    if boon_text is not None:
+        boon_stats = parse_boon_generation_table(boon_text)
     
     # Read burst damage data (Bur-Total)
     burst_damage_stats = {}
-    burst_damage_file = log_dir / f"{timestamp}-DPS-Stats-Bur-Total.json"
-    if burst_damage_file.exists():
-        with open(burst_damage_file, 'r', encoding='utf-8') as f:
-            burst_damage_data = json.load(f)
-        burst_damage_stats = parse_burst_damage_table(burst_damage_data.get('text', ''))
+    burst_damage_text = table_text('DPS-Stats-Bur-Total')
+    if burst_damage_text is not None:
+        burst_damage_stats = parse_burst_damage_table(burst_damage_text)
     
     # Read burst consistency data (Ch5Ca-Total)
     burst_consistency_stats = {}
-    burst_consistency_file = log_dir / f"{timestamp}-DPS-Stats-Ch5Ca-Total.json"
-    if burst_consistency_file.exists():
-        with open(burst_consistency_file, 'r', encoding='utf-8') as f:
-            burst_consistency_data = json.load(f)
-        burst_consistency_stats = parse_burst_consistency_table(burst_consistency_data.get('text', ''))
+    burst_consistency_text = table_text('DPS-Stats-Ch5Ca-Total')
+    if burst_consistency_text is not None:
+        burst_consistency_stats = parse_burst_consistency_table(burst_consistency_text)
     
     # Read on-tag review data
     on_tag_stats = {}
-    on_tag_file = log_dir / f"{timestamp}-On-Tag-Review.json"
-    if on_tag_file.exists():
-        with open(on_tag_file, 'r', encoding='utf-8') as f:
-            on_tag_data = json.load(f)
-        on_tag_stats = parse_on_tag_review_table(on_tag_data.get('text', ''))
+    on_tag_text = table_text('On-Tag-Review')
+    if on_tag_text is not None:
+        on_tag_stats = parse_on_tag_review_table(on_tag_text)
     
     # Read skill usage data for APM
     apm_stats = {}
-    skill_usage_file = log_dir / f"{timestamp}-Skill-Usage.json"
-    if skill_usage_file.exists():
-        with open(skill_usage_file, 'r', encoding='utf-8') as f:
-            skill_usage_data = json.load(f)
-        # The main skill usage file is a macro, we need to check individual profession files
-        
-        # Try to get profession-specific skill usage files
-        for skill_usage_prof_file in log_dir.glob(f"{timestamp}-Skill-Usage-*.json"):
+    if session.tiddler('Skill-Usage') is not None:
+        # The main skill usage tiddler is a macro, we need to check individual profession tiddlers
+        for prof_skill_name, load_prof_skill_data in session.tiddler_loaders('Skill-Usage-'):
             try:
-                with open(skill_usage_prof_file, 'r', encoding='utf-8') as f:
-                    prof_skill_data = json.load(f)
+                prof_skill_data = load_prof_skill_data()
                 prof_apm_data = parse_skill_usage_apm(prof_skill_data.get('text', ''))
                 apm_stats.update(prof_apm_data)
             except Exception as e:
-                print(f"Warning: Could not parse skill usage file {skill_usage_prof_file}: {e}")
+                print(f"Warning: Could not parse skill usage file {prof_skill_name}: {e}")
     
-    # Combine all stats into PlayerPerformance objects
+    # Combine all stats into PlayerPerformance objects. Rows share one date
+    # object, and names are interned since they repeat across sessions.
+    parsed_date = parse_timestamp_to_date(timestamp)
     performances = []
     for player_data in players_data:
         if not player_data['player_name'] or not player_data['account_name']:
             continue
         
-        account = player_data['account_name']
-        profession = player_data['profession']
+        account = sys.intern(player_data['account_name'])
+        profession = sys.intern(player_data['profession'])
         key = f"{account}_{profession}"
         
         # Get additional stats (using original profession name for key matching)
@@ -685,8 +544,8 @@ def parse_log_directory(log_dir: Path) -> List[PlayerPerformance]:
         
         performance = PlayerPerformance(
             timestamp=timestamp,
-            parsed_date=parse_timestamp_to_date(timestamp),
-            player_name=player_data['player_name'],
+            parsed_date=parsed_date,
+            player_name=sys.intern(player_data['player_name']),
             account_name=account,
             profession=profession,
             party=player_data['party'],
@@ -713,33 +572,137 @@ def parse_log_directory(log_dir: Path) -> List[PlayerPerformance]:
         )
         performances.append(performance)
     
+    return performances
+
+
+def _performances_from_ei_exports(session: EliteInsightsSession) -> List[PlayerPerformance]:
+    """Raw rows for a session of Elite Insights exports."""
+    player_rows = session.summary().player_rows
+    if not player_rows:
+        print(f"No squad players in the Elite Insights exports for {session.timestamp}")
+        return []
+    parsed_date = parse_timestamp_to_date(session.timestamp)
+    performances = []
+    for row in player_rows:
+        for field in ('player_name', 'account_name', 'profession'):
+            row[field] = sys.intern(row[field])
+        performances.append(PlayerPerformance(timestamp=session.timestamp, parsed_date=parsed_date, **row))
+    return performances
+
+
+def classify_performances(performances: List[PlayerPerformance],
+                          keep_outliers: bool = False) -> List[PlayerPerformance]:
+    """
+    Apply the session rules to raw rows: outlier filtering, then build variant detection.
+    
+    Every row records its logged profession in base_profession. With
+    keep_outliers, fight time outliers are flagged and returned after the
+    other rows instead of being dropped, so ingest can store them for
+    reclassify_performances().
+    """
+    for performance in performances:
+        if performance.base_profession is None:
+            performance.base_profession = performance.profession
+    
     # Filter fight time outliers before build detection
-    performances = filter_fight_time_outliers(performances)
+    kept = filter_fight_time_outliers(list(performances))
     
     # Apply build detection to classify variants
-    performances = detect_build_variants(performances)
-    
+    kept = detect_build_variants(kept)
+    if not keep_outliers:
+        return kept
+    
+    kept_ids = {id(performance) for performance in kept}
+    outliers = [performance for performance in performances if id(performance) not in kept_ids]
+    for outlier in outliers:
+        outlier.fight_time_outlier = True
+    return kept + outliers
+
+
+def _raw_row(performance: PlayerPerformance) -> Dict:
+    row = asdict(performance)
+    del row['parsed_date']  # Derived from the timestamp on load
+    # Set by classification, which always re-runs on cached rows
+    del row['base_profession'], row['fight_time_outlier']
+    return row
+
+
+def _performances_from_raw_rows(rows: List[Dict]) -> List[PlayerPerformance]:
+    parsed_date = parse_timestamp_to_date(rows[0]['timestamp']) if rows else None
+    performances = []
+    for row in rows:
+        for field in ('player_name', 'account_name', 'profession'):
+            row[field] = sys.intern(row[field])
+        performances.append(PlayerPerformance(parsed_date=parsed_date, **row))
     return performances
 
 
+def parse_log_directory(log_dir, cache: Optional[ParseCache] = None,
+                        keep_outliers: bool = False) -> List[PlayerPerformance]:
+    """
+    Parse a single log directory and extract comprehensive player performance data.
+    
+    log_dir may also be an in-memory session (session_source.MemorySession).
+    With a cache, raw rows for unchanged session content are loaded instead of
+    re-parsing the tables; classification always runs on the current rules.
+    keep_outliers is passed on to classify_performances().
+    """
+    session = as_session_source(log_dir)
+    if cache is None:
+        return classify_performances(extract_raw_performances(session), keep_outliers)
+    
+    fingerprint = session.fingerprint()
+    rows = cache.load(session.timestamp, fingerprint)
+    if rows is not None:
+        print("  Using cached table data")
+        performances = _performances_from_raw_rows(rows)
+    else:
+        performances = extract_raw_performances(session)
+        cache.store(session.timestamp, fingerprint, [_raw_row(p) for p in performances])
+    
+    return classify_performances(performances, keep_outliers)
+
+
+# Fight time outlier rules, shared by filter_fight_time_outliers() and
+# reclassify_performances(). Sessions with fewer players are not filtered.
+OUTLIER_MIN_PLAYERS = 5
+# Players with at least this much fight time (seconds) are always kept
+OUTLIER_HARD_MINIMUM = 300.0
+# Shorter players are outliers below this share of the session's median fight time...
+OUTLIER_MEDIAN_SHARE = 0.25
+# ...provided outliers are less than this fraction of the session
+OUTLIER_MAX_FRACTION = 0.2
+
+# Build variant rules, applied to a session's rows after outlier filtering:
+# (logged profession, variant, field, multiplier, minimum). The threshold is
+# the session mean of the field's non-zero values times multiplier (when at
+# least two players have one), but never below minimum; a multiplier of None
+# makes minimum a flat threshold. Rows at or above it become the variant.
+BUILD_VARIANT_RULES = [
+    ('Firebrand', 'Condi Firebrand', 'target_condition_dps', 1.5, 200),
+    ('Spellbreaker', 'Support Spb', 'resistance_gen_per_sec', 1.2, 0.5),
+    ('Catalyst', 'Boon Cata', 'resistance_gen_per_sec', None, 0.3),
+    ('Dragonhunter', 'China DH', 'stability_gen_per_sec', 1.2, 3.0),
+    ('Vindicator', 'Boon Vindi', 'protection_gen_per_sec', 1.2, 1.0),
+]
+
+
 def filter_fight_time_outliers(performances: List[PlayerPerformance]) -> List[PlayerPerformance]:
     """
     Filter out players with extremely short fight times that dilute the data.
+    The list is filtered in place and returned.
     Hard threshold: Always keep players with >= 300 seconds (5 minutes) of fight time.
     For shorter durations, uses median-based filtering for clear outliers.
     """
-    if not performances or len(performances) < 5:  # Need minimum sample size
+    if not performances or len(performances) < OUTLIER_MIN_PLAYERS:  # Need minimum sample size
         return performances
     
-    # Hard threshold: always keep players with >= 300 seconds
-    HARD_MINIMUM = 300.0
-    
     # Extract fight times for analysis
     fight_times = [p.fight_time for p in performances]
     fight_times.sort()
     
     # Count players below hard minimum
-    below_hard_minimum = [p for p in performances if p.fight_time < HARD_MINIMUM]
+    below_hard_minimum = [p for p in performances if p.fight_time < OUTLIER_HARD_MINIMUM]
     
     if len(below_hard_minimum) == 0:
         return performances  # No one below 5 minutes, no filtering needed
@@ -749,16 +712,17 @@ def filter_fight_time_outliers(performances: List[PlayerPerformance]) -> List[Pl
     median_time = statistics.median(fight_times)
     
     # Define very short outliers as those with less than 25% of median fight time
-    outlier_threshold = min(median_time * 0.25, HARD_MINIMUM)
+    outlier_threshold = min(median_time * OUTLIER_MEDIAN_SHARE, OUTLIER_HARD_MINIMUM)
     
     # Find outliers: those below the calculated threshold
     outliers = [p for p in performances if p.fight_time < outlier_threshold]
     outlier_percentage = len(outliers) / len(performances)
     
     # Only filter if there are clear outliers representing a small fraction of players
-    if len(outliers) > 0 and outlier_percentage < 0.2:
-        filtered_performances = [p for p in performances if p.fight_time >= outlier_threshold]
-        removed_count = len(performances) - len(filtered_performances)
+    if len(outliers) > 0 and outlier_percentage < OUTLIER_MAX_FRACTION:
+        original_count = len(performances)
+        performances[:] = [p for p in performances if p.fight_time >= outlier_threshold]
+        removed_count = original_count - len(performances)
         
         if removed_count > 0:
             print(f"  Filtered {removed_count} fight time outliers (< {outlier_threshold:.1f}s, median: {median_time:.1f}s)")
@@ -766,125 +730,43 @@ def filter_fight_time_outliers(performances: List[PlayerPerformance]) -> List[Pl
                 print(f"    Removed: {outlier.account_name} ({outlier.profession}) - {outlier.fight_time:.1f}s")
             if len(outliers) > 5:
                 print(f"    ... and {len(outliers) - 5} more")
-        
-        return filtered_performances
     
     return performances
 
 
 def detect_build_variants(performances: List[PlayerPerformance]) -> List[PlayerPerformance]:
-    """Detect and reclassify build variants based on performance patterns."""
+    """Detect and reclassify build variants based on performance patterns (updates rows in place)."""
     if not performances:
         return performances
     
-    # Calculate session-wide stats for build detection
-    all_condition_dps = [p.target_condition_dps for p in performances if p.target_condition_dps > 0]
-    all_resistance_gen = [p.resistance_gen_per_sec for p in performances if p.resistance_gen_per_sec > 0]
-    all_stability_gen = [p.stability_gen_per_sec for p in performances if p.stability_gen_per_sec > 0]
-    
     import statistics
     
-    # Detect Condi Firebrand: Firebrand with condition DPS significantly above average
-    condi_fb_threshold = 200  # Default minimum threshold
-    if len(all_condition_dps) >= 2:
-        mean_condition_dps = statistics.mean(all_condition_dps)
-        condi_fb_threshold = max(mean_condition_dps * 1.5, 200)
-    
-    # Detect Support Spellbreaker: Spellbreaker with resistance generation significantly above average
-    support_sb_threshold = 0.5  # Default minimum threshold (resistance/sec)
-    if len(all_resistance_gen) >= 2:
-        mean_resistance_gen = statistics.mean(all_resistance_gen)
-        support_sb_threshold = max(mean_resistance_gen * 1.2, 0.5)
-    
-    # Detect Boon Catalyst: Catalyst with resistance generation above flat threshold
-    boon_cata_threshold = 0.3  # Flat minimum threshold (resistance/sec)
-    
-    # Detect China DH: Dragonhunter with stability generation significantly above average
-    china_dh_threshold = 3.0  # Default minimum threshold (stability/sec)
-    if len(all_stability_gen) >= 2:
-        mean_stability_gen = statistics.mean(all_stability_gen)
-        china_dh_threshold = max(mean_stability_gen * 1.2, 3.0)
-    
-    # Detect Boon Vindi: Vindicator with protection generation significantly above average
-    all_protection_gen = [p.protection_gen_per_sec for p in performances if p.protection_gen_per_sec > 0]
-    boon_vindi_threshold = 1.0  # Default minimum threshold (protection/sec)
-    if len(all_protection_gen) >= 2:
-        mean_protection_gen = statistics.mean(all_protection_gen)
-        boon_vindi_threshold = max(mean_protection_gen * 1.2, 1.0)
-    
-    updated_performances = []
+    # Session-wide thresholds, e.g. Condi Firebrand: condition DPS 1.5x the
+    # session average and at least 200
+    variants = {}
+    for profession, variant, field, multiplier, minimum in BUILD_VARIANT_RULES:
+        threshold = minimum
+        if multiplier is not None:
+            values = [getattr(p, field) for p in performances if getattr(p, field) > 0]
+            if len(values) >= 2:
+                threshold = max(statistics.mean(values) * multiplier, minimum)
+        variants[profession] = (variant, field, threshold)
+    
+    # Reclassify in place; only the profession of matching rows changes
     for performance in performances:
-        new_profession = performance.profession  # Default to original
-        
-        # Check for Condi Firebrand
-        if (performance.profession == "Firebrand" and 
-            performance.target_condition_dps >= condi_fb_threshold):
-            new_profession = "Condi Firebrand"
-        
-        # Check for Support Spellbreaker
-        elif (performance.profession == "Spellbreaker" and 
-              performance.resistance_gen_per_sec >= support_sb_threshold):
-            new_profession = "Support Spb"
-        
-        # Check for Boon Catalyst
-        elif (performance.profession == "Catalyst" and 
-              performance.resistance_gen_per_sec >= boon_cata_threshold):
-            new_profession = "Boon Cata"
-        
-        # Check for China DH
-        elif (performance.profession == "Dragonhunter" and 
-              performance.stability_gen_per_sec >= china_dh_threshold):
-            new_profession = "China DH"
-        
-        # Check for Boon Vindi
-        elif (performance.profession == "Vindicator" and 
-              performance.protection_gen_per_sec >= boon_vindi_threshold):
-            new_profession = "Boon Vindi"
-        
-        # Create performance object with potentially updated profession
-        updated_performance = PlayerPerformance(
-            timestamp=performance.timestamp,
-            parsed_date=performance.parsed_date,  # Preserve parsed date
-            player_name=performance.player_name,
-            account_name=performance.account_name,
-            profession=new_profession,  # Use detected profession
-            party=performance.party,
-            fight_time=performance.fight_time,
-            target_damage=performance.target_damage,
-            target_dps=performance.target_dps,
-            all_damage=performance.all_damage,
-            target_condition_damage=performance.target_condition_damage,
-            target_condition_dps=performance.target_condition_dps,
-            healing_per_sec=performance.healing_per_sec,
-            barrier_per_sec=performance.barrier_per_sec,
-            condition_cleanses_per_sec=performance.condition_cleanses_per_sec,
-            boon_strips_per_sec=performance.boon_strips_per_sec,
-            stability_gen_per_sec=performance.stability_gen_per_sec,
-            resistance_gen_per_sec=performance.resistance_gen_per_sec,
-            might_gen_per_sec=performance.might_gen_per_sec,
-            protection_gen_per_sec=performance.protection_gen_per_sec,
-            down_contribution_per_sec=performance.down_contribution_per_sec,
-            burst_damage_1s=performance.burst_damage_1s,
-            burst_consistency_1s=performance.burst_consistency_1s,
-            distance_from_tag_avg=performance.distance_from_tag_avg,
-            apm_total=performance.apm_total,
-            apm_no_auto=performance.apm_no_auto
-        )
-        updated_performances.append(updated_performance)
+        rule = variants.get(performance.profession)
+        if rule is not None:
+            variant, field, threshold = rule
+            if getattr(performance, field) >= threshold:
+                performance.profession = variant
     
-    return updated_performances
+    return performances
 
 
-def create_database(db_path: str):
-    """Create SQLite database with comprehensive player performance schema."""
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Drop existing table to recreate with new schema
-    cursor.execute('DROP TABLE IF EXISTS player_performances')
-    
-    cursor.execute('''
-        CREATE TABLE player_performances (
+# Columns of a stored PlayerPerformance. Fight time outliers are kept in a
+# table of the same shape, player_performance_outliers, so every reader of
+# player_performances keeps seeing only the rows that count.
+PERFORMANCE_COLUMNS_SQL = '''
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
             parsed_date TEXT,
@@ -912,14 +794,22 @@ def create_database(db_path: str):
             distance_from_tag_avg REAL DEFAULT 0.0,
             apm_total REAL DEFAULT 0.0,
             apm_no_auto REAL DEFAULT 0.0,
+            base_profession TEXT,
             UNIQUE(timestamp, account_name, profession)
-        )
-    ''')
-    
-    # Create rating tables for each metric category
-    cursor.execute('DROP TABLE IF EXISTS player_ratings')
-    cursor.execute('''
-        CREATE TABLE player_ratings (
+'''
+
+# Ingest schema. Every statement is idempotent so ensure_database_schema() can
+# run against an existing database without touching its data.
+SCHEMA_STATEMENTS = [
+    f'''
+        CREATE TABLE IF NOT EXISTS player_performances ({PERFORMANCE_COLUMNS_SQL})
+    ''',
+    f'''
+        CREATE TABLE IF NOT EXISTS player_performance_outliers ({PERFORMANCE_COLUMNS_SQL})
+    ''',
+    # Rating tables for each metric category
+    '''
+        CREATE TABLE IF NOT EXISTS player_ratings (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             account_name TEXT NOT NULL,
             profession TEXT NOT NULL,
@@ -931,12 +821,9 @@ def create_database(db_path: str):
             draws INTEGER DEFAULT 0,
             UNIQUE(account_name, profession, metric_category)
         )
-    ''')
-    
-    # Create high scores table
-    cursor.execute('DROP TABLE IF EXISTS high_scores')
-    cursor.execute('''
-        CREATE TABLE high_scores (
+    ''',
+    '''
+        CREATE TABLE IF NOT EXISTS high_scores (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             timestamp TEXT NOT NULL,
             parsed_date TEXT,
@@ -949,125 +836,582 @@ def create_database(db_path: str):
             skill_icon_url TEXT,
             score_value REAL NOT NULL
         )
-    ''')
+    ''',
+    # Manifest of ingested sessions for --incremental runs. file_signature is a
+    # cheap stat() based check; content_fingerprint hashes the tiddler contents.
+    # damage_key identifies the raid night regardless of its timestamp, and
+    # duplicate_of names the session a re-upload repeats (it has no rows).
+    '''
+        CREATE TABLE IF NOT EXISTS ingested_sessions (
+            timestamp TEXT PRIMARY KEY,
+            file_signature TEXT NOT NULL,
+            content_fingerprint TEXT NOT NULL,
+            performance_count INTEGER DEFAULT 0,
+            high_score_count INTEGER DEFAULT 0,
+            ingested_at TEXT NOT NULL,
+            damage_key TEXT,
+            duplicate_of TEXT
+        )
+    ''',
+    # Indexes for efficient querying
+    'CREATE INDEX IF NOT EXISTS idx_high_scores_metric ON high_scores(metric_type)',
+    'CREATE INDEX IF NOT EXISTS idx_high_scores_date ON high_scores(parsed_date)',
+    'CREATE INDEX IF NOT EXISTS idx_high_scores_player ON high_scores(player_account)',
+    'CREATE INDEX IF NOT EXISTS idx_high_scores_score ON high_scores(metric_type, score_value DESC)',
+    'CREATE INDEX IF NOT EXISTS idx_high_scores_timestamp ON high_scores(timestamp)',
+    # Per-session ranks and z-scores, derived from player_performances
+    *SESSION_SCORES_SCHEMA,
+]
+
+INGEST_TABLES = ['player_performances', 'player_performance_outliers', 'player_ratings', 'high_scores',
+                 'ingested_sessions', 'session_metric_scores']
+
+# Columns added after their table first shipped, added to older databases in place
+ADDED_COLUMNS = {
+    'ingested_sessions': [('damage_key', 'TEXT'), ('duplicate_of', 'TEXT')],
+    'player_performances': [('base_profession', 'TEXT')],
+}
+
+
+def ensure_database_schema(db_path: str):
+    """Create any missing ingest tables, columns and indexes, keeping existing data."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
     
-    # Create indexes for efficient querying
-    cursor.execute('CREATE INDEX idx_high_scores_metric ON high_scores(metric_type)')
-    cursor.execute('CREATE INDEX idx_high_scores_date ON high_scores(parsed_date)')
-    cursor.execute('CREATE INDEX idx_high_scores_player ON high_scores(player_account)')
-    cursor.execute('CREATE INDEX idx_high_scores_score ON high_scores(metric_type, score_value DESC)')
+    for statement in SCHEMA_STATEMENTS:
+        cursor.execute(statement)
+    
+    added = set()
+    for table, added_columns in ADDED_COLUMNS.items():
+        cursor.execute(f'PRAGMA table_info({table})')
+        columns = {row[1] for row in cursor.fetchall()}
+        for column, column_type in added_columns:
+            if column not in columns:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+                added.add(column)
+    
+    if 'base_profession' in added:
+        # Rows stored before the column existed: recover it from the variant name
+        variant_cases = ' '.join(f"WHEN '{variant}' THEN '{profession}'"
+                                 for profession, variant, *_ in BUILD_VARIANT_RULES)
+        cursor.execute(f'UPDATE player_performances SET base_profession = '
+                       f'CASE profession {variant_cases} ELSE profession END')
     
     conn.commit()
     conn.close()
 
 
-def store_high_scores(high_scores: List, db_path: str):
-    """Store high scores data in the database."""
+def create_database(db_path: str):
+    """Create SQLite database with comprehensive player performance schema."""
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    for entry in high_scores:
-        cursor.execute('''
-            INSERT OR REPLACE INTO high_scores (
-                timestamp, parsed_date, player_account, player_name, profession,
-                fight_number, metric_type, skill_name, skill_icon_url, score_value
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            entry.timestamp,
-            str(entry.timestamp[:8]),  # Convert YYYYMMDDHHMM to YYYYMMDD
-            entry.player_account,
-            entry.player_name,
-            entry.profession,
-            entry.fight_number,
-            entry.metric_type,
-            entry.skill_name,
-            entry.skill_icon_url,
-            entry.score_value
-        ))
+    # Drop existing tables to recreate with new schema
+    for table in INGEST_TABLES:
+        cursor.execute(f'DROP TABLE IF EXISTS {table}')
     
     conn.commit()
     conn.close()
+    
+    ensure_database_schema(db_path)
+
+
+# player_performances columns other than id, in the order of PERFORMANCE_COLUMNS_SQL
+PERFORMANCE_COLUMNS = (
+    'timestamp', 'parsed_date', 'player_name', 'account_name', 'profession', 'party', 'fight_time',
+    'target_damage', 'target_dps', 'all_damage', 'target_condition_damage', 'target_condition_dps',
+    'healing_per_sec', 'barrier_per_sec', 'condition_cleanses_per_sec', 'boon_strips_per_sec',
+    'stability_gen_per_sec', 'resistance_gen_per_sec', 'might_gen_per_sec', 'protection_gen_per_sec',
+    'down_contribution_per_sec', 'burst_damage_1s', 'burst_consistency_1s', 'distance_from_tag_avg',
+    'apm_total', 'apm_no_auto', 'base_profession',
+)
+
+
+def reclassify_performances(db_path: str) -> Dict[str, int]:
+    """
+    Re-apply outlier filtering and build variant detection to the stored rows.
+    
+    Runs the rules of classify_performances() (OUTLIER_* and
+    BUILD_VARIANT_RULES) as a few set-based statements over every session at
+    once, so changed thresholds take effect without re-parsing any logs.
+    Outliers dropped before player_performance_outliers existed cannot be
+    restored; re-ingest those sessions to store them. Returns the number of
+    rows newly excluded as outliers, restored from the outliers, and whose
+    profession changed.
+    """
+    ensure_database_schema(db_path)
+    columns = ', '.join(PERFORMANCE_COLUMNS)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            CREATE TEMP TABLE previous_classification AS
+            SELECT timestamp, account_name, base_profession, profession, 0 AS outlier FROM player_performances
+            UNION ALL
+            SELECT timestamp, account_name, base_profession, profession, 1 FROM player_performance_outliers
+        ''')
+        
+        # Start over from every row under its logged profession
+        cursor.execute(f'INSERT INTO player_performances ({columns}) '
+                       f'SELECT {columns} FROM player_performance_outliers')
+        cursor.execute('DELETE FROM player_performance_outliers')
+        cursor.execute('UPDATE player_performances SET profession = base_profession '
+                       'WHERE profession != base_profession')
+        
+        # Outlier threshold per session from its median fight time, kept
+        # only where filter_fight_time_outliers() would filter
+        cursor.execute('''
+            CREATE TEMP TABLE outlier_thresholds AS
+            WITH ranked AS (
+                SELECT timestamp, fight_time,
+                       ROW_NUMBER() OVER (PARTITION BY timestamp ORDER BY fight_time) AS position,
+                       COUNT(*) OVER (PARTITION BY timestamp) AS players
+                FROM player_performances
+            ),
+            medians AS (
+                SELECT timestamp, players, MIN(AVG(fight_time) * :share, :hard_minimum) AS threshold
+                FROM ranked
+                WHERE position IN ((players + 1) / 2, (players + 2) / 2)
+                GROUP BY timestamp
+            )
+            SELECT m.timestamp, m.threshold
+            FROM medians m JOIN player_performances p ON p.timestamp = m.timestamp
+            WHERE m.players >= :min_players
+            GROUP BY m.timestamp
+            HAVING SUM(p.fight_time < m.threshold) > 0
+               AND SUM(p.fight_time < m.threshold) * 1.0 / m.players < :max_fraction
+        ''', {'share': OUTLIER_MEDIAN_SHARE, 'hard_minimum': OUTLIER_HARD_MINIMUM,
+              'min_players': OUTLIER_MIN_PLAYERS, 'max_fraction': OUTLIER_MAX_FRACTION})
+        cursor.execute('CREATE UNIQUE INDEX temp.idx_outlier_thresholds ON outlier_thresholds(timestamp)')
+        is_outlier = ('fight_time < (SELECT threshold FROM outlier_thresholds t '
+                      'WHERE t.timestamp = player_performances.timestamp)')
+        cursor.execute(f'INSERT INTO player_performance_outliers ({columns}) '
+                       f'SELECT {columns} FROM player_performances WHERE {is_outlier}')
+        cursor.execute(f'DELETE FROM player_performances WHERE {is_outlier}')
+        
+        # Variant thresholds per session, over the remaining rows
+        threshold_columns = []
+        for i, (_, _, field, multiplier, minimum) in enumerate(BUILD_VARIANT_RULES):
+            if multiplier is None:
+                threshold_columns.append(f'{minimum!r} AS threshold_{i}')
+            else:
+                threshold_columns.append(
+                    f'CASE WHEN COUNT(CASE WHEN {field} > 0 THEN 1 END) >= 2 '
+                    f'THEN MAX(AVG(CASE WHEN {field} > 0 THEN {field} END) * {multiplier!r}, {minimum!r}) '
+                    f'ELSE {minimum!r} END AS threshold_{i}')
+        cursor.execute(f'''
+            CREATE TEMP TABLE variant_thresholds AS
+            SELECT timestamp, {', '.join(threshold_columns)}
+            FROM player_performances GROUP BY timestamp
+        ''')
+        cursor.execute('CREATE UNIQUE INDEX temp.idx_variant_thresholds ON variant_thresholds(timestamp)')
+        cases, parameters = [], []
+        for i, (profession, variant, field, _, _) in enumerate(BUILD_VARIANT_RULES):
+            cases.append(f'WHEN base_profession = ? AND {field} >= (SELECT threshold_{i} FROM variant_thresholds v '
+                         f'WHERE v.timestamp = player_performances.timestamp) THEN ?')
+            parameters += [profession, variant]
+        professions = [rule[0] for rule in BUILD_VARIANT_RULES]
+        cursor.execute(f'''
+            UPDATE player_performances SET profession = CASE {' '.join(cases)} ELSE profession END
+            WHERE base_profession IN ({', '.join('?' * len(professions))})
+        ''', parameters + professions)
+        
+        cursor.execute('''
+            CREATE TEMP TABLE classification_changes AS
+            SELECT timestamp, NOT was.outlier AND now.outlier AS excluded, was.outlier AND NOT now.outlier AS restored,
+                   was.profession != now.profession AS reclassified
+            FROM previous_classification was JOIN (
+                SELECT timestamp, account_name, base_profession, profession, 0 AS outlier FROM player_performances
+                UNION ALL
+                SELECT timestamp, account_name, base_profession, profession, 1 FROM player_performance_outliers
+            ) now USING (timestamp, account_name, base_profession)
+            WHERE was.outlier != now.outlier OR was.profession != now.profession
+        ''')
+        cursor.execute('SELECT SUM(excluded), SUM(restored), SUM(reclassified) FROM classification_changes')
+        excluded, restored, reclassified = (count or 0 for count in cursor.fetchone())
+        
+        # Stored session scores of the sessions that changed are stale
+        cursor.execute('SELECT DISTINCT timestamp FROM classification_changes ORDER BY timestamp')
+        changed_sessions = [row[0] for row in cursor.fetchall()]
+        cursor.executemany('DELETE FROM session_metric_scores WHERE timestamp = ?',
+                           [(timestamp,) for timestamp in changed_sessions])
+        
+        cursor.execute('''
+            UPDATE ingested_sessions SET performance_count = (
+                SELECT COUNT(*) FROM player_performances p WHERE p.timestamp = ingested_sessions.timestamp)
+            WHERE duplicate_of IS NULL
+        ''')
+        for table in ('previous_classification', 'outlier_thresholds', 'variant_thresholds', 'classification_changes'):
+            cursor.execute(f'DROP TABLE temp.{table}')
+    conn.close()
+    store_session_scores(db_path, changed_sessions)
+    return {'excluded': excluded, 'restored': restored, 'reclassified': reclassified}
+
+
+def store_high_scores(high_scores: List, db_path: str):
+    """Store high scores data in the database."""
+    with BulkWriter(db_path) as writer:
+        writer.write_high_scores(high_scores)
     print(f"Stored {len(high_scores)} high score entries")
 
 
-def store_performances(performances: List[PlayerPerformance], db_path: str):
-    """Store comprehensive player performances in the database."""
+def store_performances(performances: Iterable[PlayerPerformance], db_path: str):
+    """Store comprehensive player performances in the database (accepts any iterable)."""
+    with BulkWriter(db_path) as writer:
+        writer.write_performances(performances)
+
+
+def load_ingest_manifest(db_path: str) -> Dict[str, tuple]:
+    """Return {timestamp: (file_signature, content_fingerprint)} for ingested sessions."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('SELECT timestamp, file_signature, content_fingerprint FROM ingested_sessions')
+    manifest = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    conn.close()
+    return manifest
+
+
+def load_damage_keys(db_path: str) -> Dict[str, tuple]:
+    """Return {timestamp: (damage_key, duplicate_of)} for ingested sessions."""
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
+    cursor.execute('SELECT timestamp, damage_key, duplicate_of FROM ingested_sessions')
+    keys = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    conn.close()
+    return keys
+
+
+# Damage-table columns that identify a raid night; party and character
+# names are left out, as are the derived per-second columns.
+DAMAGE_KEY_FIELDS = ('account_name', 'profession', 'fight_time', 'target_damage',
+                     'target_condition_damage', 'all_damage')
+
+
+def session_damage_key(source) -> str:
+    """
+    Fingerprint of a session's normalized damage table ('' without one).
     
-    for perf in performances:
-        cursor.execute('''
-            INSERT OR REPLACE INTO player_performances 
-            (timestamp, parsed_date, player_name, account_name, profession, party, fight_time,
-             target_damage, target_dps, all_damage, target_condition_damage, target_condition_dps,
-             healing_per_sec, barrier_per_sec, condition_cleanses_per_sec, boon_strips_per_sec, 
-             stability_gen_per_sec, resistance_gen_per_sec, might_gen_per_sec, protection_gen_per_sec, down_contribution_per_sec,
-             burst_damage_1s, burst_consistency_1s, distance_from_tag_avg, apm_total, apm_no_auto)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            perf.timestamp, perf.parsed_date.isoformat() if perf.parsed_date else None,
-            perf.player_name, perf.account_name, perf.profession,
-            perf.party, perf.fight_time, perf.target_damage, perf.target_dps,
-            perf.all_damage, perf.target_condition_damage, perf.target_condition_dps,
-            perf.healing_per_sec, perf.barrier_per_sec, perf.condition_cleanses_per_sec, 
-            perf.boon_strips_per_sec, perf.stability_gen_per_sec, perf.resistance_gen_per_sec, 
-            perf.might_gen_per_sec, perf.protection_gen_per_sec, perf.down_contribution_per_sec,
-            perf.burst_damage_1s, perf.burst_consistency_1s, perf.distance_from_tag_avg,
-            perf.apm_total, perf.apm_no_auto
-        ))
+    Unlike the content fingerprint it ignores the timestamp baked into every
+    tiddler title and the table's row order and markup, so the same raid
+    night uploaded twice under different timestamps gets the same key.
+    """
+    session = as_session_source(source)
+    if isinstance(session, EliteInsightsSession):
+        # The same columns, so an export and a TopStats upload of one night match
+        try:
+            return _damage_rows_key(session.summary().player_rows)
+        except ValueError:
+            return ''
+    try:
+        tiddler = session.tiddler('Damage')
+    except ValueError:
+        return ''
+    if not tiddler:
+        return ''
+    with redirect_stdout(io.StringIO()):
+        players = parse_damage_table(tiddler.get('text', ''))
+    return _damage_rows_key(players)
+
+
+def _damage_rows_key(players: List[Dict]) -> str:
+    rows = sorted(tuple(player[field] for field in DAMAGE_KEY_FIELDS) for player in players)
+    if not rows:
+        return ''
+    return hashlib.sha256(repr(rows).encode('utf-8')).hexdigest()
+
+
+class SessionDeduplicator:
+    """
+    Spots re-uploaded sessions by their damage key.
     
-    conn.commit()
-    conn.close()
+    The first session seen with a key owns it; any other timestamp with the
+    same key is a duplicate of that owner.
+    """
+    
+    def __init__(self, damage_keys: Optional[Dict[str, tuple]] = None):
+        """damage_keys are the stored sessions' keys, as from load_damage_keys()."""
+        self._owners: Dict[str, str] = {}
+        self._keys: Dict[str, str] = {}
+        for timestamp, (damage_key, duplicate_of) in sorted((damage_keys or {}).items()):
+            if not duplicate_of:
+                self.check(timestamp, damage_key)
+    
+    def check(self, timestamp: str, damage_key: Optional[str]) -> Optional[str]:
+        """Return the timestamp this session duplicates, or None after recording it as an owner."""
+        # A changed session gives up the key it had before
+        previous_key = self._keys.pop(timestamp, None)
+        if previous_key is not None and previous_key != damage_key:
+            del self._owners[previous_key]
+        if not damage_key:
+            return None
+        owner = self._owners.get(damage_key)
+        if owner is not None and owner != timestamp:
+            return owner
+        self._owners[damage_key] = timestamp
+        self._keys[timestamp] = damage_key
+        return None
+
+
+def session_files(log_dir: Path) -> List[Path]:
+    """Tiddler files that feed a session's parse, in a stable order."""
+    return as_session_source(log_dir).files()
+
+
+def session_file_signature(log_dir: Path) -> str:
+    """Cheap signature of a session directory from file names, sizes and mtimes."""
+    return as_session_source(log_dir).signature()
+
+
+def session_content_fingerprint(log_dir: Path) -> str:
+    """SHA-256 over the names and contents of a session's tiddler files."""
+    return as_session_source(log_dir).fingerprint()
+
+
+def iter_session_dirs(logs_path: Path) -> List[Path]:
+    """Extracted session directories (named by 12-digit timestamp), oldest first."""
+    return [log_dir for log_dir in sorted(logs_path.iterdir())
+            if log_dir.is_dir() and re.match(r'\d{12}', log_dir.name)]
+
+
+def parse_session(source, high_scores_parser: HighScoresParser,
+                  cache: Optional[ParseCache] = None) -> tuple:
+    """
+    Parse one session (a directory or any session source) into (performances, high_scores).
+    
+    Fight time outliers are included, flagged, so they can be stored apart.
+    """
+    session = as_session_source(source)
+    print(f"Processing {session.timestamp}...")
+    performances = parse_log_directory(session, cache, keep_outliers=True)
+    print(f"  Found {sum(not p.fight_time_outlier for p in performances)} player performances")
+    
+    high_scores = []
+    if isinstance(session, EliteInsightsSession):
+        high_scores = session.summary().high_scores
+        print(f"  Found {len(high_scores)} high score entries")
+        return performances, high_scores
+    try:
+        high_scores_tiddler = session.tiddler('High-Scores')
+    except ValueError as e:
+        print(f"Error parsing {session.timestamp}-High-Scores.json: {e}")
+        high_scores_tiddler = {}
+    if high_scores_tiddler is not None:
+        high_scores = high_scores_parser.parse_high_scores_data(high_scores_tiddler, session.timestamp)
+        print(f"  Found {len(high_scores)} high score entries")
+    else:
+        print(f"  No High-Scores.json found")
+    
+    return performances, high_scores
+
+
+def _parse_session_job(session: SessionSource, cache: Optional[ParseCache] = None) -> tuple:
+    """Process-pool worker: parse one session, capturing its console output."""
+    output = io.StringIO()
+    with redirect_stdout(output):
+        performances, high_scores = parse_session(session, HighScoresParser(), cache)
+    return performances, high_scores, output.getvalue()
+
+
+def iter_parsed_sessions(sessions: List, workers: int = 1, cache: Optional[ParseCache] = None):
+    """
+    Yield (session, performances, high_scores) for each session, in input order.
+    
+    Sessions are directories or MemorySession objects; directories are
+    yielded back as DirectorySession (ArchivedSession when packed). With
+    workers > 1 sessions are parsed in a process pool; results are still
+    yielded in order so a single writer can insert them sequentially.
+    """
+    sessions = [as_session_source(session) for session in sessions]
+    if workers <= 1 or len(sessions) <= 1:
+        high_scores_parser = HighScoresParser()
+        for session in sessions:
+            performances, high_scores = parse_session(session, high_scores_parser, cache)
+            yield session, performances, high_scores
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(partial(_parse_session_job, cache=cache), sessions)
+        for session, (performances, high_scores, output) in zip(sessions, results):
+            print(output, end='')
+            yield session, performances, high_scores
+
+
+def ingest_sessions(sessions: Iterable, db_path: str, workers: int = 1,
+                    batch_size: int = DEFAULT_BATCH_SIZE, cache: Optional[ParseCache] = None) -> List[str]:
+    """
+    Parse only sessions that are new or whose content changed since the last ingest.
+    
+    Sessions are directories or MemorySession objects straight from a
+    TiddlyWiki store, so a sync can ingest without writing tiddler files.
+    The schema is created if missing and nothing is dropped. Each (re)ingested
+    session replaces its own rows in one transaction. Returns the timestamps
+    that were written.
+    """
+    ensure_database_schema(db_path)
+    manifest = load_ingest_manifest(db_path)
+    damage_keys = load_damage_keys(db_path)
+    newest_ingested = max(manifest) if manifest else None
+    deduplicator = SessionDeduplicator(damage_keys)
+    
+    pending = {}
+    duplicates = []
+    unchanged = 0
+    
+    for session in sessions:
+        session = as_session_source(session)
+        timestamp = session.timestamp
+        signature = session.signature()
+        previous = manifest.get(timestamp)
+        
+        if previous and previous[0] == signature and damage_keys[timestamp][0] is not None:
+            unchanged += 1
+            continue
+        
+        fingerprint = session.fingerprint()
+        if previous and previous[1] == fingerprint:
+            damage_key, duplicate_of = damage_keys[timestamp]
+            if damage_key is None and not duplicate_of:
+                # Ingested before damage keys existed; key it now so later
+                # re-uploads are caught, and drop it if it is one itself
+                damage_key = session_damage_key(session)
+                duplicate_of = deduplicator.check(timestamp, damage_key)
+            if duplicate_of and not damage_keys[timestamp][1]:
+                duplicates.append((session, signature, fingerprint, damage_key, duplicate_of))
+                continue
+            # Files were rewritten (e.g. re-extracted or archived) with identical content
+            conn = sqlite3.connect(db_path)
+            conn.execute('UPDATE ingested_sessions SET file_signature = ?, damage_key = ? WHERE timestamp = ?',
+                         (signature, damage_key, timestamp))
+            conn.commit()
+            conn.close()
+            unchanged += 1
+            continue
+        
+        damage_key = session_damage_key(session)
+        duplicate_of = deduplicator.check(timestamp, damage_key)
+        if duplicate_of:
+            duplicates.append((session, signature, fingerprint, damage_key, duplicate_of))
+            continue
+        pending[timestamp] = (session, signature, fingerprint, previous, damage_key)
+    
+    ingested = []
+    needs_rebuild = []
+    with BulkWriter(db_path, batch_size=batch_size) as writer:
+        # Re-uploads are recorded without rows, so they are never parsed or rated
+        for session, signature, fingerprint, damage_key, duplicate_of in duplicates:
+            writer.add_session(session.timestamp, [], [], signature, fingerprint,
+                               damage_key=damage_key, duplicate_of=duplicate_of)
+            if session.timestamp in manifest:
+                needs_rebuild.append(session.timestamp)
+        
+        parsed = iter_parsed_sessions([entry[0] for entry in pending.values()], workers, cache)
+        for session, performances, high_scores in parsed:
+            timestamp = session.timestamp
+            _, signature, fingerprint, previous, damage_key = pending[timestamp]
+            writer.add_session(timestamp, performances, high_scores, signature, fingerprint,
+                               damage_key=damage_key)
+            ingested.append(timestamp)
+            
+            # Incremental rating updates only pick up sessions newer than the last
+            # rated one, so changed or back-filled sessions need a history rebuild.
+            if previous or (newest_ingested and timestamp < newest_ingested):
+                needs_rebuild.append(timestamp)
+    
+    store_session_scores(db_path, ingested)
+    print(f"Incremental ingest: {len(ingested)} session(s) parsed, {unchanged} unchanged")
+    if duplicates:
+        print(f"🔁 Skipped {len(duplicates)} re-uploaded session(s): "
+              + ', '.join(f"{entry[0].timestamp} (same as {entry[4]})" for entry in duplicates))
+    if needs_rebuild:
+        print(f"⚠️  {len(needs_rebuild)} changed or back-filled session(s): {', '.join(needs_rebuild)}")
+        print("   Run glicko_rating_system.py --rebuild-history so ratings include them")
+    
+    return ingested
+
+
+def ingest_incremental(logs_path: Path, db_path: str, workers: int = 1,
+                       batch_size: int = DEFAULT_BATCH_SIZE, cache: Optional[ParseCache] = None) -> List[str]:
+    """Incrementally ingest the session directories under logs_path (see ingest_sessions)."""
+    return ingest_sessions(iter_session_dirs(logs_path), db_path, workers, batch_size, cache)
 
 
 def main():
     parser = argparse.ArgumentParser(description='Parse GW2 log summaries with comprehensive metrics')
-    parser.add_argument('logs_dir', help='Directory containing extracted log folders')
+    parser.add_argument('logs_dir', nargs='?', help='Directory containing extracted log folders')
     parser.add_argument('-d', '--database', default='gw2_leaderboard_comprehensive.db',
                         help='SQLite database file (default: gw2_leaderboard_comprehensive.db)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Keep existing data and only parse new or changed sessions (creates the schema if missing)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Parse sessions in N worker processes (default: 1, 0 = one per CPU core)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f'Rows written per transaction (default: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--cache-dir',
+                        help='Cache raw table rows per session here; re-parses then only re-run '
+                             'outlier filtering and build detection for unchanged sessions')
+    
+    parser.add_argument('--reclassify', action='store_true',
+                        help='Re-apply outlier filtering and build variant detection to the stored '
+                             'rows instead of parsing logs')
     
     args = parser.parse_args()
     
+    if args.reclassify:
+        changes = reclassify_performances(args.database)
+        print(f"🔄 Reclassified {args.database}: {changes['excluded']} rows newly excluded as fight time "
+              f"outliers, {changes['restored']} restored, {changes['reclassified']} professions changed")
+        if any(changes.values()):
+            print("   Run glicko_rating_system.py --rebuild-history so ratings use the new classification")
+        return 0
+    if not args.logs_dir:
+        parser.error('logs_dir is required unless --reclassify is given')
+    
     logs_path = Path(args.logs_dir)
     if not logs_path.exists():
         print(f"Directory {logs_path} does not exist")
         return 1
     
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    cache = ParseCache(args.cache_dir, PARSER_VERSION) if args.cache_dir else None
+    
+    if args.incremental:
+        ingest_incremental(logs_path, args.database, workers, args.batch_size, cache)
+        return 0
+    
     # Create database
     create_database(args.database)
     print(f"Created comprehensive database: {args.database}")
     
-    # Process each log directory
-    all_performances = []
-    all_high_scores = []
-    
-    # Initialize high scores parser
-    high_scores_parser = HighScoresParser()
-    
-    for log_dir in sorted(logs_path.iterdir()):
-        if log_dir.is_dir() and re.match(r'\d{12}', log_dir.name):
-            print(f"Processing {log_dir.name}...")
-            performances = parse_log_directory(log_dir)
-            all_performances.extend(performances)
-            print(f"  Found {len(performances)} player performances")
-            
-            # Process high scores for this log directory
-            high_scores_file = log_dir / f"{log_dir.name}-High-Scores.json"
-            if high_scores_file.exists():
-                high_scores = high_scores_parser.parse_high_scores_file(high_scores_file)
-                all_high_scores.extend(high_scores)
-                print(f"  Found {len(high_scores)} high score entries")
+    # Parse each log directory (in a process pool with --workers) and stream
+    # sessions to the writer in timestamp order as they arrive. Re-uploads of
+    # a session already seen are recorded without being parsed.
+    deduplicator = SessionDeduplicator()
+    unique_sessions = {}
+    with BulkWriter(args.database, batch_size=args.batch_size, bulk_load=True) as writer:
+        for session in map(as_session_source, iter_session_dirs(logs_path)):
+            damage_key = session_damage_key(session)
+            duplicate_of = deduplicator.check(session.timestamp, damage_key)
+            if duplicate_of:
+                print(f"🔁 Skipping {session.timestamp}: re-upload of {duplicate_of}")
+                writer.add_session(session.timestamp, [], [], session.signature(), session.fingerprint(),
+                                   replace=False, damage_key=damage_key, duplicate_of=duplicate_of)
             else:
-                print(f"  No High-Scores.json found")
-    
-    # Store in database
-    if all_performances:
-        store_performances(all_performances, args.database)
-        print(f"Stored {len(all_performances)} comprehensive performances in database")
-    
-    if all_high_scores:
-        store_high_scores(all_high_scores, args.database)
-        print(f"Stored {len(all_high_scores)} high score entries in database")
+                unique_sessions[session.timestamp] = (session, damage_key)
+        
+        parsed = iter_parsed_sessions([entry[0] for entry in unique_sessions.values()], workers, cache)
+        for session, performances, high_scores in parsed:
+            writer.add_session(session.timestamp, performances, high_scores,
+                               session.signature(), session.fingerprint(), replace=False,
+                               damage_key=unique_sessions[session.timestamp][1])
+    store_session_scores(args.database, sorted(unique_sessions))
+    total_performances = writer.performances_written
+    total_high_scores = writer.high_scores_written
+    
+    if total_performances:
+        print(f"Stored {total_performances} comprehensive performances in database")
+    
+    if total_high_scores:
+        print(f"Stored {total_high_scores} high score entries in database")
         
         # Show summary
         conn = sqlite3.connect(args.database)
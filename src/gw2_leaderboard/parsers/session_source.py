@@ -0,0 +1,231 @@
+"""
+Where a session's tiddlers come from when it is parsed.
+
+Sessions are normally read from ``extracted_logs/<timestamp>/`` where each
+tiddler was written to its own JSON file. A MemorySession holds the same
+tiddlers straight from a TiddlyWiki store, so a sync can parse and store
+them without writing and re-reading those files. Both expose tiddlers by
+the suffix after the timestamp (``Damage`` for ``<timestamp>-Damage``) and
+compute the same content fingerprint for the same tiddlers, so the ingest
+manifest and parse cache treat an archived session and its in-memory
+original as identical. An ArchivedSession reads a session directory that
+was packed into a single ``<timestamp>.tar.gz`` (see session_archive); its
+members are the original file bytes, so its fingerprint is unchanged too.
+
+An EliteInsightsSession has no tiddlers at all: it is a directory of Elite
+Insights JSON exports, one per fight, which ei_json_adapter reads directly
+instead of going through the TopStats markup.
+"""
+
+import hashlib
+import re
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from . import ei_json_adapter
+from .session_archive import read_archive, session_archive_path
+from ..utils import json_io
+
+
+def tiddler_file_name(title: str) -> str:
+    """File name a tiddler is archived under in its session directory."""
+    return re.sub(r'[^\w\-_.]', '_', title) + '.json'
+
+
+class DirectorySession:
+    """A session extracted to ``<logs_dir>/<timestamp>/<timestamp>-*.json``."""
+
+    def __init__(self, log_dir: Path):
+        self.log_dir = Path(log_dir)
+        self.timestamp = self.log_dir.name
+
+    def __repr__(self):
+        return f"DirectorySession({str(self.log_dir)!r})"
+
+    def files(self) -> List[Path]:
+        """Tiddler files that feed the session's parse, in a stable order."""
+        return sorted(self.log_dir.glob(f"{self.timestamp}-*.json"))
+
+    def tiddler(self, suffix: str) -> Optional[Dict]:
+        path = self.log_dir / f"{self.timestamp}-{suffix}.json"
+        return json_io.load_file(path) if path.exists() else None
+
+    def tiddler_loaders(self, prefix: str) -> Iterator[Tuple[str, Callable[[], Dict]]]:
+        """
+        (name, load) for each tiddler whose suffix starts with prefix.
+
+        Loading is deferred so callers can skip a single unreadable file.
+        """
+        for path in sorted(self.log_dir.glob(f"{self.timestamp}-{prefix}*.json")):
+            yield str(path), partial(json_io.load_file, path)
+
+    def signature(self) -> str:
+        """Cheap signature from file names, sizes and mtimes."""
+        digest = hashlib.sha1()
+        for path in self.files():
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def fingerprint(self) -> str:
+        """SHA-256 over the names and contents of the session's tiddler files."""
+        return _fingerprint((path.name, path.read_bytes()) for path in self.files())
+
+
+class MemorySession:
+    """A session's tiddler dicts, typically straight from a TiddlyWiki store."""
+
+    def __init__(self, timestamp: str, tiddlers: Iterable[Dict]):
+        self.timestamp = timestamp
+        # Keyed by archive file name so lookups match DirectorySession exactly
+        self._tiddlers = {tiddler_file_name(t.get('title', '')): t for t in tiddlers}
+        self._fingerprint = None
+
+    def __repr__(self):
+        return f"MemorySession({self.timestamp!r}, {len(self._tiddlers)} tiddlers)"
+
+    def tiddlers(self) -> List[Dict]:
+        return list(self._tiddlers.values())
+
+    def tiddler(self, suffix: str) -> Optional[Dict]:
+        return self._tiddlers.get(f"{self.timestamp}-{suffix}.json")
+
+    def tiddler_loaders(self, prefix: str) -> Iterator[Tuple[str, Callable[[], Dict]]]:
+        start = f"{self.timestamp}-{prefix}"
+        for name in sorted(self._tiddlers):
+            if name.startswith(start):
+                yield name, partial(dict.copy, self._tiddlers[name])
+
+    def signature(self) -> str:
+        """There are no files to stat; the content fingerprint doubles as the signature."""
+        return f"memory:{self.fingerprint()}"
+
+    def fingerprint(self) -> str:
+        """The fingerprint a DirectorySession would have once these tiddlers are archived."""
+        if self._fingerprint is None:
+            start = f"{self.timestamp}-"
+            self._fingerprint = _fingerprint(
+                (name, json_io.dumps_bytes(self._tiddlers[name], indent=True))
+                for name in sorted(self._tiddlers) if name.startswith(start))
+        return self._fingerprint
+
+
+class ArchivedSession:
+    """A session directory packed into ``<logs_dir>/<timestamp>/<timestamp>.tar.gz``."""
+
+    def __init__(self, log_dir: Path):
+        self.log_dir = Path(log_dir)
+        self.timestamp = self.log_dir.name
+        self.archive_path = session_archive_path(self.log_dir)
+        self._contents = None
+
+    def __repr__(self):
+        return f"ArchivedSession({str(self.log_dir)!r})"
+
+    def _members(self) -> Dict[str, bytes]:
+        # Decompressed on first use, so an unchanged session costs only a stat
+        if self._contents is None:
+            self._contents = read_archive(self.archive_path)
+        return self._contents
+
+    def files(self) -> List[str]:
+        """Names of the tiddler files that feed the session's parse, in a stable order."""
+        start = f"{self.timestamp}-"
+        return sorted(name for name in self._members() if name.startswith(start) and name.endswith('.json'))
+
+    def tiddler(self, suffix: str) -> Optional[Dict]:
+        data = self._members().get(f"{self.timestamp}-{suffix}.json")
+        return json_io.loads(data) if data is not None else None
+
+    def tiddler_loaders(self, prefix: str) -> Iterator[Tuple[str, Callable[[], Dict]]]:
+        start = f"{self.timestamp}-{prefix}"
+        members = self._members()
+        for name in self.files():
+            if name.startswith(start):
+                yield f"{self.archive_path}:{name}", partial(json_io.loads, members[name])
+
+    def signature(self) -> str:
+        """Cheap signature from the archive's size and mtime."""
+        stat = self.archive_path.stat()
+        line = f"{self.archive_path.name}:{stat.st_size}:{stat.st_mtime_ns}\n"
+        return hashlib.sha1(line.encode('utf-8')).hexdigest()
+
+    def fingerprint(self) -> str:
+        """Same as the DirectorySession fingerprint of the files before they were packed."""
+        members = self._members()
+        return _fingerprint((name, members[name]) for name in self.files())
+
+
+# Subdirectory of a session directory that holds its Elite Insights exports
+EI_EXPORT_DIR = 'elite_insights'
+
+
+class EliteInsightsSession:
+    """A session of Elite Insights fight exports in ``<logs_dir>/<timestamp>/elite_insights/*.json``."""
+
+    def __init__(self, log_dir: Path):
+        self.log_dir = Path(log_dir)
+        self.timestamp = self.log_dir.name
+        self.export_dir = self.log_dir / EI_EXPORT_DIR
+        self._summary = None
+
+    def __repr__(self):
+        return f"EliteInsightsSession({str(self.log_dir)!r})"
+
+    def files(self) -> List[Path]:
+        """Fight exports that feed the session's parse, in a stable order."""
+        return sorted(self.export_dir.glob('*.json'))
+
+    def fights(self) -> Iterator[Dict]:
+        """Decode the fight exports one at a time, in file order."""
+        for path in self.files():
+            yield json_io.load_file(path)
+
+    def summary(self) -> ei_json_adapter.SessionSummary:
+        """Player rows and high scores from the exports, computed once and kept (they are small)."""
+        if self._summary is None:
+            self._summary = ei_json_adapter.summarize(self.fights(), self.timestamp)
+        return self._summary
+
+    def tiddler(self, suffix: str) -> Optional[Dict]:
+        """Exports carry no TopStats tiddlers."""
+        return None
+
+    def tiddler_loaders(self, prefix: str) -> Iterator[Tuple[str, Callable[[], Dict]]]:
+        return iter(())
+
+    def signature(self) -> str:
+        """Cheap signature from export names, sizes and mtimes."""
+        digest = hashlib.sha1()
+        for path in self.files():
+            stat = path.stat()
+            digest.update(f"{path.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def fingerprint(self) -> str:
+        """SHA-256 over the names and contents of the export files."""
+        return _fingerprint((path.name, path.read_bytes()) for path in self.files())
+
+
+SessionSource = Union[DirectorySession, MemorySession, ArchivedSession, EliteInsightsSession]
+
+
+def as_session_source(source: Union[SessionSource, Path, str]) -> SessionSource:
+    """Accept a session source or a session directory path, packed, loose or Elite Insights."""
+    if isinstance(source, (DirectorySession, MemorySession, ArchivedSession, EliteInsightsSession)):
+        return source
+    if session_archive_path(source).exists():
+        return ArchivedSession(Path(source))
+    if (Path(source) / EI_EXPORT_DIR).is_dir():
+        return EliteInsightsSession(Path(source))
+    return DirectorySession(Path(source))
+
+
+def _fingerprint(named_contents: Iterable) -> str:
+    digest = hashlib.sha256()
+    for name, content in named_contents:
+        digest.update(name.encode('utf-8') + b'\0')
+        digest.update(content)
+        digest.update(b'\0')
+    return digest.hexdigest()
@@ -0,0 +1,147 @@
+"""
+Streaming reader for the tiddler store embedded in a TiddlyWiki HTML file.
+
+TiddlyWiki 5 keeps every tiddler in one JSON array inside
+``<script class="tiddlywiki-tiddler-store" type="application/json">``.
+Instead of building an HTML tree to find that element, the file is
+memory-mapped, the store's boundaries are found with a byte search, and the
+array is decoded one tiddler at a time. Decoding uses memory near the size
+of the largest tiddler plus one read chunk, however large the wiki is;
+callers that keep the tiddlers they are given hold those as well.
+"""
+
+import codecs
+import json
+import mmap
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Tuple, Union
+
+STORE_MARKER = b'tiddlywiki-tiddler-store'
+SCRIPT_END = b'</script>'
+
+# Bytes decoded per read; a tiddler larger than this is read in growing steps
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = ' \t\r\n'
+
+
+class TiddlerStoreError(ValueError):
+    """The HTML has no tiddler store, or the store is not a valid JSON array."""
+
+
+def find_store(buffer, start: int = 0) -> Tuple[int, int]:
+    """
+    Byte offsets (start, end) of the JSON inside the first tiddler-store script tag.
+
+    The marker text also appears in TiddlyWiki's own JavaScript, so a match
+    only counts when it sits inside a ``<script`` start tag.
+    """
+    marker = buffer.find(STORE_MARKER, start)
+    while marker != -1:
+        tag_start = buffer.rfind(b'<', 0, marker)
+        if tag_start != -1 and buffer[tag_start:tag_start + 7].lower() == b'<script' \
+                and buffer.find(b'>', tag_start, marker) == -1:
+            content_start = buffer.find(b'>', marker) + 1
+            content_end = buffer.find(SCRIPT_END, content_start)
+            if content_start == 0 or content_end == -1:
+                break
+            return content_start, content_end
+        marker = buffer.find(STORE_MARKER, marker + len(STORE_MARKER))
+
+    raise TiddlerStoreError("Could not find tiddler store in HTML file")
+
+
+def _decoded_chunks(buffer, start: int, end: int, chunk_size: int) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for offset in range(start, end, chunk_size):
+        yield decoder.decode(buffer[offset:min(offset + chunk_size, end)])
+    yield decoder.decode(b'', final=True)
+
+
+def iter_json_array(chunks: Iterable[str]) -> Iterator:
+    """
+    Yield the items of a JSON array whose text arrives in chunks.
+
+    Each item is decoded as soon as its text is complete; only the unread
+    remainder of the current chunk and the item being decoded are held.
+    """
+    chunks = iter(chunks)
+    decoder = json.JSONDecoder()
+    text = ''
+    pos = 0
+    exhausted = False
+
+    def read_more(minimum: int) -> bool:
+        """Append at least `minimum` more characters; False if nothing was left."""
+        nonlocal text, exhausted
+        added = 0
+        while added < minimum:
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+                break
+            text += chunk
+            added += len(chunk)
+        return added > 0
+
+    def skip_whitespace() -> bool:
+        """Advance past whitespace; False once the input is used up."""
+        nonlocal pos
+        while True:
+            while pos < len(text) and text[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(text):
+                return True
+            if exhausted or not read_more(1):
+                return False
+
+    if not skip_whitespace() or text[pos] != '[':
+        raise TiddlerStoreError("Tiddler store is not a JSON array")
+    pos += 1
+
+    expect_item = True
+    while True:
+        if not skip_whitespace():
+            raise TiddlerStoreError("Tiddler store ended before its closing ']'")
+        char = text[pos]
+        if char == ']':
+            return
+        if not expect_item:
+            if char != ',':
+                raise TiddlerStoreError(f"Expected ',' between tiddlers, found {char!r}")
+            pos += 1
+            expect_item = True
+            continue
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(text, pos)
+            except json.JSONDecodeError as e:
+                # Usually an item cut off at the chunk boundary. Read at least as
+                # much again so a tiddler spanning many chunks is retried only a
+                # logarithmic number of times.
+                if exhausted or not read_more(max(len(text) - pos, 1)):
+                    raise TiddlerStoreError(f"Invalid tiddler store JSON: {e}") from e
+                continue
+            if end == len(text) and not exhausted and read_more(1):
+                # A number or literal may continue in the next chunk
+                continue
+            break
+
+        pos = end
+        expect_item = False
+        if pos > len(text) // 2:
+            # Drop consumed text so only the unread remainder is kept
+            text = text[pos:]
+            pos = 0
+        yield item
+
+
+def iter_tiddlers(html_path: Union[str, Path], chunk_size: int = CHUNK_SIZE) -> Iterator[Dict]:
+    """Yield each tiddler dict from a TiddlyWiki HTML file, in store order."""
+    with open(html_path, 'rb') as f:
+        if Path(html_path).stat().st_size == 0:
+            raise TiddlerStoreError("Could not find tiddler store in HTML file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            start, end = find_store(buffer)
+            yield from iter_json_array(_decoded_chunks(buffer, start, end, chunk_size))
@@ -0,0 +1,126 @@
+"""
+Tokenizer for the TiddlyWiki table markup used in top-stats tiddlers.
+
+Table parsers in parse_logs_enhanced share this module instead of each
+re-splitting the tiddler text and running ad-hoc regexes per cell. The
+patterns are compiled once, each data row is split once in the style its
+table needs, and account/profession are pulled from a row in one call.
+"""
+
+import re
+from typing import Callable, Iterator, List, Optional, Tuple
+
+TOOLTIP_PATTERN = re.compile(r'data-tooltip=["\']([^"\']+)["\']')
+DISPLAY_NAME_PATTERN = re.compile(r'>([^<]+)</span>')
+PROFESSION_PATTERN = re.compile(r'{{(\w+)}}')
+SPAN_NUMBER_PATTERN = re.compile(r'<span[^>]*>([0-9,]+\.?[0-9]*)</span>')
+NUMBER_PATTERN = re.compile(r'([0-9,]+\.?[0-9]*)')
+
+
+def tooltip(text: str) -> str:
+    """Return the data-tooltip value (the account name in name cells)."""
+    match = TOOLTIP_PATTERN.search(text)
+    return match.group(1) if match else ""
+
+
+def display_name(text: str) -> str:
+    """Return the text shown inside a name cell's span."""
+    match = DISPLAY_NAME_PATTERN.search(text)
+    return match.group(1) if match else ""
+
+
+def profession(text: str) -> str:
+    """Return the profession from a ``{{Profession}}`` icon macro."""
+    match = PROFESSION_PATTERN.search(text)
+    return match.group(1) if match else ""
+
+
+def span_number(text: str) -> float:
+    """Numeric value of a cell, preferring the number shown inside a span."""
+    if '<' in text:
+        match = SPAN_NUMBER_PATTERN.search(text)
+        if match:
+            return float(match.group(1).replace(',', ''))
+
+    stripped = text.strip()
+    match = NUMBER_PATTERN.search(stripped)
+    if match and stripped != '-':
+        return float(match.group(1).replace(',', ''))
+
+    return 0.0
+
+
+def int_cell(text: str) -> int:
+    """Integer value of a plain ``1,234`` cell, or 0 when it is not one."""
+    digits = text.replace(',', '')
+    return int(digits) if digits.isdigit() else 0
+
+
+def compact_cells(line: str) -> List[str]:
+    """Non-empty stripped cells of a row (empty columns are dropped)."""
+    return list(filter(None, map(str.strip, line.split('|'))))
+
+
+def positional_cells(line: str) -> List[str]:
+    """Stripped cells between the leading and trailing ``|``, empty columns kept."""
+    return [cell.strip() for cell in line.split('|')[1:-1]]
+
+
+def all_fields(line: str) -> List[str]:
+    """Every stripped ``|`` field, including the ones outside the row delimiters."""
+    return [field.strip() for field in line.split('|')]
+
+
+class TableRow:
+    """A ``|``-delimited data row and its cells."""
+
+    __slots__ = ('line', 'cells')
+
+    def __init__(self, line: str, cells: List[str]):
+        self.line = line
+        self.cells = cells
+
+    def identity(self, name_index: int, prof_index: int) -> Tuple[str, str]:
+        """Return (account_name, profession) from the name and profession cells."""
+        return tooltip(self.cells[name_index]), profession(self.cells[prof_index])
+
+
+def data_rows(lines: List[str], split: Callable[[str], List[str]] = compact_cells) -> Iterator[TableRow]:
+    """
+    Yield table data rows, skipping ``|!`` header cells and ``|thead`` class rows.
+
+    ``split`` chooses how cells are cut from the line: compact_cells (default),
+    positional_cells or all_fields.
+    """
+    for line in lines:
+        if line.startswith('|') and not line.startswith('|!') and not line.startswith('|thead'):
+            yield TableRow(line, split(line))
+
+
+def section(text: str, start_marker: str, end_marker: str = '</$reveal>') -> Optional[str]:
+    """Text from start_marker up to end_marker (or the end of text), or None if absent."""
+    start = text.find(start_marker)
+    if start == -1:
+        return None
+    end = text.find(end_marker, start)
+    return text[start:end if end != -1 else len(text)]
+
+
+def reveal_block_lines(text: str, marker: str) -> List[str]:
+    """
+    Lines of the animated ``<$reveal>`` block whose opening line contains marker.
+
+    The block ends at the next animated reveal, which is how the top-stats
+    output separates its per-stat views.
+    """
+    block = []
+    in_block = False
+    for line in text.split('\n'):
+        if marker in line and 'animate="yes"' in line:
+            in_block = True
+            continue
+        if 'animate="yes"' in line and in_block:
+            break
+        if in_block:
+            block.append(line)
+    return block
@@ -0,0 +1,120 @@
+"""
+On-disk cache of what sync_logs derives from remote pages, revalidated with
+conditional GETs.
+
+The aggregate site and the TiddlyWiki behind it are large and change a few
+times a week, so most syncs download them only to find nothing new. Each
+cache entry keeps the ETag/Last-Modified validators of the response it was
+built from together with the parsed result: the list of available logs,
+which for a wiki is its index of session tiddler titles. The next request
+sends those validators; on a 304 the stored result is used and the body is
+never downloaded. Tiddler contents are not cached; they are only fetched
+once the log list shows the wiki has changed.
+
+Entries are keyed by URL and by what was derived from the page.
+"""
+
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import requests
+
+from . import json_io
+
+
+class HttpCache:
+    """Parsed results stored as ``<cache_dir>/<hash>.meta.json`` plus ``<hash>.json``."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+
+    def _paths(self, url: str, key: str) -> Tuple[Path, Path]:
+        name = hashlib.sha1(f"{key}\0{url}".encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{name}.meta.json", self.cache_dir / f"{name}.json"
+
+    def _load_meta(self, url: str, key: str) -> Optional[dict]:
+        meta_path, payload_path = self._paths(url, key)
+        try:
+            meta = json_io.load_file(meta_path)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url or meta.get('key') != key or not payload_path.exists():
+            return None
+        return meta
+
+    def get(self, session: requests.Session, url: str, key: str, **kwargs) -> Tuple[Optional[requests.Response], Any]:
+        """
+        GET url, revalidating the result cached under key.
+
+        Returns (None, payload) when the server confirms the cached payload is
+        current, otherwise (response, None) for the caller to parse and store.
+        """
+        headers = dict(kwargs.pop('headers', None) or {})
+        meta = self._load_meta(url, key)
+        conditional = dict(headers)
+        if meta:
+            if meta.get('etag'):
+                conditional['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                conditional['If-Modified-Since'] = meta['last_modified']
+
+        response = session.get(url, headers=conditional, **kwargs)
+        if response.status_code != 304 or not meta:
+            return response, None
+
+        response.close()
+        try:
+            return None, json_io.load_file(self._paths(url, key)[1])
+        except (OSError, ValueError) as e:
+            # The payload went missing or is damaged; fetch the page in full
+            print(f"Warning: Discarding unreadable HTTP cache entry for {url}: {e}")
+            self.invalidate(url, key)
+            return session.get(url, headers=headers, **kwargs), None
+
+    def store(self, url: str, key: str, response: requests.Response, payload: Any) -> bool:
+        """Cache payload as derived from response; skipped if the server sent no validators."""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return False
+
+        meta = {
+            'url': url,
+            'key': key,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        meta_path, payload_path = self._paths(url, key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Payload first, so validators never point at a payload that was not written
+            self._write_atomic(payload_path, json_io.dumps_bytes(payload))
+            self._write_atomic(meta_path, json_io.dumps_bytes(meta, indent=True))
+        except OSError as e:
+            print(f"Warning: Could not write HTTP cache for {url}: {e}")
+            return False
+        return True
+
+    def invalidate(self, url: str, key: str):
+        """Drop the entry for url and key, if any."""
+        for path in self._paths(url, key):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _write_atomic(self, path: Path, data: bytes):
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{path.name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -0,0 +1,102 @@
+"""
+JSON serialization shared by the parser, the extractors and the web generator.
+
+Uses orjson when it is installed (``pip install gw2-leaderboard[fast]``) and
+falls back to the standard library otherwise. Both backends write the same
+text for the data this project produces: 2-space indentation, ``": "`` key
+separators and non-ASCII characters kept as UTF-8. Documents containing
+values orjson writes differently from the stdlib (NaN, floats in exponent
+notation, integers beyond 64 bits) are written by the stdlib encoder instead.
+"""
+
+import json
+import math
+import re
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    # Non-string keys are stringified like the stdlib does; dates, dataclasses
+    # and str/int subclasses go through ``default`` so both backends agree.
+    _ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+                       | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS)
+    _DecodeError = orjson.JSONDecodeError
+else:
+    _DecodeError = json.JSONDecodeError
+
+# Raised by loads()/load_file() on malformed input; a ValueError subclass for both backends
+JSONDecodeError = _DecodeError
+
+
+def backend_name() -> str:
+    """Name of the JSON library in use."""
+    return 'orjson' if ORJSON_AVAILABLE else 'json'
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode a JSON document from text or UTF-8 bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """Decode a UTF-8 JSON file."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data.decode('utf-8'))
+
+
+# Output that may hide a float orjson formats differently (null for NaN, 1e16
+# for the stdlib's 1e+16); only then is the object itself inspected.
+_SUSPECT_OUTPUT_PATTERN = re.compile(rb'null|[0-9]e-?[0-9]')
+
+
+def _has_stdlib_only_float(obj: Any) -> bool:
+    """True if obj holds a float the stdlib writes as NaN/Infinity or in exponent notation."""
+    if isinstance(obj, float):
+        return not math.isfinite(obj) or (obj != 0 and not 1e-4 <= abs(obj) < 1e16)
+    if isinstance(obj, dict):
+        return any(_has_stdlib_only_float(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_stdlib_only_float(value) for value in obj)
+    return False
+
+
+def dumps_bytes(obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """Encode obj as UTF-8 JSON bytes (2-space indented when indent is set)."""
+    if ORJSON_AVAILABLE:
+        try:
+            encoded = orjson.dumps(obj, default=default,
+                                   option=_ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+        except (orjson.JSONEncodeError, TypeError):
+            encoded = None
+        if encoded is not None and not (_SUSPECT_OUTPUT_PATTERN.search(encoded) and _has_stdlib_only_float(obj)):
+            return encoded
+
+    if indent:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, default=default)
+    else:
+        text = json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=default)
+    return text.encode('utf-8')
+
+
+def dumps(obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Encode obj as a JSON string (2-space indented when indent is set)."""
+    return dumps_bytes(obj, indent=indent, default=default).decode('utf-8')
+
+
+def dump_file(obj: Any, path: Union[str, Path], indent: bool = True,
+              default: Optional[Callable[[Any], Any]] = None):
+    """Write obj to path as UTF-8 JSON, indented by default."""
+    data = dumps_bytes(obj, indent=indent, default=default)
+    with open(path, 'wb') as f:
+        f.write(data)
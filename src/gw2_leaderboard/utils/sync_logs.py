@@ -11,15 +11,42 @@ import argparse
 import sys
 import os
 import re
+import threading
+import time
 import zipfile
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Set, Optional
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
 import subprocess
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from ..parsers import tiddler_store
+    from ..parsers.extract_logs import extracted_sessions, group_session_tiddlers, write_session_files
+    from ..parsers.parse_logs_enhanced import ingest_sessions, iter_session_dirs, load_ingest_manifest
+    from ..parsers.session_archive import pack_session_dir
+    from ..parsers.session_source import MemorySession, as_session_source
+    from ..core.glicko_rating_system import update_ratings_for_sessions
+    from ..web.generate_web_ui import build_web_ui
+    from .http_cache import HttpCache
+    from .sync_pipeline import run_streaming_sync
+except ImportError:
+    # Fall back to absolute imports for standalone execution
+    from gw2_leaderboard.parsers import tiddler_store
+    from gw2_leaderboard.parsers.extract_logs import extracted_sessions, group_session_tiddlers, write_session_files
+    from gw2_leaderboard.parsers.parse_logs_enhanced import ingest_sessions, iter_session_dirs, load_ingest_manifest
+    from gw2_leaderboard.parsers.session_archive import pack_session_dir
+    from gw2_leaderboard.parsers.session_source import MemorySession, as_session_source
+    from gw2_leaderboard.core.glicko_rating_system import update_ratings_for_sessions
+    from gw2_leaderboard.web.generate_web_ui import build_web_ui
+    from gw2_leaderboard.utils.http_cache import HttpCache
+    from gw2_leaderboard.utils.sync_pipeline import run_streaming_sync
 
 # Configuration
 DEFAULT_CONFIG = {
@@ -28,17 +55,85 @@ DEFAULT_CONFIG = {
     "extracted_logs_dir": "extracted_logs",
     "web_ui_output": "web_ui_final",
     "auto_confirm": False,  # Set to True to skip confirmation prompts
-    "max_logs_per_run": 5   # Limit new logs to prevent overwhelming
+    "max_logs_per_run": 5,  # Limit new logs to prevent overwhelming
+    "max_concurrent_downloads": 4,  # Log files downloaded and extracted at once
+    "direct_ingest": False,  # Parse TiddlyWiki logs straight into the database
+    "archive_extracted_logs": True,  # With direct_ingest, still write extracted_logs/ JSON files
+    "streaming_sync": False,  # Overlap downloading, parsing and rating of new logs
+    "compress_extracted_logs": False,  # Store each extracted session as one <timestamp>.tar.gz
+    "http_cache_dir": "http_cache"  # Log list (a wiki's tiddler index) kept between runs; "" disables
 }
 
 CONFIG_FILE = "sync_config.json"
 
-# Global cache for TiddlyWiki content to avoid multiple downloads per sync run
+# Global cache for TiddlyWiki tiddlers to avoid multiple downloads per sync run.
+# Only session tiddlers are kept, grouped by their 12-digit timestamp.
 _tiddlywiki_cache = {
     'url': None,
-    'content': None,
-    'tiddlers': None
+    'sessions': None
 }
+_tiddlywiki_lock = threading.Lock()
+
+# One pooled HTTP session per process so concurrent downloads reuse connections
+_http_session = None
+_http_pool_size = 0
+_http_session_lock = threading.Lock()
+
+# Retries for connection errors and transient server responses, with
+# exponential backoff (0.5s, 1s, 2s, ...) between attempts
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def get_http_session(pool_size: int = 10) -> requests.Session:
+    """
+    Shared requests.Session with connection pooling and retry/backoff.
+    
+    The pool holds at least pool_size connections per host; asking for more
+    than the session was created with mounts a larger adapter.
+    """
+    global _http_session, _http_pool_size
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = requests.Session()
+            _http_pool_size = 0
+        if pool_size > _http_pool_size:
+            retry = Retry(total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF_FACTOR,
+                          status_forcelist=HTTP_RETRY_STATUSES, raise_on_status=False)
+            adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+            _http_session.mount('http://', adapter)
+            _http_session.mount('https://', adapter)
+            _http_pool_size = pool_size
+        return _http_session
+
+
+# On-disk cache revalidated with conditional GETs; None sends plain requests
+_http_cache = None
+
+
+def configure_http_cache(cache_dir: Optional[str]):
+    """Cache parsed pages under cache_dir between runs, or disable caching if empty."""
+    global _http_cache
+    _http_cache = HttpCache(cache_dir) if cache_dir else None
+
+
+def cached_get(url: str, key: str, **kwargs):
+    """
+    GET url through the HTTP cache.
+    
+    Returns (None, payload) when the result cached under key is still current,
+    otherwise (response, None).
+    """
+    if _http_cache is None:
+        return get_http_session().get(url, **kwargs), None
+    return _http_cache.get(get_http_session(), url, key, **kwargs)
+
+
+def store_cached(url: str, key: str, response: requests.Response, payload):
+    """Remember what was parsed from response for the next conditional GET."""
+    if _http_cache is not None:
+        _http_cache.store(url, key, response, payload)
 
 
 def load_config():
@@ -85,15 +180,21 @@ def fetch_available_logs(base_url: str) -> List[Dict]:
     print(f"🌐 Fetching log list from {base_url}...")
     
     try:
-        response = requests.get(base_url, timeout=30)
+        response, cached_logs = cached_get(base_url, 'available_logs', timeout=30)
+        if response is None:
+            print(f"📋 Log list unchanged since last sync ({len(cached_logs)} logs)")
+            return cached_logs
         response.raise_for_status()
         content = response.text
         
         # Check if this is a TiddlyWiki site
         if 'tiddlywiki' in content.lower() or 'tiddler' in content.lower():
-            return fetch_logs_from_tiddlywiki(base_url, content)
+            available_logs = fetch_logs_from_tiddlywiki(base_url, content)
         else:
-            return fetch_logs_from_static_site(base_url, content)
+            available_logs = fetch_logs_from_static_site(base_url, content)
+        
+        store_cached(base_url, 'available_logs', response, available_logs)
+        return available_logs
             
     except Exception as e:
         print(f"❌ Error fetching logs: {e}")
@@ -202,8 +303,8 @@ def fetch_logs_from_static_site(base_url: str, content: str) -> List[Dict]:
     return available_logs
 
 
-def download_and_extract_log(log_info: Dict, extracted_logs_dir: str) -> bool:
-    """Download and extract a log file."""
+def download_and_extract_log(log_info: Dict, extracted_logs_dir: str, compress: bool = False) -> bool:
+    """Download and extract a log file, packed into a session archive if compress is set."""
     timestamp = log_info['timestamp']
     url = log_info['url']
     filename = log_info['filename']
@@ -216,18 +317,24 @@ def download_and_extract_log(log_info: Dict, extracted_logs_dir: str) -> bool:
         extract_dir.mkdir(parents=True, exist_ok=True)
         
         if log_info.get('is_tiddlywiki', False):
-            # This is a TiddlyWiki tiddler - use new BeautifulSoup-based extraction
-            return extract_tiddlywiki_tiddler_new(log_info, str(extract_dir))
+            # This is a TiddlyWiki tiddler - extract it from the streamed tiddler store
+            return extract_tiddlywiki_tiddler_new(log_info, str(extract_dir), compress)
         
         # Regular file download
-        response = requests.get(url, timeout=60, stream=True)
+        response = get_http_session().get(url, timeout=60, stream=True)
         response.raise_for_status()
         
         # Download to temporary file
         with tempfile.NamedTemporaryFile(delete=False, suffix=Path(filename).suffix) as tmp_file:
-            for chunk in response.iter_content(chunk_size=8192):
-                tmp_file.write(chunk)
             tmp_file_path = tmp_file.name
+            try:
+                for chunk in response.iter_content(chunk_size=8192):
+                    tmp_file.write(chunk)
+            except BaseException:
+                # The body is streamed, so the download can fail partway
+                tmp_file.close()
+                os.unlink(tmp_file_path)
+                raise
         
         try:
             if filename.lower().endswith('.zip'):
@@ -268,6 +375,8 @@ def download_and_extract_log(log_info: Dict, extracted_logs_dir: str) -> bool:
             json_files = list(extract_dir.glob("*.json"))
             if json_files:
                 print(f"✅ Successfully extracted {len(json_files)} JSON files")
+                if compress:
+                    pack_session_dir(extract_dir)
                 return True
             else:
                 print(f"❌ No JSON files found after extraction")
@@ -282,103 +391,168 @@ def download_and_extract_log(log_info: Dict, extracted_logs_dir: str) -> bool:
         return False
 
 
-def get_tiddlywiki_tiddlers(base_url: str) -> Optional[List[Dict]]:
-    """Download and parse TiddlyWiki tiddlers with caching."""
-    global _tiddlywiki_cache
+def download_logs(logs: List[Dict], extracted_logs_dir: str, max_workers: int = 4,
+                  compress: bool = False) -> List[Dict]:
+    """
+    Download and extract logs with at most max_workers in flight at once.
+    
+    Returns the logs that were extracted successfully, in their original order.
+    """
+    if not logs:
+        return []
     
-    # Check cache first
-    if _tiddlywiki_cache['url'] == base_url and _tiddlywiki_cache['tiddlers'] is not None:
-        print("📋 Using cached TiddlyWiki data")
-        return _tiddlywiki_cache['tiddlers']
+    max_workers = max(1, min(max_workers, len(logs)))
+    # Size the connection pool so no worker waits for a free connection
+    get_http_session(pool_size=max(10, max_workers))
+    print(f"\n📦 Downloading {len(logs)} logs ({max_workers} at a time)...")
+    
+    def timed_download(log):
+        start = time.perf_counter()
+        ok = download_and_extract_log(log, extracted_logs_dir, compress)
+        return ok, time.perf_counter() - start
+    
+    succeeded = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(timed_download, log): i for i, log in enumerate(logs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            log = logs[futures[future]]
+            ok, elapsed = future.result()
+            if ok:
+                succeeded.add(futures[future])
+                print(f"📦 [{done}/{len(logs)}] ✅ {log['filename']} ({elapsed:.1f}s)")
+            else:
+                print(f"📦 [{done}/{len(logs)}] ❌ Failed to process {log['filename']}")
     
+    return [log for i, log in enumerate(logs) if i in succeeded]
+
+
+def get_tiddlywiki_sessions(base_url: str) -> Optional[Dict[str, List[Dict]]]:
+    """Download TiddlyWiki tiddlers, grouped by session timestamp, with caching."""
+    # Concurrent log downloads from the same wiki share a single download
+    with _tiddlywiki_lock:
+        # Check cache first
+        if _tiddlywiki_cache['url'] == base_url and _tiddlywiki_cache['sessions'] is not None:
+            print("📋 Using cached TiddlyWiki data")
+            return _tiddlywiki_cache['sessions']
+        
+        sessions = _download_tiddlywiki_sessions(base_url)
+        if sessions is not None:
+            _tiddlywiki_cache['url'] = base_url
+            _tiddlywiki_cache['sessions'] = sessions
+        return sessions
+
+
+def _download_tiddlywiki_sessions(base_url: str) -> Optional[Dict[str, List[Dict]]]:
     print(f"🌐 Downloading TiddlyWiki from {base_url}...")
     
+    tmp_file_path = None
     try:
-        response = requests.get(base_url, timeout=60)
+        # Stream the page to disk rather than holding it (and a parsed copy) in memory.
+        # Not revalidated through the HTTP cache: the log list is fetched from the
+        # same URL first, so the wiki is only downloaded here when it has changed.
+        response = get_http_session().get(base_url, timeout=60, stream=True)
         response.raise_for_status()
-        content = response.text
-        
-        # Parse with BeautifulSoup (same method as extract_logs.py)
-        soup = BeautifulSoup(content, 'html.parser')
-        tiddler_store = soup.find('script', {'class': 'tiddlywiki-tiddler-store'})
-        
-        if not tiddler_store:
-            print("❌ Could not find tiddler store in TiddlyWiki HTML")
-            return None
-        
-        # Parse the JSON data
-        tiddler_data = json.loads(tiddler_store.string)
-        print(f"📋 Found {len(tiddler_data)} tiddlers in TiddlyWiki")
-        
-        # Update cache
-        _tiddlywiki_cache['url'] = base_url
-        _tiddlywiki_cache['content'] = content
-        _tiddlywiki_cache['tiddlers'] = tiddler_data
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.html') as tmp_file:
+            # Set before writing so a download that fails partway is still removed
+            tmp_file_path = tmp_file.name
+            for chunk in response.iter_content(chunk_size=1 << 20):
+                tmp_file.write(chunk)
         
-        return tiddler_data
+        # Decode the tiddler store one tiddler at a time, keeping session tiddlers.
+        # The page and other tiddlers are never held in memory, but every session
+        # tiddler is kept (here and in the per-run cache) until the sync ends, so
+        # peak memory grows with the total size of the session tiddlers.
+        sessions, _, tiddler_count = group_session_tiddlers(tiddler_store.iter_tiddlers(tmp_file_path))
+        print(f"📋 Found {tiddler_count} tiddlers in TiddlyWiki ({len(sessions)} log sessions)")
+        return sessions
         
+    except tiddler_store.TiddlerStoreError as e:
+        print(f"❌ {e}")
+        return None
     except Exception as e:
         print(f"❌ Failed to download or parse TiddlyWiki: {e}")
         return None
+    finally:
+        if tmp_file_path:
+            os.unlink(tmp_file_path)
 
 
-def extract_tiddlywiki_tiddler_new(log_info: Dict, extract_dir: str) -> bool:
-    """Extract data from a specific TiddlyWiki tiddler using BeautifulSoup."""
+def extract_tiddlywiki_tiddler_new(log_info: Dict, extract_dir: str, compress: bool = False) -> bool:
+    """Extract the tiddlers of one session from the streamed TiddlyWiki store."""
     timestamp = log_info['timestamp']
     base_url = log_info['source_page']
     
     print(f"📜 Extracting TiddlyWiki tiddlers for timestamp: {timestamp}")
     
-    # Get all tiddlers from TiddlyWiki
-    tiddlers = get_tiddlywiki_tiddlers(base_url)
-    if not tiddlers:
+    # Get the session's tiddlers from TiddlyWiki
+    sessions = get_tiddlywiki_sessions(base_url)
+    if not sessions:
         return False
     
-    # Find all tiddlers related to this timestamp
-    related_tiddlers = []
-    for tiddler in tiddlers:
-        title = tiddler.get('title', '')
-        if title.startswith(timestamp):
-            related_tiddlers.append(tiddler)
-    
+    related_tiddlers = sessions.get(timestamp, [])
     if not related_tiddlers:
         print(f"❌ No tiddlers found for timestamp {timestamp}")
         return False
     
     print(f"✅ Found {len(related_tiddlers)} tiddlers for {timestamp}")
     
-    # Create extraction directory
-    extract_path = Path(extract_dir)
-    extract_path.mkdir(parents=True, exist_ok=True)
-    
-    # Save each related tiddler as a separate JSON file
-    for tiddler in related_tiddlers:
-        tiddler_title = tiddler.get('title', '')
-        # Clean filename (same logic as extract_logs.py)
-        filename = re.sub(r'[^\w\-_.]', '_', tiddler_title) + '.json'
-        
-        file_path = extract_path / filename
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(tiddler, f, indent=2, ensure_ascii=False)
-    
-    # Create a summary info file (same as extract_logs.py)
+    # Save each related tiddler as a separate JSON file, then summary.json
     main_tiddler = next((t for t in related_tiddlers if t.get('title', '').endswith('-Log-Summary')), related_tiddlers[0])
-    summary_info = {
-        'timestamp': timestamp,
-        'main_tiddler': main_tiddler.get('title'),
-        'tiddler_count': len(related_tiddlers),
-        'tiddler_titles': [t.get('title') for t in related_tiddlers],
-        'created': main_tiddler.get('created'),
-        'modified': main_tiddler.get('modified')
-    }
-    
-    with open(extract_path / 'summary.json', 'w', encoding='utf-8') as f:
-        json.dump(summary_info, f, indent=2, ensure_ascii=False)
+    write_session_files(Path(extract_dir), timestamp, related_tiddlers, main_tiddler, compress=compress)
     
     print(f"✅ Successfully extracted {len(related_tiddlers)} tiddlers")
     return True
 
 
+def ingest_tiddlywiki_logs(logs: List[Dict], database_path: str, archive_dir: Optional[str] = None,
+                           compress: bool = False) -> List[str]:
+    """
+    Parse TiddlyWiki logs straight from the tiddler store into the database.
+    
+    Tiddler JSON files are only written when archive_dir is given (as one
+    session archive each if compress is set). Returns
+    the timestamps of the logs whose tiddlers were found.
+    """
+    sessions = []
+    for log_info in logs:
+        tiddler_sessions = get_tiddlywiki_sessions(log_info['source_page'])
+        related_tiddlers = (tiddler_sessions or {}).get(log_info['timestamp'])
+        if not related_tiddlers:
+            print(f"❌ No tiddlers found for timestamp {log_info['timestamp']}")
+            continue
+        sessions.append(MemorySession(log_info['timestamp'], related_tiddlers))
+    
+    if not sessions:
+        return []
+    
+    sessions.sort(key=lambda session: session.timestamp)
+    print(f"🗄️  Ingesting {len(sessions)} logs directly into {database_path}...")
+    ingest_sessions(sessions, database_path)
+    
+    if archive_dir:
+        archived = extracted_sessions(archive_dir)
+        for session in sessions:
+            if session.timestamp in archived:
+                continue
+            tiddlers = session.tiddlers()
+            main_tiddler = next((t for t in tiddlers if t.get('title', '').endswith('-Log-Summary')), tiddlers[0])
+            write_session_files(Path(archive_dir) / session.timestamp, session.timestamp, tiddlers, main_tiddler,
+                                compress=compress)
+        print(f"📁 Archived tiddler files to {archive_dir}")
+    
+    return [session.timestamp for session in sessions]
+
+
+def ingested_timestamps(database_path: str) -> Set[str]:
+    """Timestamps already in the database's ingest manifest (empty if there is none yet)."""
+    if not Path(database_path).exists():
+        return set()
+    try:
+        return set(load_ingest_manifest(database_path))
+    except sqlite3.Error:
+        return set()
+
+
 def extract_tiddlywiki_tiddler(log_info: Dict, extract_dir: str) -> bool:
     """Extract data from a specific TiddlyWiki tiddler."""
     print(f"📜 Extracting TiddlyWiki tiddler: {log_info.get('tiddler_title', 'Unknown')}")
@@ -386,7 +560,7 @@ def extract_tiddlywiki_tiddler(log_info: Dict, extract_dir: str) -> bool:
     try:
         # For TiddlyWiki sites, we need to fetch the whole site and extract the specific tiddler
         base_url = log_info['source_page']
-        response = requests.get(base_url, timeout=60)
+        response = get_http_session().get(base_url, timeout=60)
         response.raise_for_status()
         
         content = response.text
@@ -556,65 +730,54 @@ def extract_json_from_tiddlywiki(tw_path: str, output_dir: str):
         print(f"❌ Manual extraction failed: {e}")
 
 
-def process_new_logs(extracted_logs_dir: str, database_path: str):
-    """Process newly downloaded logs through the pipeline."""
-    print("🔄 Processing new logs through pipeline...")
+def process_new_logs(extracted_logs_dir: str, database_path: str,
+                     new_timestamps: Optional[List[str]] = None, ingested: Optional[List[str]] = None) -> bool:
+    """
+    Parse and rate newly downloaded logs in this process.
     
-    steps = [
-        {
-            'name': 'Parse logs',
-            'script': 'parse_logs_enhanced.py',
-            'args': [extracted_logs_dir, '-d', database_path]
-        },
-        {
-            'name': 'Recalculate Glicko ratings',
-            'script': 'glicko_rating_system.py',
-            'args': [database_path, '--recalculate']
-        }
-    ]
+    new_timestamps are the sessions just written to extracted_logs_dir, and
+    only those are parsed (None parses every new or changed session there).
+    ingested are sessions already stored by direct ingest. Ratings are then
+    brought up to date for exactly the sessions written by this run.
+    """
+    print("🔄 Processing new logs through pipeline...")
     
-    for step in steps:
-        print(f"📊 {step['name']}...")
-        
-        if not Path(step['script']).exists():
-            print(f"❌ Script not found: {step['script']}")
-            return False
-        
-        result = subprocess.run([
-            sys.executable, step['script']] + step['args'], 
-            capture_output=True, text=True
-        )
+    written = list(ingested or [])
+    step = 'Parse logs'
+    try:
+        if new_timestamps is None or new_timestamps:
+            print(f"📊 {step}...")
+            if new_timestamps is None:
+                sessions = iter_session_dirs(Path(extracted_logs_dir))
+            else:
+                sessions = [as_session_source(Path(extracted_logs_dir) / timestamp)
+                            for timestamp in sorted(new_timestamps)]
+            written += ingest_sessions(sessions, database_path)
+            print(f"✅ {step} completed")
         
-        if result.returncode != 0:
-            print(f"❌ {step['name']} failed:")
-            print(result.stderr)
-            return False
-        else:
-            print(f"✅ {step['name']} completed")
+        step = 'Update Glicko ratings'
+        print(f"📊 {step}...")
+        method = update_ratings_for_sessions(database_path, written)
+        print(f"✅ {step} completed ({method}, {len(written)} new sessions)")
+    except Exception as e:
+        print(f"❌ {step} failed: {e}")
+        return False
     
     return True
 
 
 def generate_web_ui(database_path: str, output_dir: str):
-    """Generate the web UI."""
+    """Regenerate the web UI from ratings that process_new_logs already updated."""
     print("🌐 Generating web UI...")
     
-    if not Path("generate_web_ui.py").exists():
-        print("❌ Web UI generator not found: generate_web_ui.py")
+    try:
+        build_web_ui(database_path, Path(output_dir), skip_recalc=True)
+    except Exception as e:
+        print(f"❌ Web UI generation failed: {e}")
         return False
     
-    result = subprocess.run([
-        sys.executable, "generate_web_ui.py", 
-        database_path, "-o", output_dir
-    ], capture_output=True, text=True)
-    
-    if result.returncode != 0:
-        print(f"❌ Web UI generation failed:")
-        print(result.stderr)
-        return False
-    else:
-        print(f"✅ Web UI generated in {output_dir}")
-        return True
+    print(f"✅ Web UI generated in {output_dir}")
+    return True
 
 
 def main():
@@ -626,6 +789,18 @@ def main():
     parser.add_argument("--download-only", action="store_true", help="Only download logs, skip processing and UI generation")
     parser.add_argument("--auto-confirm", action="store_true", help="Skip confirmation prompts")
     parser.add_argument("--max-logs", type=int, help="Maximum number of new logs to process")
+    parser.add_argument("--download-workers", type=int,
+                        help="Number of logs to download at once (default from config)")
+    parser.add_argument("--direct", action="store_true",
+                        help="Parse TiddlyWiki logs straight into the database without going through extracted_logs")
+    parser.add_argument("--no-archive", action="store_true",
+                        help="With --direct, do not write the extracted JSON files")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Parse and rate each log while the next ones download")
+    parser.add_argument("--compress", action="store_true",
+                        help="Store each extracted log as one compressed session archive")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Download the log site in full instead of revalidating the HTTP cache")
     
     args = parser.parse_args()
     
@@ -640,6 +815,18 @@ def main():
         config["auto_confirm"] = True
     if args.max_logs:
         config["max_logs_per_run"] = args.max_logs
+    if args.download_workers:
+        config["max_concurrent_downloads"] = args.download_workers
+    if args.direct:
+        config["direct_ingest"] = True
+    if args.no_archive:
+        config["archive_extracted_logs"] = False
+    if args.streaming:
+        config["streaming_sync"] = True
+    if args.compress:
+        config["compress_extracted_logs"] = True
+    direct = config.get("direct_ingest", False)
+    configure_http_cache(None if args.no_cache else config.get("http_cache_dir", DEFAULT_CONFIG["http_cache_dir"]))
     
     print("🏆 GW2 WvW Leaderboard Log Sync")
     print("=" * 40)
@@ -650,6 +837,9 @@ def main():
     
     # Get existing logs
     existing_logs = get_existing_logs(config["extracted_logs_dir"])
+    if direct:
+        # Directly ingested logs may not have been archived to extracted_logs
+        existing_logs |= ingested_timestamps(config["database_path"])
     print(f"📋 Found {len(existing_logs)} existing logs")
     
     # Fetch available logs
@@ -695,16 +885,34 @@ def main():
             return 0
     
     # Download and process new logs
-    success_count = 0
-    
-    for i, log in enumerate(new_logs, 1):
-        print(f"\n📦 Processing log {i}/{len(new_logs)}: {log['filename']}")
-        
-        if download_and_extract_log(log, config["extracted_logs_dir"]):
-            success_count += 1
-        else:
-            print(f"❌ Failed to process {log['filename']}")
+    # Download-only runs must not touch the database, so TiddlyWiki logs are extracted like the rest
+    direct_logs = [log for log in new_logs
+                   if direct and not args.download_only and log.get('is_tiddlywiki', False)]
+    download_queue = [log for log in new_logs if log not in direct_logs]
+    streaming = config.get("streaming_sync", False) and not args.download_only
+    compress = config.get("compress_extracted_logs", False)
+    
+    directly_ingested = []
+    if direct_logs:
+        archive_dir = config["extracted_logs_dir"] if config.get("archive_extracted_logs", True) else None
+        directly_ingested = ingest_tiddlywiki_logs(direct_logs, config["database_path"], archive_dir, compress)
+    
+    if streaming:
+        # Parse and rate each log while the next ones are still downloading
+        print(f"\n🚰 Streaming {len(download_queue)} logs through download, parse and rating...")
+        try:
+            downloaded = run_streaming_sync(download_queue, config["extracted_logs_dir"], config["database_path"],
+                                            partial(download_and_extract_log, compress=compress),
+                                            config.get("max_concurrent_downloads", 4),
+                                            ingested=directly_ingested)
+        except Exception as e:
+            print(f"❌ Streaming sync failed: {e}")
+            return 1
+    else:
+        downloaded = [log['timestamp'] for log in download_logs(download_queue, config["extracted_logs_dir"],
+                                                                 config.get("max_concurrent_downloads", 4), compress)]
     
+    success_count = len(downloaded) + len(directly_ingested)
     if success_count == 0:
         print("❌ No logs were successfully processed")
         return 1
@@ -716,8 +924,15 @@ def main():
         print("📦 Download-only mode: Skipping log processing and UI generation")
         return 0
     
-    # Process logs through pipeline
-    if process_new_logs(config["extracted_logs_dir"], config["database_path"]):
+    if streaming:
+        # The pipeline has already stored and rated every session
+        pipeline_ok = True
+    else:
+        # Parse only the logs downloaded by this run (directly ingested logs are
+        # already stored), then rate just those sessions
+        pipeline_ok = process_new_logs(config["extracted_logs_dir"], config["database_path"],
+                                       new_timestamps=downloaded, ingested=directly_ingested)
+    if pipeline_ok:
         print("✅ Log processing pipeline completed")
         
         # Generate web UI
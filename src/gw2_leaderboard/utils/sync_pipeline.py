@@ -0,0 +1,218 @@
+"""
+Streaming sync: download, parse, store and rate new logs as one pipeline.
+
+The phased sync downloads every new log, then parses them all, then rates
+them all, so the CPU idles while files download and the network idles while
+they are parsed. Here the three stages run at once, connected by bounded
+queues:
+
+    download threads --(parse queue)--> parser thread --(store queue)--> writer/rater
+
+Session N is parsed while session N+1 is still downloading. A full queue
+blocks the stage feeding it, so no stage runs more than a few sessions ahead.
+Downloads finish in any order, but Glicko updates depend on order, so the
+writer stores each session as it arrives and rates it only once every
+earlier new session has been stored (or has failed).
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    from ..core.glicko_rating_system import (
+        calculate_glicko_ratings_for_session, get_last_processed_timestamp,
+        initialize_database_schema, update_ratings_for_sessions, update_ratings_incrementally)
+    from ..parsers.bulk_writer import BulkWriter
+    from ..parsers.high_scores_parser import HighScoresParser
+    from ..parsers.parse_logs_enhanced import (
+        SessionDeduplicator, ensure_database_schema, load_damage_keys, parse_session, session_damage_key)
+    from ..parsers.session_source import as_session_source
+except ImportError:
+    # Fall back to absolute imports for standalone execution
+    from gw2_leaderboard.core.glicko_rating_system import (
+        calculate_glicko_ratings_for_session, get_last_processed_timestamp,
+        initialize_database_schema, update_ratings_for_sessions, update_ratings_incrementally)
+    from gw2_leaderboard.parsers.bulk_writer import BulkWriter
+    from gw2_leaderboard.parsers.high_scores_parser import HighScoresParser
+    from gw2_leaderboard.parsers.parse_logs_enhanced import (
+        SessionDeduplicator, ensure_database_schema, load_damage_keys, parse_session, session_damage_key)
+    from gw2_leaderboard.parsers.session_source import as_session_source
+
+# Sessions a stage may run ahead of the next one
+DEFAULT_QUEUE_SIZE = 2
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+def _put(target: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(source: queue.Queue, stop: threading.Event):
+    """Blocking get that returns _DONE once the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            return source.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+class _RatingOrder:
+    """Releases stored sessions for rating in strict timestamp order."""
+
+    def __init__(self, timestamps: Iterable[str]):
+        self.expected = sorted(timestamps)
+        self.position = 0
+        self.finished: Dict[str, bool] = {}
+
+    def finish(self, timestamp: str, stored: bool) -> List[str]:
+        """Record a session's outcome; return the stored sessions now ready to rate."""
+        self.finished[timestamp] = stored
+        ready = []
+        while self.position < len(self.expected) and self.expected[self.position] in self.finished:
+            next_timestamp = self.expected[self.position]
+            if self.finished[next_timestamp]:
+                ready.append(next_timestamp)
+            self.position += 1
+        return ready
+
+
+def run_streaming_sync(logs: List[Dict], extracted_logs_dir: str, database_path: str,
+                       download: Callable[[Dict, str], bool], download_workers: int = 4,
+                       queue_size: int = DEFAULT_QUEUE_SIZE, ingested: Optional[List[str]] = None) -> List[str]:
+    """
+    Download, parse, store and rate logs with the stages overlapped.
+
+    download(log_info, extracted_logs_dir) fetches one log into
+    ``<extracted_logs_dir>/<timestamp>/`` and returns True on success
+    (sync_logs.download_and_extract_log). ingested are sessions already in
+    the database from this run (direct ingest) that still need rating.
+    Returns the timestamps stored by the pipeline; re-uploads of a session
+    already in the database are recorded in the manifest but not stored.
+    """
+    ingested = list(ingested or [])
+    timestamps = [log['timestamp'] for log in logs]
+    if not timestamps and not ingested:
+        return []
+
+    ensure_database_schema(database_path)
+    initialize_database_schema(database_path)
+    last_rated = get_last_processed_timestamp(database_path)
+    # Ratings can only stream on top of the existing history when every new
+    # session is newer than the last rated one; otherwise rebuild at the end.
+    stream_ratings = last_rated is not None and min(timestamps + ingested) > last_rated
+    if stream_ratings:
+        # Rate anything stored earlier but never rated, so it is not skipped
+        update_ratings_incrementally(database_path)
+
+    deduplicator = SessionDeduplicator(load_damage_keys(database_path))
+    parse_queue = queue.Queue(maxsize=queue_size)
+    store_queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    total = len(logs)
+    # Oldest first, so the sessions that unblock rating arrive early
+    ordered_logs = sorted(logs, key=lambda log: log['timestamp'])
+
+    def download_one(log_info: Dict):
+        if stop.is_set():
+            return
+        try:
+            ok = download(log_info, extracted_logs_dir)
+        except Exception as e:
+            print(f"❌ Failed to download {log_info['filename']}: {e}")
+            ok = False
+        _put(parse_queue, (log_info, ok), stop)
+
+    def download_all():
+        with ThreadPoolExecutor(max_workers=max(1, min(download_workers, total or 1))) as executor:
+            list(executor.map(download_one, ordered_logs))
+        _put(parse_queue, _DONE, stop)
+
+    def parse_all():
+        high_scores_parser = HighScoresParser()
+        while True:
+            item = _get(parse_queue, stop)
+            if item is _DONE:
+                break
+            log_info, ok = item
+            parsed = None
+            if ok:
+                session = as_session_source(Path(extracted_logs_dir) / log_info['timestamp'])
+                try:
+                    damage_key = session_damage_key(session)
+                    duplicate_of = deduplicator.check(session.timestamp, damage_key)
+                    performances, high_scores = [], []
+                    if not duplicate_of:
+                        performances, high_scores = parse_session(session, high_scores_parser)
+                    parsed = (performances, high_scores, session.signature(), session.fingerprint(),
+                              damage_key, duplicate_of)
+                except Exception as e:
+                    print(f"❌ Failed to parse {log_info['filename']}: {e}")
+            _put(store_queue, (log_info, parsed), stop)
+        _put(store_queue, _DONE, stop)
+
+    stages = [threading.Thread(target=download_all, name='sync-download', daemon=True),
+              threading.Thread(target=parse_all, name='sync-parse', daemon=True)]
+    for stage in stages:
+        stage.start()
+
+    order = _RatingOrder(timestamps + ingested)
+    stored = []
+    try:
+        # Directly ingested sessions are already stored and only wait for their turn
+        for timestamp in ingested:
+            for ready_timestamp in order.finish(timestamp, True):
+                if stream_ratings:
+                    calculate_glicko_ratings_for_session(database_path, ready_timestamp, history_mode=True)
+
+        with BulkWriter(database_path) as writer:
+            done = 0
+            while True:
+                item = store_queue.get()
+                if item is _DONE:
+                    break
+                log_info, parsed = item
+                done += 1
+                timestamp = log_info['timestamp']
+                if parsed is None:
+                    print(f"📦 [{done}/{total}] ❌ {log_info['filename']}")
+                    ready = order.finish(timestamp, False)
+                else:
+                    performances, high_scores, signature, fingerprint, damage_key, duplicate_of = parsed
+                    writer.add_session(timestamp, performances, high_scores, signature, fingerprint,
+                                       damage_key=damage_key, duplicate_of=duplicate_of)
+                    # Commit now so the rating step (its own connections) sees the rows
+                    writer.flush()
+                    if duplicate_of:
+                        print(f"📦 [{done}/{total}] 🔁 {log_info['filename']} is a re-upload of {duplicate_of}")
+                    else:
+                        stored.append(timestamp)
+                        print(f"📦 [{done}/{total}] ✅ {log_info['filename']} stored")
+                    ready = order.finish(timestamp, not duplicate_of)
+
+                if stream_ratings:
+                    for ready_timestamp in ready:
+                        calculate_glicko_ratings_for_session(database_path, ready_timestamp, history_mode=True)
+                        print(f"📈 Rated {ready_timestamp}")
+    finally:
+        stop.set()
+        for stage in stages:
+            stage.join(timeout=5)
+
+    if not stream_ratings and (stored or ingested):
+        print("📈 New sessions predate the rating history; rebuilding ratings...")
+        update_ratings_for_sessions(database_path, stored + ingested)
+
+    return stored
@@ -0,0 +1,173 @@
+"""
+Watch mode: keep the leaderboard current as new sessions arrive.
+
+Running workflow.py from cron pays the whole pipeline's startup on every
+run: imports, a scan of every extracted session against the ingest
+manifest, a fresh HTTP connection and a full download of the log list.
+LeaderboardWatcher does that once and then polls. Each cycle it
+
+1. asks the aggregate site for new logs (a conditional GET through the HTTP
+   cache, so an unchanged site costs one 304) and downloads them into
+   extracted_logs, and
+2. looks for session directories that appeared or changed in extracted_logs
+   (one stat per directory), whether this process or something else wrote
+   them.
+
+Every new session is parsed, stored, rated and published as soon as it is
+seen. Between cycles the watcher keeps the session directories it has
+already handled, the parse cache and the pooled HTTP session in memory.
+"""
+
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from ..core.glicko_rating_system import update_ratings_for_sessions
+    from ..parsers.extract_logs import extracted_sessions
+    from ..parsers.parse_cache import ParseCache
+    from ..parsers.parse_logs_enhanced import (
+        PARSER_VERSION, ensure_database_schema, ingest_sessions, iter_session_dirs, load_ingest_manifest)
+    from ..parsers.session_source import as_session_source
+    from ..web.generate_web_ui import build_web_ui
+    from . import sync_logs
+except ImportError:
+    # Fall back to absolute imports for standalone execution
+    from gw2_leaderboard.core.glicko_rating_system import update_ratings_for_sessions
+    from gw2_leaderboard.parsers.extract_logs import extracted_sessions
+    from gw2_leaderboard.parsers.parse_cache import ParseCache
+    from gw2_leaderboard.parsers.parse_logs_enhanced import (
+        PARSER_VERSION, ensure_database_schema, ingest_sessions, iter_session_dirs, load_ingest_manifest)
+    from gw2_leaderboard.parsers.session_source import as_session_source
+    from gw2_leaderboard.web.generate_web_ui import build_web_ui
+    from gw2_leaderboard.utils import sync_logs
+
+# Seconds between scans of extracted_logs
+DEFAULT_POLL_INTERVAL = 10
+
+# Seconds between checks of the aggregate site
+DEFAULT_REMOTE_INTERVAL = 300
+
+
+class LeaderboardWatcher:
+    """Polls for new sessions and runs each through parse, store, rate and publish."""
+
+    def __init__(self, config: Dict, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 remote_interval: Optional[float] = DEFAULT_REMOTE_INTERVAL):
+        self.logs_path = Path(config['extracted_logs_dir'])
+        self.db_path = config['database_path']
+        self.output_dir = Path(config['web_ui_output'])
+        self.base_url = config.get('log_aggregate_url')
+        self.compress = config.get('compress_extracted_logs', False)
+        self.download_workers = config.get('max_concurrent_downloads', 4)
+        self.poll_interval = poll_interval
+        # None disables the remote check, e.g. when logs are dropped in by another tool
+        self.remote_interval = remote_interval if self.base_url else None
+        self.cache = ParseCache(config['parse_cache_dir'], PARSER_VERSION) if config.get('parse_cache_dir') else None
+
+        # Session directory name -> its mtime when last handled. Adding,
+        # removing or replacing a file (extraction, packing) updates it.
+        self._seen: Dict[str, int] = {}
+        # Directory mtime as of the previous scan, for sessions still being written
+        self._pending: Dict[str, int] = {}
+        self._last_remote_check = None
+
+        sync_logs.configure_http_cache(config.get('http_cache_dir', sync_logs.DEFAULT_CONFIG['http_cache_dir']))
+
+    def start(self) -> List[str]:
+        """Catch up with everything already in extracted_logs; returns the sessions written."""
+        self.logs_path.mkdir(parents=True, exist_ok=True)
+        ensure_database_schema(self.db_path)
+        print(f"👀 Catching up with {self.logs_path}...")
+        log_dirs = iter_session_dirs(self.logs_path)
+        mtimes = {log_dir.name: log_dir.stat().st_mtime_ns for log_dir in log_dirs}
+        written = self.process(log_dirs)
+        self._seen.update(mtimes)
+        return written
+
+    def new_session_dirs(self) -> Dict[Path, int]:
+        """
+        {session directory: mtime} for sessions that appeared or changed since they were handled.
+
+        A directory counts as complete once it has a summary.json or archive,
+        or once it has not changed between two scans, so a session is never
+        parsed while its files are still being written.
+        """
+        complete = extracted_sessions(self.logs_path)
+        ready = {}
+        for log_dir in iter_session_dirs(self.logs_path):
+            mtime = log_dir.stat().st_mtime_ns
+            if self._seen.get(log_dir.name) == mtime:
+                continue
+            if log_dir.name in complete or self._pending.get(log_dir.name) == mtime:
+                ready[log_dir] = mtime
+            else:
+                self._pending[log_dir.name] = mtime
+        return ready
+
+    def fetch_remote(self) -> List[str]:
+        """Download logs the aggregate site has that are not here yet; returns their timestamps."""
+        self._last_remote_check = time.monotonic()
+        available = sync_logs.fetch_available_logs(self.base_url)
+        known = sync_logs.get_existing_logs(str(self.logs_path)) | set(load_ingest_manifest(self.db_path))
+        new_logs = [log for log in available if log['timestamp'] not in known]
+        if not new_logs:
+            return []
+        downloaded = sync_logs.download_logs(new_logs, str(self.logs_path), self.download_workers, self.compress)
+        return [log['timestamp'] for log in downloaded]
+
+    def remote_due(self) -> bool:
+        if self.remote_interval is None:
+            return False
+        return (self._last_remote_check is None
+                or time.monotonic() - self._last_remote_check >= self.remote_interval)
+
+    def process(self, sessions) -> List[str]:
+        """Parse, store, rate and publish sessions; returns the timestamps written."""
+        if not sessions:
+            return []
+        start = time.perf_counter()
+        written = ingest_sessions([as_session_source(session) for session in sessions], self.db_path,
+                                  cache=self.cache)
+        if not written:
+            return []
+        method = update_ratings_for_sessions(self.db_path, written)
+        build_web_ui(self.db_path, self.output_dir, skip_recalc=True)
+        print(f"✅ {len(written)} sessions published in {time.perf_counter() - start:.1f}s "
+              f"({method} rating update): {', '.join(written)}")
+        return written
+
+    def poll(self) -> List[str]:
+        """One watch cycle; returns the timestamps written."""
+        if self.remote_due():
+            try:
+                self.fetch_remote()
+            except Exception as e:
+                # A flaky site must not stop local sessions from being processed
+                print(f"⚠️  Checking {self.base_url} failed: {e}")
+        ready = self.new_session_dirs()
+        written = self.process(list(ready))
+        # Only now, so sessions that failed to process are retried next cycle
+        for log_dir, mtime in ready.items():
+            self._seen[log_dir.name] = mtime
+            self._pending.pop(log_dir.name, None)
+        return written
+
+    def run(self, max_cycles: Optional[int] = None):
+        """Poll until interrupted (or for max_cycles cycles)."""
+        self.start()
+        remote = f", {self.base_url} every {self.remote_interval:g}s" if self.remote_interval else ""
+        print(f"👀 Watching {self.logs_path} every {self.poll_interval:g}s{remote} (Ctrl+C to stop)")
+        cycles = 0
+        try:
+            while max_cycles is None or cycles < max_cycles:
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"❌ {datetime.now():%H:%M:%S} Processing failed, retrying next cycle: {e}")
+                cycles += 1
+                if max_cycles is None or cycles < max_cycles:
+                    time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            print("\n🛑 Watch stopped")
@@ -3,7 +3,6 @@ Data processing functions for GW2 WvW Leaderboards web UI generation.
 Handles database queries, data filtering, and player summary generation.
 """
 
-import json
 import sqlite3
 import os
 import sys
@@ -31,6 +30,7 @@ try:
         calculate_simple_profession_ratings
     )
     from ..core.rating_history import calculate_rating_deltas_from_history, get_player_rating_history
+    from ..utils import json_io
 except ImportError:
     # Fall back to absolute imports for standalone execution
     from gw2_leaderboard.core.glicko_rating_system import (
@@ -40,6 +40,7 @@ except ImportError:
         calculate_simple_profession_ratings
     )
     from gw2_leaderboard.core.rating_history import calculate_rating_deltas_from_history, get_player_rating_history
+    from gw2_leaderboard.utils import json_io
 
 # Optional guild manager import
 try:
@@ -329,22 +330,13 @@ def calculate_glicko_ratings_for_date_filter(db_path: str, metric_category: str
                 'metric_value': player['metric_value']
             })
         
-        # Update Glicko ratings based on session results
-        # Sort by z-score to create pairwise comparisons
-        session_results.sort(key=lambda x: x['z_score'], reverse=True)
+        # Update Glicko ratings for every player from their z-score in this session
+        ratings = [player_ratings[result['key']] for result in session_results]
+        new_ratings, new_rds, new_volatilities = glicko.update_ratings_batch(
+            [rating.rating for rating in ratings], [rating.rd for rating in ratings],
+            [rating.volatility for rating in ratings], [result['z_score'] for result in session_results])
         
-        # Update Glicko ratings for each player using their z-score from this session
-        for player_result in session_results:
-            key = player_result['key']
-            z_score = player_result['z_score']
-            rating = player_ratings[key]
-            
-            # Update rating using the z-score from this session
-            new_rating, new_rd, new_volatility = glicko.update_rating(
-                rating.rating, rating.rd, rating.volatility, [z_score]
-            )
-            
-            # Update the rating object
+        for rating, new_rating, new_rd, new_volatility in zip(ratings, new_ratings, new_rds, new_volatilities):
             rating.rating = new_rating
             rating.rd = new_rd
             rating.volatility = new_volatility
@@ -859,8 +851,7 @@ def generate_player_summaries_for_filter(db_path: str, date_filter: str, output_
             safe_name = "".join(c for c in account_name if c.isalnum() or c in "._-")
             file_path = player_summaries_dir / f"{safe_name}.json"
             
-            with open(file_path, 'w') as f:
-                json.dump(summary, f, indent=2, default=str)
+            json_io.dump_file(summary, file_path, default=str)
         
         print(f"    Generated {len(summaries)} player summaries for {date_filter}")
         return summaries
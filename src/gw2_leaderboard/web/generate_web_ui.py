@@ -48,38 +48,15 @@ except ImportError:
         GuildManager = None
 
 
-def main():
-    """Main entry point for web UI generation."""
-    parser = argparse.ArgumentParser(description='Generate static web UI for GW2 WvW Leaderboards')
-    parser.add_argument('database', help='SQLite database file')
-    parser.add_argument('-o', '--output', help='Output directory for web UI', default='web_ui_output')
-    parser.add_argument('--max-workers', type=int, default=4, help='Max workers for parallel processing')
-    parser.add_argument('--skip-recalc', action='store_true', help='Skip recalculating Glicko ratings')
-    parser.add_argument('--date-filters', nargs='+', default=['30d', '60d', '90d', 'overall'],
-                        help='Date filters to generate (default: 30d 60d 90d overall)')
-
-    args = parser.parse_args()
-
-    if not Path(args.database).exists():
-        print(f"Database {args.database} not found")
-        return 1
-
-    output_dir = Path(args.output)
-
-    # Check if glicko_ratings table has data
-    conn = sqlite3.connect(args.database)
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM glicko_ratings")
-    ratings_count = cursor.fetchone()[0]
-    
-    # Check for guild configuration
+def load_guild_settings(config_path: str = "sync_config.json"):
+    """(enabled, name, tag) for guild filtering from the sync config."""
     guild_enabled = False
     guild_name = ""
     guild_tag = ""
     
     # First check if guild filtering is enabled in config
     try:
-        with open("sync_config.json", 'r', encoding='utf-8') as f:
+        with open(config_path, 'r', encoding='utf-8') as f:
             config = json.load(f)
         guild_config = config.get("guild", {})
         filter_enabled = guild_config.get("filter_enabled", False)
@@ -94,26 +71,47 @@ def main():
             except Exception as e:
                 print(f"Could not initialize GuildManager: {e}")
     except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Could not load sync_config.json: {e}")
+        print(f"Could not load {config_path}: {e}")
+    
+    return guild_enabled, guild_name, guild_tag
+
 
+def build_web_ui(db_path: str, output_dir: Path, date_filters=None, skip_recalc: bool = False):
+    """
+    Recalculate ratings unless skipped, then write the web UI to output_dir.
+    
+    Callers that have just brought the ratings up to date themselves (the
+    incremental sync) pass skip_recalc so only the leaderboard data is rebuilt.
+    """
+    if date_filters is None:
+        date_filters = ['30d', '60d', '90d', 'overall']
+    output_dir = Path(output_dir)
+
+    # Check if glicko_ratings table has data
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM glicko_ratings")
+    ratings_count = cursor.fetchone()[0]
     conn.close()
     
+    guild_enabled, guild_name, guild_tag = load_guild_settings()
+    
     # Recalculate ratings if needed
-    if not args.skip_recalc or ratings_count == 0:
+    if not skip_recalc or ratings_count == 0:
         if ratings_count == 0:
             print("Glicko ratings table is empty - forcing recalculation...")
         else:
             print("Recalculating all Glicko ratings...")
-        recalculate_all_glicko_ratings(args.database, guild_filter=guild_enabled)
+        recalculate_all_glicko_ratings(db_path, guild_filter=guild_enabled)
         print("Rating recalculation complete!")
 
     # Generate complete web UI using the modular system
-    print(f"\nGenerating complete web UI with date filters: {args.date_filters}")
+    print(f"\nGenerating complete web UI with date filters: {date_filters}")
     
     data = generate_complete_web_ui(
-        db_path=args.database,
+        db_path=db_path,
         output_dir=output_dir,
-        date_filters=args.date_filters,
+        date_filters=date_filters,
         guild_enabled=guild_enabled,
         guild_name=guild_name,
         guild_tag=guild_tag
@@ -136,13 +134,33 @@ def main():
         total_professions = max(total_professions, len(profession_leaderboards))
     
     print(f"📊 Generated data for {total_players} players across {total_professions} professions")
-    print(f"🕐 Date filters: {', '.join(args.date_filters)}")
+    print(f"🕐 Date filters: {', '.join(date_filters)}")
     
     if guild_enabled:
         print(f"🛡️  Guild filtering enabled for {guild_name} [{guild_tag}]")
 
+    return data
+
+
+def main():
+    """Main entry point for web UI generation."""
+    parser = argparse.ArgumentParser(description='Generate static web UI for GW2 WvW Leaderboards')
+    parser.add_argument('database', help='SQLite database file')
+    parser.add_argument('-o', '--output', help='Output directory for web UI', default='web_ui_output')
+    parser.add_argument('--max-workers', type=int, default=4, help='Max workers for parallel processing')
+    parser.add_argument('--skip-recalc', action='store_true', help='Skip recalculating Glicko ratings')
+    parser.add_argument('--date-filters', nargs='+', default=['30d', '60d', '90d', 'overall'],
+                        help='Date filters to generate (default: 30d 60d 90d overall)')
+
+    args = parser.parse_args()
+
+    if not Path(args.database).exists():
+        print(f"Database {args.database} not found")
+        return 1
+
+    build_web_ui(args.database, Path(args.output), args.date_filters, args.skip_recalc)
     return 0
 
 
 if __name__ == '__main__':
-    exit(main())
\ No newline at end of file
+    exit(main())
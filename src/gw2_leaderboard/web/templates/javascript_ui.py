@@ -2,13 +2,18 @@
 JavaScript functionality for GW2 WvW Leaderboards web UI.
 """
 
-import json
 from typing import Dict, Any
 
+try:
+    from ...utils import json_io
+except ImportError:
+    # Fall back to absolute imports for standalone execution
+    from gw2_leaderboard.utils import json_io
+
 def get_javascript_content(data: Dict[str, Any]) -> str:
     """Return the complete JavaScript functionality for the web UI."""
     return f"""// Leaderboard data
-const leaderboardData = {json.dumps(data, indent=2)};
+const leaderboardData = {json_io.dumps(data, indent=True)};
 
 // Current state
 let currentFilter = '30d';
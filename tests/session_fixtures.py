@@ -0,0 +1,479 @@
+"""
+Synthetic extracted-log sessions for parser and ingest tests.
+
+Builds session directories in the same layout the extractors produce
+(``<timestamp>/<timestamp>-<Table>.json`` tiddlers plus ``summary.json``),
+with table markup shaped like the real TiddlyWiki top-stats output so the
+markup parsers in parse_logs_enhanced can read them.
+
+The same session can also be written as Elite Insights per-fight exports.
+Both forms are rendered from one per-fight breakdown of the player totals
+(fight_breakdown), so the markup and structured parsers should agree on them.
+"""
+
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+PROFESSIONS = [
+    'Firebrand', 'Firebrand', 'Scourge', 'Chronomancer', 'Druid',
+    'Spellbreaker', 'Catalyst', 'Dragonhunter', 'Vindicator', 'Scrapper',
+    'Willbender', 'Reaper',
+]
+
+
+def make_players(seed: int, count: int = 12) -> List[Dict]:
+    """
+    Create deterministic per-player session totals.
+
+    Rates and DPS are derived from whole-number totals the way TopStats
+    computes them, so the per-fight breakdown adds up to the same values.
+    """
+    rng = random.Random(seed)
+    players = []
+    for i in range(count):
+        profession = PROFESSIONS[i % len(PROFESSIONS)]
+        fight_time = round(rng.uniform(1200, 1800), 1)
+        target_damage = rng.randint(200000, 900000)
+        players.append({
+            'party': i % 5 + 1,
+            'player_name': f'Player {seed}-{i}',
+            'account_name': f'player{i:02d}.{1000 + i}',
+            'profession': profession,
+            'fight_time': fight_time,
+            'target_damage': target_damage,
+            'target_condition_damage': rng.randint(0, 300000),
+            'all_damage': target_damage + rng.randint(10000, 90000),
+            'down_contribution': rng.randint(1000, 90000),
+            'healing': round(rng.uniform(0, 900) * fight_time),
+            'barrier': round(rng.uniform(0, 300) * fight_time),
+            'cleanses': round(rng.uniform(0, 2) * fight_time),
+            'strips': round(rng.uniform(0, 1) * fight_time),
+            'might_gen_per_sec': round(rng.uniform(0, 10), 2),
+            'protection_gen_per_sec': round(rng.uniform(0, 3), 2),
+            'stability_gen_per_sec': round(rng.uniform(0, 5), 2),
+            'resistance_gen_per_sec': round(rng.uniform(0, 1), 2),
+            'burst_damage_1s': rng.randint(5000, 40000),
+            'burst_consistency_1s': rng.randint(1000, 20000),
+            'distance_from_tag_avg': rng.randint(80, 600),
+            'casts': round(rng.randint(30, 70) * fight_time / 60),
+            'skill_casts': round(rng.randint(10, 30) * fight_time / 60),
+        })
+    # One player who joined for a couple of minutes, so outlier filtering has
+    # something to drop.
+    if count >= 10:
+        players[-1].update(fight_time=45.0, healing=9000, barrier=1200, cleanses=40, strips=12,
+                           casts=36, skill_casts=15)
+    for player in players:
+        _add_rates(player)
+    return players
+
+
+def _add_rates(player: Dict):
+    fight_time = player['fight_time']
+    player['target_dps'] = int(player['target_damage'] / fight_time)
+    player['target_condition_dps'] = int(player['target_condition_damage'] / fight_time)
+    for rate, total in (('healing_per_sec', 'healing'), ('barrier_per_sec', 'barrier'),
+                        ('condition_cleanses_per_sec', 'cleanses'), ('boon_strips_per_sec', 'strips')):
+        player[rate] = round(player[total] / fight_time, 2)
+    player['apm_total'] = float(round(player['casts'] * 60 / fight_time))
+    player['apm_no_auto'] = float(round(player['skill_casts'] * 60 / fight_time))
+
+
+# Fixture sessions are three fights; each player's session totals are
+# shared out between them in these proportions.
+FIGHT_WEIGHTS = (1, 2, 3)
+
+# Rows per High Scores table (ei_json_adapter.HIGH_SCORE_ROWS)
+HIGH_SCORE_ROWS = 10
+
+AUTO_ATTACK_ID = 5491
+# Skill id -> (name, auto attack)
+SKILLS = {
+    AUTO_ATTACK_ID: ('Fireball', True),
+    5531: ('Fire Grab', False),
+    5501: ('Meteor Shower', False),
+    9095: ('Meteor', False),
+    30273: ('Whirling Wrath', False),
+}
+OUTGOING_SKILLS = (5531, 5501)
+INCOMING_SKILLS = (9095, 30273)
+
+BOON_IDS = {
+    'might_gen_per_sec': 740,
+    'protection_gen_per_sec': 717,
+    'stability_gen_per_sec': 1122,
+    'resistance_gen_per_sec': 26980,
+}
+
+
+def _skill_icon(skill_id: int) -> str:
+    return f'https://example.com/{skill_id}.png'
+
+
+def _split(total: int) -> List[int]:
+    """Share an integer total between the fights, exactly."""
+    parts = [total * weight // sum(FIGHT_WEIGHTS) for weight in FIGHT_WEIGHTS[:-1]]
+    return parts + [total - sum(parts)]
+
+
+def fight_breakdown(players: List[Dict]) -> List[List[Dict]]:
+    """
+    Per-fight figures for each player that add up to their session totals.
+
+    Returns one list per fight, in player order.
+    """
+    fights = [[] for _ in FIGHT_WEIGHTS]
+    for j, p in enumerate(players):
+        fight_time = p['fight_time']
+        split = {
+            'active_ms': _split(round(fight_time * 1000)),
+            'target_damage': _split(p['target_damage']),
+            'condition_damage': _split(p['target_condition_damage']),
+            'all_damage': _split(p['all_damage']),
+            'down_contribution': _split(p['down_contribution']),
+            'healing': _split(p['healing']),
+            'barrier': _split(p['barrier']),
+            'cleanses': _split(p['cleanses']),
+            'strips': _split(p['strips']),
+            'casts': _split(p['casts']),
+            'skill_casts': _split(p['skill_casts']),
+        }
+        for k, fight in enumerate(fights):
+            row = {field: parts[k] for field, parts in split.items()}
+            active_s = row['active_ms'] / 1000
+            # Damage is split 3:2 between two enemy targets
+            row['target_split'] = [row['target_damage'] * 3 // 5, row['target_damage'] - row['target_damage'] * 3 // 5]
+            row['condition_split'] = [row['condition_damage'] * 3 // 5,
+                                      row['condition_damage'] - row['condition_damage'] * 3 // 5]
+            row['target_dps'] = sum(int(damage / active_s) for damage in row['target_split'])
+            # The session's best second falls in the middle fight
+            row['burst'] = p['burst_damage_1s'] if k == 1 else p['burst_damage_1s'] // 2
+            # Distinct for every player and fight, so rankings have no ties
+            row['max_hit'] = (5000 + j * 97 + k * 1013, OUTGOING_SKILLS[(j + k) % 2])
+            row['max_taken'] = (3000 + j * 89 + k * 1009, INCOMING_SKILLS[(j + k) % 2])
+            fight.append(row)
+    return fights
+
+
+def top_high_scores(players: List[Dict]) -> Dict[str, List]:
+    """{metric: [(player, fight number, score, skill id)]}, best first, as the High Scores tables list them."""
+    candidates = {'highest_outgoing_skill_damage': [], 'highest_incoming_skill_damage': [],
+                  'highest_single_fight_dps': []}
+    for k, fight in enumerate(fight_breakdown(players)):
+        for p, row in zip(players, fight):
+            candidates['highest_outgoing_skill_damage'].append((p, k + 1) + row['max_hit'])
+            candidates['highest_incoming_skill_damage'].append((p, k + 1) + row['max_taken'])
+            candidates['highest_single_fight_dps'].append((p, k + 1, row['target_dps'], None))
+    return {metric: sorted(rows, key=lambda row: (-row[2], row[1], row[0]['account_name']))[:HIGH_SCORE_ROWS]
+            for metric, rows in candidates.items()}
+
+
+def _name_cell(player: Dict) -> str:
+    return f'<span data-tooltip="{player["account_name"]}">{player["player_name"]}</span>'
+
+
+def _prof_cell(player: Dict) -> str:
+    return '{{' + player['profession'] + '}}'
+
+
+def _damage_text(players: List[Dict]) -> str:
+    lines = [
+        '|thead-dark table-caption-top sortable|k',
+        '|!Party |!Name | !Prof |!{{FightTime}} | !{{Target_Damage}}| !{{Target_DPS}}| !P| !PD| '
+        '!{{Condi}}| !{{CondiPS}}| !X| !{{All_Damage}}| !Y| !Z|h',
+    ]
+    for p in players:
+        cells = [
+            str(p['party']), _name_cell(p), _prof_cell(p), f'{p["fight_time"]:.1f}',
+            f'{p["target_damage"]:,}', f'{p["target_dps"]:,}', '1', '2',
+            f'{p["target_condition_damage"]:,}', f'{p["target_condition_dps"]:,}', '3',
+            f'{p["all_damage"]:,}', '4', '5',
+        ]
+        lines.append('|' + '| '.join(cells) + '|')
+    return '\n'.join(lines)
+
+
+def _offensive_text(players: List[Dict]) -> str:
+    lines = ['<$reveal stateTitle="$:/temp/offensive" type="match" text="Total" animate="yes">', '']
+    for p in players:
+        cells = [str(p['party']), _name_cell(p), _prof_cell(p)]
+        cells += [str(n) for n in range(3, 21)]
+        cells.append(str(p['down_contribution']))
+        lines.append('|' + '|'.join(cells) + '|')
+    lines.append('</$reveal>')
+    return '\n'.join(lines)
+
+
+def _heal_text(players: List[Dict]) -> str:
+    lines = ['<$reveal stateTitle="$:/state/heal" stateField="category_heal" type="match" text="Squad" animate="yes">']
+    for p in players:
+        cells = [
+            str(p['party']), _name_cell(p), _prof_cell(p), '1', '2',
+            f'<span data-tooltip="raw">{p["healing_per_sec"]:.2f}</span>', '3',
+            f'{p["barrier_per_sec"]:.2f}',
+        ]
+        lines.append('|' + '|'.join(cells) + '|')
+    lines.append('</$reveal>')
+    return '\n'.join(lines)
+
+
+def _support_text(players: List[Dict]) -> str:
+    lines = ['<$reveal stateTitle="$:/state/support" type="match" text="Stat/1s" animate="yes">']
+    for p in players:
+        cells = [
+            str(p['party']), _name_cell(p), _prof_cell(p), '1',
+            f'{p["condition_cleanses_per_sec"]:.2f}', '2', '3', '4',
+            f'<span data-tooltip="0.5 Wasted">{p["boon_strips_per_sec"]:.2f}</span>', '5',
+        ]
+        lines.append('|' + '|'.join(cells) + '|')
+    lines.append('<$reveal stateTitle="$:/state/support" type="match" text="Total" animate="yes">')
+    return '\n'.join(lines)
+
+
+def _boon_text(players: List[Dict]) -> str:
+    lines = ['<$reveal stateTitle="$:/state/boons" type="match" text="Average" animate="yes">']
+    for p in players:
+        cells = [str(p['party']), _name_cell(p), _prof_cell(p), '1']
+        cells += [f'{p["might_gen_per_sec"]:.2f}', '0.1', '0.2', '0.3', f'{p["protection_gen_per_sec"]:.2f}',
+                  '0.4', '0.5', '0.6', f'{p["stability_gen_per_sec"]:.2f}', '0.7',
+                  f'{p["resistance_gen_per_sec"]:.2f}']
+        lines.append('|' + '|'.join(cells) + '|')
+    lines.append('<$reveal stateTitle="$:/state/boons" type="match" text="Total" animate="yes">')
+    return '\n'.join(lines)
+
+
+def _burst_text(players: List[Dict], field: str) -> str:
+    lines = ['|thead-dark table-caption-top sortable|k', '|!Name |!Prof | !1s| !2s| !3s| !Total|h']
+    for p in players:
+        cells = [_name_cell(p), _prof_cell(p), '1', '2', '3', f'{p[field]:,}']
+        lines.append('|' + '| '.join(cells) + '|')
+    return '\n'.join(lines)
+
+
+def _on_tag_text(players: List[Dict]) -> str:
+    lines = ['|thead-dark table-caption-top sortable|k', '|!Name |!Prof | !Avg Dist|h']
+    for p in players:
+        cells = [_name_cell(p), _prof_cell(p), str(p['distance_from_tag_avg'])]
+        lines.append('|' + '| '.join(cells) + '|')
+    return '\n'.join(lines)
+
+
+def _skill_usage_text(players: List[Dict]) -> str:
+    lines = ['|thead-dark table-caption-top sortable|k', '|!Player Name | !Profession |!Account | !FightTime | !APM |h']
+    for p in players:
+        lines.append(
+            f'|{p["player_name"]} |{_prof_cell(p)} |{p["account_name"]} | {int(p["fight_time"])} | '
+            f'{int(p["apm_total"])}/{int(p["apm_no_auto"])} |'
+        )
+    return '\n'.join(lines)
+
+
+def _high_scores_text(players: List[Dict]) -> str:
+    def player_cell(p, fight):
+        return (f"<span data-tooltip='{p['account_name']}'> {_prof_cell(p)}{p['player_name']} "
+                f"</span>-{fight}")
+
+    def skill_cell(skill_id):
+        name = SKILLS[skill_id][0]
+        return f'[img width=24 [{name}|{_skill_icon(skill_id)}]]-{name} '
+
+    top = top_high_scores(players)
+    sections = ['<div class="flex-row">']
+    sections.append("<div class=\"flex-col\">\n\n|''Highest Outgoing Skill Damage'' |c\n"
+                    "|@@Player-Fight@@|@@Skill@@| @@Score@@|h")
+    for p, fight, score, skill_id in top['highest_outgoing_skill_damage']:
+        sections.append(f'|{player_cell(p, fight)}|{skill_cell(skill_id)}| {score:,}.00|')
+    sections.append('</div>')
+    sections.append("<div class=\"flex-col\">\n\n|''Highest Incoming Skill Damage'' |c\n"
+                    "|@@Player-Fight@@|@@Skill@@| @@Score@@|h")
+    for p, fight, score, skill_id in top['highest_incoming_skill_damage']:
+        sections.append(f'|{player_cell(p, fight)}|{skill_cell(skill_id)}| {score:,}.00|')
+    sections.append('</div>')
+    sections.append("<div class=\"flex-col\">\n\n|''Damage per Second'' |c\n|@@Player-Fight@@| @@Score@@|h")
+    for p, fight, score, _ in top['highest_single_fight_dps']:
+        sections.append(f'|{player_cell(p, fight)}| {score:,}.00|')
+    sections.append('</div>')
+    sections.append("<div class=\"flex-col\">\n\n|''Some Other Metric'' |c\n|@@Player-Fight@@| @@Score@@|h")
+    sections.append(f'|{player_cell(players[0], 1)}| 1.00|')
+    sections.append('</div>\n</div>')
+    return '\n'.join(sections)
+
+
+def session_tiddlers(timestamp: str, players: List[Dict]) -> List[Dict]:
+    """Return the tiddler objects that make up one session."""
+    texts = {
+        'Log-Summary': '<<tabs "[[' + timestamp + '-Overview]]" >>',
+        'Damage': _damage_text(players),
+        'Offensive': _offensive_text(players),
+        'Heal-Stats': _heal_text(players),
+        'Support': _support_text(players),
+        'Squad-Generation': _boon_text(players),
+        'DPS-Stats-Bur-Total': _burst_text(players, 'burst_damage_1s'),
+        'DPS-Stats-Ch5Ca-Total': _burst_text(players, 'burst_consistency_1s'),
+        'On-Tag-Review': _on_tag_text(players),
+        'Skill-Usage': '<$macrocall $name="skill_usage"/>',
+        'High-Scores': _high_scores_text(players),
+    }
+    tiddlers = []
+    for suffix, text in texts.items():
+        tiddlers.append({
+            'title': f'{timestamp}-{suffix}',
+            'created': timestamp + '00000',
+            'modified': timestamp + '00000',
+            'text': text,
+        })
+    for profession in sorted({p['profession'] for p in players}):
+        prof_players = [p for p in players if p['profession'] == profession]
+        tiddlers.append({
+            'title': f'{timestamp}-Skill-Usage-{profession}',
+            'created': timestamp + '00000',
+            'modified': timestamp + '00000',
+            'text': _skill_usage_text(prof_players),
+        })
+    return tiddlers
+
+
+def write_session(logs_dir: Path, timestamp: str, players: List[Dict]) -> Path:
+    """Write one session directory the way extract_logs lays it out."""
+    log_dir = Path(logs_dir) / timestamp
+    log_dir.mkdir(parents=True, exist_ok=True)
+    tiddlers = session_tiddlers(timestamp, players)
+    for tiddler in tiddlers:
+        with open(log_dir / f"{tiddler['title']}.json", 'w', encoding='utf-8') as f:
+            json.dump(tiddler, f, indent=2, ensure_ascii=False)
+    summary = {
+        'timestamp': timestamp,
+        'main_tiddler': f'{timestamp}-Log-Summary',
+        'tiddler_count': len(tiddlers),
+        'tiddler_titles': [t['title'] for t in tiddlers],
+        'created': tiddlers[0]['created'],
+        'modified': tiddlers[0]['modified'],
+    }
+    with open(log_dir / 'summary.json', 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return log_dir
+
+
+def write_sessions(logs_dir: Path, count: int, first_day: int = 1) -> List[str]:
+    """Write ``count`` sessions on consecutive days and return their timestamps."""
+    timestamps = []
+    for i in range(count):
+        timestamp = f'202507{first_day + i:02d}2000'
+        write_session(logs_dir, timestamp, make_players(seed=first_day + i))
+        timestamps.append(timestamp)
+    return timestamps
+
+
+def _cumulative(increments: List[int]) -> List[int]:
+    totals = [0]
+    for increment in increments:
+        totals.append(totals[-1] + increment)
+    return totals
+
+
+def _ei_player(p: Dict, row: Dict) -> Dict:
+    """One squad member in an Elite Insights export, main phase only."""
+    burst = row['burst']
+    rotation = [
+        {'id': AUTO_ATTACK_ID, 'skills': [{'castTime': i * 1000, 'duration': 500}
+                                          for i in range(row['casts'] - row['skill_casts'])]},
+        {'id': OUTGOING_SKILLS[0], 'skills': [{'castTime': i * 1500, 'duration': 750}
+                                              for i in range(row['skill_casts'])]},
+    ]
+    max_hit, hit_skill = row['max_hit']
+    max_taken, taken_skill = row['max_taken']
+    return {
+        'name': p['player_name'],
+        'account': p['account_name'],
+        'profession': p['profession'],
+        'group': p['party'],
+        'hasCommanderTag': False,
+        'notInSquad': False,
+        'activeTimes': [row['active_ms']],
+        'dpsAll': [{'damage': row['all_damage'], 'dps': int(row['all_damage'] / (row['active_ms'] / 1000))}],
+        'dpsTargets': [
+            [{'damage': damage, 'dps': int(damage / (row['active_ms'] / 1000)),
+              'condiDamage': condition, 'condiDps': int(condition / (row['active_ms'] / 1000)),
+              'powerDamage': damage - condition}]
+            for damage, condition in zip(row['target_split'], row['condition_split'])
+        ],
+        'statsTargets': [[{'downContribution': row['down_contribution'] // 2}],
+                         [{'downContribution': row['down_contribution'] - row['down_contribution'] // 2}]],
+        'statsAll': [{'distToCom': p['distance_from_tag_avg'], 'stackDist': 150.0}],
+        'support': [{'condiCleanse': row['cleanses'], 'condiCleanseSelf': 7, 'boonStrips': row['strips']}],
+        'squadBuffs': [{'id': boon_id, 'buffData': [{'generation': p[field], 'overstack': p[field], 'wasted': 0.0}]}
+                       for field, boon_id in BOON_IDS.items()],
+        'extHealingStats': {'outgoingHealing': [{'healing': row['healing'], 'hps': 0}]},
+        'extBarrierStats': {'outgoingBarrier': [{'barrier': row['barrier'], 'bps': 0}]},
+        # Cumulative damage per second on each target; the best second is
+        # split between the two targets.
+        'targetDamage1S': [[_cumulative([0, burst // 3, burst * 2 // 3, burst // 4])],
+                           [_cumulative([0, 0, burst - burst * 2 // 3, 0])]],
+        'totalDamageDist': [[{'id': hit_skill, 'max': max_hit, 'min': 100, 'hits': 3, 'totalDamage': max_hit * 2},
+                             {'id': AUTO_ATTACK_ID, 'max': 900, 'min': 100, 'hits': 40, 'totalDamage': 20000}]],
+        'totalDamageTaken': [[{'id': taken_skill, 'max': max_taken, 'min': 50, 'hits': 2,
+                               'totalDamage': max_taken + 50}]],
+        'rotation': rotation,
+    }
+
+
+def ei_fights(timestamp: str, players: List[Dict]) -> List[Dict]:
+    """Elite Insights JSON exports for one fixture session, one per fight."""
+    day = f'{timestamp[:4]}-{timestamp[4:6]}-{timestamp[6:8]}'
+    skill_map = {f's{skill_id}': {'name': name, 'autoAttack': auto, 'icon': _skill_icon(skill_id)}
+                 for skill_id, (name, auto) in SKILLS.items()}
+    fights = []
+    for k, rows in enumerate(fight_breakdown(players)):
+        ei_players = [_ei_player(p, row) for p, row in zip(players, rows)]
+        # Allies outside the squad are in every export and are not ranked
+        ei_players.append(dict(_ei_player(players[0], rows[0]), name='Pug', account='pug.1234', notInSquad=True))
+        fights.append({
+            'eliteInsightsVersion': '2.70.0.0',
+            'fightName': 'Detailed WvW - Eternal Battlegrounds',
+            'timeStartStd': f'{day} {timestamp[8:10]}:{k * 20:02d}:00 +00:00',
+            'durationMS': max(row['active_ms'] for row in rows),
+            'skillMap': skill_map,
+            'targets': [{'name': 'Enemy Players', 'isFake': True}, {'name': 'Enemy Siege', 'isFake': True}],
+            'players': ei_players,
+        })
+    return fights
+
+
+def write_ei_session(logs_dir: Path, timestamp: str, players: List[Dict]) -> Path:
+    """Write one session as Elite Insights exports under ``<timestamp>/elite_insights/``."""
+    log_dir = Path(logs_dir) / timestamp
+    export_dir = log_dir / 'elite_insights'
+    export_dir.mkdir(parents=True, exist_ok=True)
+    for k, fight in enumerate(ei_fights(timestamp, players)):
+        # Elite Insights names exports after the log: <date>-<time>_<encounter>_<result>.json
+        name = f'{timestamp[:8]}-{timestamp[8:10]}{k * 20:02d}00_wvw_kill.json'
+        with open(export_dir / name, 'w', encoding='utf-8') as f:
+            json.dump(fight, f, ensure_ascii=False)
+    return log_dir
+
+
+def tiddlywiki_html(timestamps: List[str]) -> str:
+    """
+    A minimal TiddlyWiki 5 page holding the given sessions plus a few system tiddlers.
+
+    Like the real thing, the store JSON is compact, the boot script mentions
+    the tiddler-store class before the store itself, and ``<`` is escaped
+    inside the store JSON.
+    """
+    tiddlers = [
+        {'title': '$:/SiteTitle', 'text': 'WvW Logs – Ærïn’s squad'},
+        {'title': '$:/core', 'type': 'application/json', 'text': '{"tiddlers": {}}'},
+    ]
+    for i, timestamp in enumerate(timestamps):
+        tiddlers.extend(session_tiddlers(timestamp, make_players(seed=i + 1)))
+    # An unrelated tiddler whose title happens to start with digits
+    tiddlers.append({'title': '202401011200-Notes', 'text': 'not a session'})
+    store = json.dumps(tiddlers, ensure_ascii=False, separators=(',', ':')).replace('<', '\\u003C')
+    return (
+        '<!doctype html>\n<html>\n<head><meta charset="utf-8"><title>Logs</title></head>\n<body>\n'
+        '<script>var storeClass = "tiddlywiki-tiddler-store"; if (a < b) {}</script>\n'
+        '<script class="tiddlywiki-tiddler-store" type="application/json">' + store + '</script>\n'
+        '<script>boot();</script>\n</body>\n</html>\n'
+    )
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for TiddlyWiki extraction: the streaming tiddler-store reader and the
+per-session files written by extract_logs.
+"""
+
+import json
+import re
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# Add project root and src to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'src'))
+
+from gw2_leaderboard.parsers import extract_logs, session_archive, tiddler_store
+from gw2_leaderboard.parsers.session_source import as_session_source
+from tests.session_fixtures import tiddlywiki_html
+
+TIMESTAMPS = ['202507012000', '202507022000', '202507032000']
+
+
+def store_tiddlers(html: str):
+    """Reference decode: the whole store JSON parsed in one go."""
+    match = re.search(r'<script class="tiddlywiki-tiddler-store"[^>]*>(.*?)</script>', html, re.DOTALL)
+    return json.loads(match.group(1))
+
+
+class TiddlerStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.html = tiddlywiki_html(TIMESTAMPS)
+        self.html_path = Path(self.temp_dir.name) / 'wiki.html'
+        self.html_path.write_text(self.html, encoding='utf-8')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_streamed_tiddlers_match_whole_store(self):
+        expected = store_tiddlers(self.html)
+        # Tiny chunks split tiddlers, escapes and multi-byte characters across reads
+        for chunk_size in (tiddler_store.CHUNK_SIZE, 4096, 7):
+            self.assertEqual(list(tiddler_store.iter_tiddlers(self.html_path, chunk_size=chunk_size)), expected)
+
+    def test_missing_or_broken_store_raises(self):
+        self.html_path.write_text('<html><script>"tiddlywiki-tiddler-store"</script></html>', encoding='utf-8')
+        with self.assertRaises(tiddler_store.TiddlerStoreError):
+            list(tiddler_store.iter_tiddlers(self.html_path))
+
+        truncated = self.html.replace('}]</script>', '</script>')
+        self.html_path.write_text(truncated, encoding='utf-8')
+        with self.assertRaises(tiddler_store.TiddlerStoreError):
+            list(tiddler_store.iter_tiddlers(self.html_path, chunk_size=64))
+
+    def test_extract_log_summaries_writes_each_session(self):
+        output_dir = Path(self.temp_dir.name) / 'extracted_logs'
+        extract_logs.extract_log_summaries(extract_logs.extract_tiddler_data(self.html_path), output_dir)
+
+        self.assertEqual(sorted(p.name for p in output_dir.iterdir()), TIMESTAMPS)
+        for tiddler in store_tiddlers(self.html):
+            title = tiddler['title']
+            if title[:12] in TIMESTAMPS:
+                written = json.loads((output_dir / title[:12] / f'{title}.json').read_text(encoding='utf-8'))
+                self.assertEqual(written, tiddler)
+
+        summary = json.loads((output_dir / TIMESTAMPS[0] / 'summary.json').read_text(encoding='utf-8'))
+        self.assertEqual(summary['main_tiddler'], f'{TIMESTAMPS[0]}-Log-Summary')
+        self.assertEqual(summary['tiddler_count'], len(list((output_dir / TIMESTAMPS[0]).glob('*.json'))) - 1)
+
+    def test_existing_sessions_are_skipped_unless_forced(self):
+        output_dir = Path(self.temp_dir.name) / 'extracted_logs'
+        extracted = extract_logs.extract_log_summaries(
+            extract_logs.extract_tiddler_data(self.html_path), output_dir, workers=2)
+        self.assertEqual(extracted, TIMESTAMPS)
+
+        # A directory without summary.json is an interrupted extraction and is redone
+        damage_file = output_dir / TIMESTAMPS[1] / f'{TIMESTAMPS[1]}-Damage.json'
+        damage_file.write_text('stale', encoding='utf-8')
+        (output_dir / TIMESTAMPS[1] / 'summary.json').unlink()
+        extracted = extract_logs.extract_log_summaries(
+            extract_logs.extract_tiddler_data(self.html_path), output_dir, workers=2)
+        self.assertEqual(extracted, [TIMESTAMPS[1]])
+        self.assertNotEqual(damage_file.read_text(encoding='utf-8'), 'stale')
+
+        extracted = extract_logs.extract_log_summaries(
+            extract_logs.extract_tiddler_data(self.html_path), output_dir, force=True)
+        self.assertEqual(extracted, TIMESTAMPS)
+
+    def test_compressed_extraction_matches_loose_files(self):
+        loose_dir = Path(self.temp_dir.name) / 'loose'
+        packed_dir = Path(self.temp_dir.name) / 'packed'
+        extract_logs.extract_log_summaries(extract_logs.extract_tiddler_data(self.html_path), loose_dir)
+        extracted = extract_logs.extract_log_summaries(
+            extract_logs.extract_tiddler_data(self.html_path), packed_dir, compress=True)
+        self.assertEqual(extracted, TIMESTAMPS)
+
+        for timestamp in TIMESTAMPS:
+            self.assertEqual([p.name for p in (packed_dir / timestamp).iterdir()], [f'{timestamp}.tar.gz'])
+            loose = {p.name: json.loads(p.read_bytes()) for p in (loose_dir / timestamp).glob('*.json')}
+            packed = session_archive.read_archive(session_archive.session_archive_path(packed_dir / timestamp))
+            self.assertEqual({name: json.loads(data) for name, data in packed.items()}, loose)
+
+        # Packed sessions count as extracted
+        self.assertEqual(extract_logs.extract_log_summaries(
+            extract_logs.extract_tiddler_data(self.html_path), packed_dir, compress=True), [])
+
+    def test_forced_reextraction_replaces_the_other_format(self):
+        output_dir = Path(self.temp_dir.name) / 'extracted_logs'
+        log_dir = output_dir / TIMESTAMPS[0]
+        high_scores = log_dir / f'{TIMESTAMPS[0]}-High-Scores.json'
+
+        def extract(version, compress):
+            tiddlers = [dict(t, version=version) for t in extract_logs.extract_tiddler_data(self.html_path)]
+            extract_logs.extract_log_summaries(tiddlers, output_dir, force=True, compress=compress)
+
+        extract(1, compress=True)
+        extract(2, compress=False)
+        self.assertFalse(session_archive.is_archived(log_dir))
+        self.assertEqual(json.loads(session_archive.read_session_file(high_scores))['version'], 2)
+        self.assertEqual(as_session_source(log_dir).tiddler('High-Scores')['version'], 2)
+
+        extract(3, compress=True)
+        self.assertEqual([p.name for p in log_dir.iterdir()], [f'{TIMESTAMPS[0]}.tar.gz'])
+        self.assertEqual(json.loads(session_archive.read_session_file(high_scores))['version'], 3)
+        self.assertEqual(as_session_source(log_dir).tiddler('High-Scores')['version'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Rating replay tests for glicko_rating_system using synthetic sessions.
+These do not need a production database.
+"""
+
+import contextlib
+import io
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add project root and src to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'src'))
+
+from gw2_leaderboard.core import glicko_rating_system as grs
+from gw2_leaderboard.core.rating_history import save_rating_to_history
+from gw2_leaderboard.parsers import parse_logs_enhanced
+from tests.session_fixtures import make_players, write_session, write_sessions
+
+
+def rating_rows(db_path: str):
+    conn = sqlite3.connect(db_path)
+    ratings = conn.execute('''
+        SELECT account_name, profession, metric_category, rating, rd, volatility, games_played,
+               total_rank_sum, average_rank, total_stat_value, average_stat_value
+        FROM glicko_ratings ORDER BY 1, 2, 3
+    ''').fetchall()
+    history = conn.execute('''
+        SELECT account_name, profession, metric_category, timestamp, rating, rating_deviation, volatility
+        FROM player_rating_history ORDER BY 1, 2, 3, 4
+    ''').fetchall()
+    conn.close()
+    return ratings, history
+
+
+def table_rows(db_path: str, table: str):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(f'SELECT * FROM {table} ORDER BY 1, 2, 3, 4').fetchall()
+    conn.close()
+    return rows
+
+
+def rate_row_by_row(db_path: str, timestamps):
+    """The replay as it was before RatingStore: one SQLite round-trip per read and write."""
+    glicko = grs.GlickoSystem()
+    for timestamp in timestamps:
+        for metric_category in grs.METRIC_CATEGORIES:
+            _, _, players = grs.calculate_session_stats(db_path, timestamp, metric_category)
+            if len(players) < 2:
+                continue
+            for player in players:
+                account, profession = player['account_name'], player['profession']
+                rating, rd, volatility, games, rank_sum, stat_sum = grs.get_current_glicko_rating(
+                    db_path, account, profession, metric_category)
+                rating, rd, volatility = glicko.update_rating(rating, rd, volatility, [player['z_score']])
+                games, rank_sum, stat_sum = games + 1, rank_sum + player['rank'], stat_sum + player['metric_value']
+                grs.update_glicko_rating(db_path, account, profession, metric_category, rating, rd, volatility,
+                                         games, rank_sum, rank_sum / games, stat_sum, stat_sum / games)
+                save_rating_to_history(db_path, account, profession, metric_category, timestamp,
+                                       rating, rd, volatility)
+
+
+class RatingReplayTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.logs_dir = self.temp_dir / 'extracted_logs'
+        self.db_path = str(self.temp_dir / 'gw2.db')
+        self.timestamps = write_sessions(self.logs_dir, 4)
+        with contextlib.redirect_stdout(io.StringIO()):
+            parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+        grs.initialize_database_schema(self.db_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def copy_db(self, name: str) -> str:
+        path = str(self.temp_dir / name)
+        shutil.copy(self.db_path, path)
+        return path
+
+    def assertRowsAlmostEqual(self, rows, expected):
+        """Same rows; floats may differ in the last bits (batch vs scalar updates)."""
+        self.assertEqual(len(rows), len(expected))
+        for row, expected_row in zip(rows, expected):
+            self.assertEqual(len(row), len(expected_row))
+            for value, expected_value in zip(row, expected_row):
+                if isinstance(expected_value, float):
+                    self.assertAlmostEqual(value, expected_value, places=6)
+                else:
+                    self.assertEqual(value, expected_value)
+
+    def test_rebuild_matches_row_by_row_replay(self):
+        reference_db = self.copy_db('reference.db')
+        rate_row_by_row(reference_db, self.timestamps)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            grs.rebuild_rating_history(self.db_path)
+        ratings, history = rating_rows(self.db_path)
+        expected_ratings, expected_history = rating_rows(reference_db)
+        self.assertRowsAlmostEqual(ratings, expected_ratings)
+        self.assertRowsAlmostEqual(history, expected_history)
+
+        # Rating the last session on its own lands in the same place
+        partial_db = self.copy_db('partial.db')
+        grs.create_glicko_database(partial_db)
+        with sqlite3.connect(partial_db) as conn:
+            conn.execute('DELETE FROM player_rating_history')
+        for timestamp in self.timestamps[:-1]:
+            grs.calculate_glicko_ratings_for_session(partial_db, timestamp, history_mode=True)
+        grs.update_ratings_incrementally(partial_db)
+        self.assertEqual(rating_rows(partial_db), rating_rows(self.db_path))
+
+    def test_batch_update_matches_scalar_update(self):
+        glicko = grs.GlickoSystem()
+        ratings = [1500.0, 1820.5, 1210.0, 2400.0, 900.0]
+        rds = [350.0, 80.0, 150.0, 45.0, 300.0]
+        volatilities = [0.06, 0.06, 0.05, 0.07, 0.06]
+        z_scores = [0.0, 1.7, -0.4, 3.2, -2.5]
+
+        batch = glicko.update_ratings_batch(ratings, rds, volatilities, z_scores)
+        for i, args in enumerate(zip(ratings, rds, volatilities, z_scores)):
+            expected = glicko.update_rating(*args[:3], [args[3]])
+            for column, expected_value in zip(batch, expected):
+                self.assertAlmostEqual(column[i], expected_value, places=9)
+        self.assertEqual(glicko.update_ratings_batch([], [], [], []), ([], [], []))
+
+        with mock.patch.object(grs, 'NUMPY_AVAILABLE', False):
+            fallback = glicko.update_ratings_batch(ratings, rds, volatilities, z_scores)
+        for column, expected_column in zip(fallback, batch):
+            for value, expected_value in zip(column, expected_column):
+                self.assertAlmostEqual(value, expected_value, places=9)
+
+    def test_interrupted_run_writes_nothing(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            grs.rebuild_rating_history(self.db_path)
+        expected = rating_rows(self.db_path)
+
+        interrupted_db = self.copy_db('interrupted.db')
+        grs.create_glicko_database(interrupted_db)
+        with sqlite3.connect(interrupted_db) as conn:
+            conn.execute('DELETE FROM player_rating_history')
+        session_outcomes = grs.session_outcomes
+
+        def failing_outcomes(db_path, timestamp, *args):
+            if timestamp == self.timestamps[2]:
+                raise RuntimeError('interrupted')
+            return session_outcomes(db_path, timestamp, *args)
+
+        with mock.patch.object(grs, 'session_outcomes', side_effect=failing_outcomes):
+            with self.assertRaises(RuntimeError):
+                grs.update_ratings_incrementally(interrupted_db)
+        self.assertEqual(rating_rows(interrupted_db), ([], []))
+
+        grs.update_ratings_incrementally(interrupted_db)
+        self.assertEqual(rating_rows(interrupted_db), expected)
+
+    def test_session_scores_are_stored_at_ingest(self):
+        def live_scores(timestamp):
+            return {metric_category: players
+                    for metric_category, (_, _, players) in grs.score_session(self.db_path, timestamp).items()
+                    if players}
+
+        for timestamp in self.timestamps:
+            self.assertEqual(grs.load_session_scores(self.db_path, timestamp), live_scores(timestamp))
+
+        # A re-uploaded session replaces its scores
+        write_session(self.logs_dir, self.timestamps[1], make_players(seed=99))
+        with contextlib.redirect_stdout(io.StringIO()):
+            parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+        self.assertEqual(grs.load_session_scores(self.db_path, self.timestamps[1]), live_scores(self.timestamps[1]))
+
+        # Missing scores are computed and stored on first use
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('DELETE FROM session_metric_scores WHERE timestamp = ?', (self.timestamps[2],))
+        self.assertIsNone(grs.load_session_scores(self.db_path, self.timestamps[2]))
+        outcomes = grs.session_outcomes(self.db_path, self.timestamps[2], False)
+        self.assertEqual(dict(outcomes), live_scores(self.timestamps[2]))
+        self.assertEqual(grs.load_session_scores(self.db_path, self.timestamps[2]), live_scores(self.timestamps[2]))
+
+    def test_rebuild_from_resumes_at_checkpoint(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            grs.rebuild_rating_history(self.db_path, checkpoint_interval=2)
+        with sqlite3.connect(self.db_path) as conn:
+            checkpoints = [row[0] for row in conn.execute('SELECT DISTINCT timestamp FROM rating_checkpoints ORDER BY 1')]
+        self.assertEqual(checkpoints, [self.timestamps[1], self.timestamps[3]])
+
+        # Re-parse the third session; only it and the sessions after it are rated again
+        write_session(self.logs_dir, self.timestamps[2], make_players(seed=99))
+        with contextlib.redirect_stdout(io.StringIO()):
+            parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+        expected_db = self.copy_db('expected.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            grs.rebuild_rating_history(expected_db, checkpoint_interval=2)
+
+        with mock.patch.object(grs, 'calculate_glicko_ratings_for_session',
+                               wraps=grs.calculate_glicko_ratings_for_session) as rate:
+            resumed_from = grs.rebuild_ratings_from(self.db_path, self.timestamps[2], checkpoint_interval=2)
+        self.assertEqual(resumed_from, self.timestamps[1])
+        self.assertEqual([call.args[1] for call in rate.call_args_list], self.timestamps[2:])
+        self.assertEqual(rating_rows(self.db_path), rating_rows(expected_db))
+        self.assertEqual(table_rows(self.db_path, 'rating_checkpoints'), table_rows(expected_db, 'rating_checkpoints'))
+
+        # Nothing to resume from before the first session
+        self.assertIsNone(grs.rebuild_ratings_from(self.db_path, self.timestamps[0], checkpoint_interval=2))
+        self.assertEqual(rating_rows(self.db_path), rating_rows(expected_db))
+
+
+class SessionScoreTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_path = str(self.temp_dir / 'gw2.db')
+        parse_logs_enhanced.ensure_database_schema(self.db_path)
+
+        # account: (healing, might, distance to tag)
+        session = {
+            'a.1': (0.0, 0.1, 300.0),
+            'b.2': (100.0, 5.0, 0.0),
+            'c.3': (100.0, 6.0, 150.0),
+            'd.4': (100.0, 7.0, 150.0),
+            'e.5': (100.0, 8.0, None),
+        }
+        conn = sqlite3.connect(self.db_path)
+        conn.executemany('''
+            INSERT INTO player_performances
+            (timestamp, player_name, account_name, profession, healing_per_sec, might_gen_per_sec, distance_from_tag_avg)
+            VALUES ('202507012000', ?, ?, 'Firebrand', ?, ?, ?)
+        ''', [(account, account) + values for account, values in session.items()])
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def ranking(self, stats):
+        return [(player['account_name'], player['metric_value'], player['rank']) for player in stats[2]]
+
+    def test_floors_ties_and_inversion(self):
+        stats = grs.score_session(self.db_path, '202507012000')
+        self.assertEqual(set(stats), set(grs.METRIC_CATEGORIES))
+
+        # The 25th percentile (100) would drop everyone, so the floor is not applied
+        self.assertEqual(self.ranking(stats['Healing']),
+                         [('b.2', 100.0, 1), ('c.3', 100.0, 2), ('d.4', 100.0, 3), ('e.5', 100.0, 4)])
+        self.assertEqual(stats['Healing'][1], 1.0)
+
+        # 0.1 is under 10% of the mean, so the median (6) is the floor
+        self.assertEqual(self.ranking(stats['Might']), [('e.5', 8.0, 1), ('d.4', 7.0, 2)])
+
+        # The tag driver (0) counts and ranks first; lower is better
+        distance_mean, distance_std, distance = stats['Distance to Tag']
+        self.assertEqual(self.ranking(stats['Distance to Tag']),
+                         [('b.2', 0.0, 1), ('c.3', 150.0, 2), ('d.4', 150.0, 3), ('a.1', 300.0, 4)])
+        self.assertEqual(distance_mean, 150.0)
+        self.assertAlmostEqual(distance[0]['z_score'], 150.0 / distance_std)
+        self.assertEqual(distance[3]['normalized_rank'], 100.0)
+
+        self.assertEqual(stats['DPS'], (0.0, 1.0, []))
+        for metric_category, metric_stats in stats.items():
+            self.assertEqual(grs.calculate_session_stats(self.db_path, '202507012000', metric_category),
+                             metric_stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the JSON serialization layer: the orjson backend must write the
+same bytes as the stdlib fallback for the data the project produces.
+"""
+
+import sys
+import unittest
+from datetime import date, datetime
+from pathlib import Path
+from unittest import mock
+
+# Add project root and src to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'src'))
+
+from gw2_leaderboard.utils import json_io
+from tests.session_fixtures import make_players, session_tiddlers
+
+SAMPLE = {
+    'title': '202507012000-Damage',
+    'text': '|<span data-tooltip="player.1234">Ærïn Ståršhïeld</span>|{{Firebrand}}|1,234|\n\t"quoted"\\',
+    'values': [0, -1, 2.5, 1234567.125, 0.1, 1e16, True, False, None],
+    'nested': {'empty_list': [], 'empty_dict': {}, 'deep': [{'a': [1, [2, 3]]}]},
+    7: 'integer key',
+}
+
+
+class JsonBackendTests(unittest.TestCase):
+    def stdlib_bytes(self, obj, **kwargs):
+        with mock.patch.object(json_io, 'ORJSON_AVAILABLE', False):
+            return json_io.dumps_bytes(obj, **kwargs)
+
+    def test_round_trip(self):
+        for indent in (False, True):
+            text = json_io.dumps(SAMPLE, indent=indent)
+            decoded = json_io.loads(text)
+            self.assertEqual(decoded['text'], SAMPLE['text'])
+            self.assertEqual(decoded['7'], 'integer key')
+            self.assertEqual(json_io.loads(text.encode('utf-8')), decoded)
+
+    def test_stdlib_fallback_writes_utf8_indented_json(self):
+        data = self.stdlib_bytes({'name': 'Ståršhïeld', 'n': [1]}, indent=True)
+        self.assertEqual(data, '{\n  "name": "Ståršhïeld",\n  "n": [\n    1\n  ]\n}'.encode('utf-8'))
+
+    @unittest.skipUnless(json_io.ORJSON_AVAILABLE, "orjson not installed")
+    def test_backends_write_identical_bytes(self):
+        tiddlers = session_tiddlers('202507012000', make_players(seed=3))
+        for obj in [SAMPLE, tiddlers, {'ratio': float('nan'), 'big': 2 ** 70}]:
+            for indent in (False, True):
+                self.assertEqual(json_io.dumps_bytes(obj, indent=indent), self.stdlib_bytes(obj, indent=indent))
+
+        summary = {'last_seen': date(2025, 7, 1), 'updated': datetime(2025, 7, 1, 20, 0)}
+        self.assertEqual(json_io.dumps_bytes(summary, indent=True, default=str),
+                         self.stdlib_bytes(summary, indent=True, default=str))
+
+    @unittest.skipUnless(json_io.ORJSON_AVAILABLE, "orjson not installed")
+    def test_decode_errors_are_value_errors(self):
+        with self.assertRaises(ValueError):
+            json_io.loads('{"unterminated": ')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Ingest tests for parse_logs_enhanced using synthetic session directories.
+These do not need a production database.
+"""
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add project root and src to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'src'))
+
+from gw2_leaderboard.parsers import extract_logs, parse_logs_enhanced, session_archive
+from gw2_leaderboard.parsers.high_scores_parser import HighScoresParser
+from gw2_leaderboard.parsers.session_source import (
+    ArchivedSession, DirectorySession, EliteInsightsSession, as_session_source)
+from tests.session_fixtures import make_players, tiddlywiki_html, write_ei_session, write_session, write_sessions
+
+
+def table_rows(db_path: str, table: str, order_by: str, exclude=()):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(f'PRAGMA table_info({table})')
+    columns = [row[1] for row in cursor.fetchall() if row[1] != 'id' and row[1] not in exclude]
+    cursor.execute(f'SELECT {", ".join(columns)} FROM {table} ORDER BY {order_by}')
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def performance_rows(db_path: str, exclude=()):
+    return table_rows(db_path, 'player_performances', 'timestamp, account_name, profession', exclude)
+
+
+def high_score_rows(db_path: str):
+    return table_rows(db_path, 'high_scores', 'timestamp, metric_type, score_value, player_account')
+
+
+class TableParserTests(unittest.TestCase):
+    """Round-trip the synthetic session tables through the markup parsers."""
+
+    def test_parse_log_directory_reads_every_table(self):
+        players = make_players(seed=5)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_dir = write_session(Path(temp_dir), '202507052000', players)
+            performances = {p.account_name: p for p in parse_logs_enhanced.parse_log_directory(log_dir)}
+
+        # The short-fight player is filtered as an outlier
+        self.assertEqual(len(performances), len(players) - 1)
+        self.assertNotIn(players[-1]['account_name'], performances)
+
+        for player in players[:-1]:
+            perf = performances[player['account_name']]
+            self.assertEqual(perf.player_name, player['player_name'])
+            self.assertEqual(perf.fight_time, player['fight_time'])
+            self.assertEqual(perf.target_dps, player['target_dps'])
+            self.assertEqual(perf.target_condition_dps, player['target_condition_dps'])
+            self.assertEqual(perf.all_damage, player['all_damage'])
+            self.assertEqual(perf.healing_per_sec, player['healing_per_sec'])
+            self.assertEqual(perf.barrier_per_sec, player['barrier_per_sec'])
+            self.assertEqual(perf.condition_cleanses_per_sec, player['condition_cleanses_per_sec'])
+            self.assertEqual(perf.boon_strips_per_sec, player['boon_strips_per_sec'])
+            self.assertEqual(perf.might_gen_per_sec, player['might_gen_per_sec'])
+            self.assertEqual(perf.protection_gen_per_sec, player['protection_gen_per_sec'])
+            self.assertEqual(perf.stability_gen_per_sec, player['stability_gen_per_sec'])
+            self.assertEqual(perf.resistance_gen_per_sec, player['resistance_gen_per_sec'])
+            self.assertAlmostEqual(perf.down_contribution_per_sec,
+                                   player['down_contribution'] / player['fight_time'])
+            self.assertEqual(perf.burst_damage_1s, player['burst_damage_1s'])
+            self.assertEqual(perf.burst_consistency_1s, player['burst_consistency_1s'])
+            self.assertEqual(perf.distance_from_tag_avg, player['distance_from_tag_avg'])
+            self.assertEqual(perf.apm_total, player['apm_total'])
+            self.assertEqual(perf.apm_no_auto, player['apm_no_auto'])
+
+    def test_parse_cache_replays_classification_only(self):
+        """Cached raw rows give the same result and skip table extraction."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_dir = write_session(Path(temp_dir) / 'logs', '202507052000', make_players(seed=5))
+            cache = parse_logs_enhanced.ParseCache(str(Path(temp_dir) / 'cache'), parse_logs_enhanced.PARSER_VERSION)
+
+            uncached = parse_logs_enhanced.parse_log_directory(log_dir)
+            self.assertEqual(parse_logs_enhanced.parse_log_directory(log_dir, cache), uncached)
+            with mock.patch.object(parse_logs_enhanced, 'extract_raw_performances',
+                                   side_effect=AssertionError('tables re-parsed')):
+                self.assertEqual(parse_logs_enhanced.parse_log_directory(log_dir, cache), uncached)
+
+            # A different parser version ignores the entry
+            stale = parse_logs_enhanced.ParseCache(cache.cache_dir, parse_logs_enhanced.PARSER_VERSION + 1)
+            self.assertIsNone(stale.load(log_dir.name, parse_logs_enhanced.session_content_fingerprint(log_dir)))
+
+    def test_offensive_table_without_total_section(self):
+        self.assertEqual(parse_logs_enhanced.parse_offensive_table('|no|sections|here|'), {})
+
+
+class IncrementalIngestTests(unittest.TestCase):
+    """Tests for the --incremental ingest mode."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.logs_dir = self.temp_dir / 'extracted_logs'
+        self.logs_dir.mkdir()
+        self.db_path = str(self.temp_dir / 'test.db')
+        self.timestamps = write_sessions(self.logs_dir, 3)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def full_ingest(self, db_path: str, *extra_args):
+        argv = sys.argv[:]
+        sys.argv = ['parse_logs_enhanced.py', str(self.logs_dir), '-d', db_path, *extra_args]
+        try:
+            parse_logs_enhanced.main()
+        finally:
+            sys.argv = argv
+
+    def test_incremental_matches_full_ingest(self):
+        """A fresh incremental ingest produces the same rows as a full one."""
+        full_db = str(self.temp_dir / 'full.db')
+        self.full_ingest(full_db)
+        ingested = parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+
+        self.assertEqual(ingested, self.timestamps)
+        self.assertEqual(performance_rows(self.db_path), performance_rows(full_db))
+        self.assertEqual(high_score_rows(self.db_path), high_score_rows(full_db))
+
+    def test_direct_ingest_matches_extracted_ingest(self):
+        """Sessions parsed straight from the tiddler store match the same sessions read from disk."""
+        full_db = str(self.temp_dir / 'full.db')
+        self.full_ingest(full_db)
+
+        html_path = self.temp_dir / 'wiki.html'
+        html_path.write_text(tiddlywiki_html(self.timestamps), encoding='utf-8')
+        archive_dir = self.temp_dir / 'archive'
+        ingested = extract_logs.ingest_log_summaries(
+            extract_logs.extract_tiddler_data(html_path), self.db_path, archive_dir=archive_dir)
+
+        self.assertEqual(ingested, self.timestamps)
+        self.assertEqual(performance_rows(self.db_path), performance_rows(full_db))
+        self.assertEqual(high_score_rows(self.db_path), high_score_rows(full_db))
+
+        # Archived files fingerprint the same as the in-memory sessions, so nothing is re-parsed
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(archive_dir, self.db_path), [])
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path), [])
+
+    def test_worker_pool_matches_sequential(self):
+        """Parsing in a process pool writes exactly what the sequential path writes."""
+        pooled_db = str(self.temp_dir / 'pooled.db')
+        self.full_ingest(self.db_path)
+        self.full_ingest(pooled_db, '--workers', '2')
+
+        self.assertEqual(performance_rows(pooled_db), performance_rows(self.db_path))
+        self.assertEqual(high_score_rows(pooled_db), high_score_rows(self.db_path))
+
+    def test_small_write_batches_match_default(self):
+        """Batch size changes transaction boundaries, never the stored rows."""
+        batched_db = str(self.temp_dir / 'batched.db')
+        self.full_ingest(self.db_path)
+        self.full_ingest(batched_db, '--batch-size', '7')
+        self.assertEqual(performance_rows(batched_db), performance_rows(self.db_path))
+        self.assertEqual(high_score_rows(batched_db), high_score_rows(self.db_path))
+
+        # Re-ingesting in small batches replaces whole sessions
+        parse_logs_enhanced.ingest_incremental(self.logs_dir, batched_db, batch_size=3)
+        conn = sqlite3.connect(batched_db)
+        conn.execute('DELETE FROM ingested_sessions')
+        conn.commit()
+        conn.close()
+        parse_logs_enhanced.ingest_incremental(self.logs_dir, batched_db, batch_size=3)
+        self.assertEqual(performance_rows(batched_db), performance_rows(self.db_path))
+
+    def test_only_new_sessions_are_parsed(self):
+        """Re-running skips ingested sessions and adding one parses only that one."""
+        parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+        before = performance_rows(self.db_path)
+
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path), [])
+        self.assertEqual(performance_rows(self.db_path), before)
+
+        new_timestamps = write_sessions(self.logs_dir, 1, first_day=10)
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path), new_timestamps)
+        after = performance_rows(self.db_path)
+        self.assertEqual([row for row in after if row[0] != new_timestamps[0]], before)
+        self.assertTrue(any(row[0] == new_timestamps[0] for row in after))
+
+    def test_full_ingest_records_manifest(self):
+        """Sessions from a full rebuild are not parsed again incrementally."""
+        self.full_ingest(self.db_path)
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path), [])
+
+    def test_touched_files_with_same_content_are_skipped(self):
+        """Re-extracting identical content only refreshes the stat signature."""
+        parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+        log_dir = self.logs_dir / self.timestamps[0]
+        for path in log_dir.glob('*.json'):
+            os.utime(path, ns=(1, 1))
+
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path), [])
+        manifest = parse_logs_enhanced.load_ingest_manifest(self.db_path)
+        self.assertEqual(manifest[self.timestamps[0]][0],
+                         parse_logs_enhanced.session_file_signature(log_dir))
+
+    def test_changed_session_replaces_its_rows(self):
+        """A session whose content changed is re-parsed and its old rows removed."""
+        parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+        changed = self.timestamps[1]
+        shutil.rmtree(self.logs_dir / changed)
+        write_session(self.logs_dir, changed, make_players(seed=99, count=8))
+
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path), [changed])
+        rows = [row for row in performance_rows(self.db_path) if row[0] == changed]
+        self.assertEqual(len(rows), 8)
+        self.assertTrue(all(row[2].startswith('Player 99-') for row in rows))
+
+
+class PackedSessionTests(unittest.TestCase):
+    """Sessions packed into a .tar.gz read exactly like their loose files."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.logs_dir = self.temp_dir / 'extracted_logs'
+        self.logs_dir.mkdir()
+        self.db_path = str(self.temp_dir / 'test.db')
+        self.timestamps = write_sessions(self.logs_dir, 3)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_pack_round_trip_keeps_bytes_and_fingerprint(self):
+        log_dir = self.logs_dir / self.timestamps[0]
+        loose = {path.name: path.read_bytes() for path in log_dir.glob('*.json')}
+        fingerprint = DirectorySession(log_dir).fingerprint()
+        expected = parse_logs_enhanced.parse_log_directory(log_dir)
+
+        files, _, archive_bytes = session_archive.pack_session_dir(log_dir)
+        self.assertEqual(files, len(loose))
+        self.assertEqual(list(log_dir.glob('*.json')), [])
+        self.assertLess(archive_bytes, sum(len(data) for data in loose.values()))
+
+        session = as_session_source(log_dir)
+        self.assertIsInstance(session, ArchivedSession)
+        self.assertEqual(session_archive.read_archive(session_archive.session_archive_path(log_dir)), loose)
+        self.assertEqual(session.fingerprint(), fingerprint)
+        self.assertEqual(parse_logs_enhanced.parse_log_directory(log_dir), expected)
+
+        self.assertEqual(session_archive.unpack_session_dir(log_dir), len(loose))
+        self.assertEqual({path.name: path.read_bytes() for path in log_dir.glob('*.json')}, loose)
+        self.assertFalse(session_archive.is_archived(log_dir))
+
+    def test_packing_ingested_sessions_does_not_reparse(self):
+        parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+        before = performance_rows(self.db_path)
+        for log_dir in parse_logs_enhanced.iter_session_dirs(self.logs_dir):
+            session_archive.pack_session_dir(log_dir)
+
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path), [])
+        self.assertEqual(performance_rows(self.db_path), before)
+
+        # A packed-only tree ingests from scratch to the same rows
+        packed_db = str(self.temp_dir / 'packed.db')
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.logs_dir, packed_db), self.timestamps)
+        self.assertEqual(performance_rows(packed_db), before)
+        self.assertEqual(high_score_rows(packed_db), high_score_rows(self.db_path))
+
+    def test_high_scores_parser_reads_packed_sessions(self):
+        parser = HighScoresParser()
+        expected = parser.parse_directory(self.logs_dir)
+        self.assertTrue(expected)
+        session_archive.pack_session_dir(self.logs_dir / self.timestamps[1])
+
+        self.assertEqual(parser.parse_directory(self.logs_dir), expected)
+        high_scores_file = self.logs_dir / self.timestamps[1] / f'{self.timestamps[1]}-High-Scores.json'
+        self.assertFalse(high_scores_file.exists())
+        self.assertTrue(parser.parse_high_scores_file(high_scores_file))
+
+    def test_high_scores_parser_workers_and_stored_sessions(self):
+        parser = HighScoresParser()
+        expected = parser.parse_directory(self.logs_dir)
+        self.assertEqual(parser.parse_directory(self.logs_dir, workers=2), expected)
+
+        # Only sessions without high_scores rows are parsed again
+        parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('DELETE FROM high_scores WHERE timestamp = ?', (self.timestamps[0],))
+        conn.commit()
+        conn.close()
+        remaining = parser.parse_directory(self.logs_dir, db_path=self.db_path)
+        self.assertEqual(remaining, [entry for entry in expected if entry.timestamp == self.timestamps[0]])
+
+
+class DuplicateSessionTests(unittest.TestCase):
+    """Re-uploads of a raid night under another timestamp are recorded, not stored."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.logs_dir = self.temp_dir / 'extracted_logs'
+        self.logs_dir.mkdir()
+        self.db_path = str(self.temp_dir / 'test.db')
+        self.timestamps = write_sessions(self.logs_dir, 3)
+        # The first night again, uploaded ten minutes later
+        self.reupload = '202507012010'
+        write_session(self.logs_dir, self.reupload, make_players(seed=1))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def duplicates(self, db_path: str):
+        keys = parse_logs_enhanced.load_damage_keys(db_path)
+        return {timestamp: duplicate_of for timestamp, (_, duplicate_of) in keys.items() if duplicate_of}
+
+    def test_damage_key_ignores_timestamp_and_row_order(self):
+        players = make_players(seed=3)
+        first = write_session(self.temp_dir / 'a', '202507032000', players)
+        second = write_session(self.temp_dir / 'b', '202507032359', list(reversed(players)))
+        other = write_session(self.temp_dir / 'c', '202507032000', make_players(seed=4))
+        key = parse_logs_enhanced.session_damage_key(first)
+        self.assertTrue(key)
+        self.assertEqual(parse_logs_enhanced.session_damage_key(second), key)
+        self.assertNotEqual(parse_logs_enhanced.session_damage_key(other), key)
+
+    def test_reupload_is_skipped_by_incremental_ingest(self):
+        with mock.patch.object(parse_logs_enhanced, 'parse_session',
+                               wraps=parse_logs_enhanced.parse_session) as parse:
+            ingested = parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+
+        self.assertEqual(ingested, self.timestamps)
+        self.assertNotIn(self.reupload, [call.args[0].timestamp for call in parse.call_args_list])
+        self.assertEqual(self.duplicates(self.db_path), {self.reupload: self.timestamps[0]})
+        self.assertFalse([row for row in performance_rows(self.db_path) if row[0] == self.reupload])
+        # Recorded in the manifest, so later runs do not look at it again
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path), [])
+
+    def test_full_rebuild_matches_incremental(self):
+        parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+        full_db = str(self.temp_dir / 'full.db')
+        argv = sys.argv[:]
+        sys.argv = ['parse_logs_enhanced.py', str(self.logs_dir), '-d', full_db]
+        try:
+            parse_logs_enhanced.main()
+        finally:
+            sys.argv = argv
+
+        self.assertEqual(self.duplicates(full_db), {self.reupload: self.timestamps[0]})
+        self.assertEqual(performance_rows(full_db), performance_rows(self.db_path))
+        self.assertEqual(high_score_rows(full_db), high_score_rows(self.db_path))
+
+    def test_sessions_ingested_before_keys_are_backfilled(self):
+        # An older database: both copies stored and no damage keys recorded
+        with mock.patch.object(parse_logs_enhanced, 'session_damage_key', return_value=''):
+            parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('UPDATE ingested_sessions SET damage_key = NULL')
+        conn.commit()
+        conn.close()
+        self.assertTrue([row for row in performance_rows(self.db_path) if row[0] == self.reupload])
+
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path), [])
+        self.assertEqual(self.duplicates(self.db_path), {self.reupload: self.timestamps[0]})
+        self.assertFalse([row for row in performance_rows(self.db_path) if row[0] == self.reupload])
+        keys = parse_logs_enhanced.load_damage_keys(self.db_path)
+        self.assertTrue(all(keys[timestamp][0] for timestamp in self.timestamps))
+
+
+class ReclassifyTests(unittest.TestCase):
+    """Re-applying the classification rules in SQL matches re-ingesting under them."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.logs_dir = self.temp_dir / 'extracted_logs'
+        self.logs_dir.mkdir()
+        self.db_path = str(self.temp_dir / 'test.db')
+        self.timestamps = write_sessions(self.logs_dir, 3)
+        parse_logs_enhanced.ingest_incremental(self.logs_dir, self.db_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def stored_rows(self, db_path: str):
+        return (performance_rows(db_path),
+                table_rows(db_path, 'player_performance_outliers', 'timestamp, account_name, profession'),
+                table_rows(db_path, 'session_metric_scores', 'timestamp, metric_category, rank'))
+
+    def test_outliers_are_stored_apart(self):
+        performances, outliers, _ = self.stored_rows(self.db_path)
+        # The short-fight player of every session
+        self.assertEqual(len(outliers), len(self.timestamps))
+        self.assertFalse({row[3] for row in outliers} & {row[3] for row in performances if row[0] == outliers[0][0]})
+
+    def test_unchanged_rules_change_nothing(self):
+        before = self.stored_rows(self.db_path)
+        changes = parse_logs_enhanced.reclassify_performances(self.db_path)
+        self.assertEqual(changes, {'excluded': 0, 'restored': 0, 'reclassified': 0})
+        self.assertEqual(self.stored_rows(self.db_path), before)
+
+    def test_matches_fresh_ingest_under_new_rules(self):
+        rules = [('Firebrand', 'Condi Firebrand', 'target_condition_dps', 0.5, 1),
+                 ('Scourge', 'Condi Scourge', 'might_gen_per_sec', None, 5.0)]
+        with mock.patch.object(parse_logs_enhanced, 'BUILD_VARIANT_RULES', rules), \
+                mock.patch.object(parse_logs_enhanced, 'OUTLIER_HARD_MINIMUM', 2000.0), \
+                mock.patch.object(parse_logs_enhanced, 'OUTLIER_MEDIAN_SHARE', 0.9), \
+                mock.patch.object(parse_logs_enhanced, 'OUTLIER_MAX_FRACTION', 0.4):
+            changes = parse_logs_enhanced.reclassify_performances(self.db_path)
+            fresh_db = str(self.temp_dir / 'fresh.db')
+            parse_logs_enhanced.ingest_incremental(self.logs_dir, fresh_db)
+
+        self.assertGreater(changes['excluded'], 0)
+        self.assertGreater(changes['reclassified'], 0)
+        self.assertEqual(self.stored_rows(self.db_path), self.stored_rows(fresh_db))
+
+        # And back again under the shipped rules
+        changes = parse_logs_enhanced.reclassify_performances(self.db_path)
+        self.assertGreater(changes['restored'], 0)
+        original_db = str(self.temp_dir / 'original.db')
+        parse_logs_enhanced.ingest_incremental(self.logs_dir, original_db)
+        self.assertEqual(self.stored_rows(self.db_path), self.stored_rows(original_db))
+
+    def test_older_database_gets_base_profession(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE player_performances SET profession = 'Condi Firebrand' WHERE profession = 'Firebrand'")
+        conn.execute('ALTER TABLE player_performances DROP COLUMN base_profession')
+        conn.commit()
+        conn.close()
+
+        parse_logs_enhanced.ensure_database_schema(self.db_path)
+        conn = sqlite3.connect(self.db_path)
+        bases = dict(conn.execute('SELECT DISTINCT profession, base_profession FROM player_performances'))
+        conn.close()
+        self.assertEqual(bases['Condi Firebrand'], 'Firebrand')
+        self.assertEqual(bases['Scourge'], 'Scourge')
+
+
+class EliteInsightsSessionTests(unittest.TestCase):
+    """Elite Insights exports give the same rows as the TopStats markup of the same fights."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.timestamp = '202507052000'
+        self.players = make_players(seed=5)
+        self.markup_dir = write_session(self.temp_dir / 'markup', self.timestamp, self.players)
+        self.ei_dir = write_ei_session(self.temp_dir / 'ei', self.timestamp, self.players)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_export_directory_is_detected(self):
+        self.assertIsInstance(as_session_source(self.ei_dir), EliteInsightsSession)
+        self.assertEqual(len(as_session_source(self.ei_dir).files()), 3)
+
+    def test_rows_and_high_scores_match_markup(self):
+        for players in (self.players, make_players(seed=99, count=8)):
+            markup_dir = write_session(self.temp_dir / 'm2', self.timestamp, players)
+            ei_dir = write_ei_session(self.temp_dir / 'e2', self.timestamp, players)
+            markup = [parse_logs_enhanced._raw_row(p) for p in parse_logs_enhanced.extract_raw_performances(markup_dir)]
+            structured = [parse_logs_enhanced._raw_row(p) for p in parse_logs_enhanced.extract_raw_performances(ei_dir)]
+
+            # Burst consistency is a TopStats-only figure, not measured for exports
+            self.assertEqual({row.pop('burst_consistency_1s') for row in structured}, {None})
+            self.assertTrue(all(row.pop('burst_consistency_1s') > 0 for row in markup))
+            self.assertEqual(structured, markup)
+
+            markup_performances, markup_scores = parse_logs_enhanced.parse_session(markup_dir, HighScoresParser())
+            performances, scores = parse_logs_enhanced.parse_session(ei_dir, HighScoresParser())
+            self.assertEqual([p.account_name for p in performances], [p.account_name for p in markup_performances])
+            self.assertEqual(sorted(scores, key=repr), sorted(markup_scores, key=repr))
+            self.assertTrue(scores)
+
+    def test_ingest_stores_the_same_rows(self):
+        markup_db = str(self.temp_dir / 'markup.db')
+        ei_db = str(self.temp_dir / 'ei.db')
+        parse_logs_enhanced.ingest_incremental(self.markup_dir.parent, markup_db)
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.ei_dir.parent, ei_db), [self.timestamp])
+
+        conn = sqlite3.connect(ei_db)
+        burst_consistency = {row[0] for row in conn.execute('SELECT burst_consistency_1s FROM player_performances')}
+        conn.close()
+        self.assertEqual(burst_consistency, {None})
+        self.assertEqual(performance_rows(ei_db, exclude=('burst_consistency_1s',)),
+                         performance_rows(markup_db, exclude=('burst_consistency_1s',)))
+        self.assertEqual(high_score_rows(ei_db), high_score_rows(markup_db))
+        # Re-running finds nothing new
+        self.assertEqual(parse_logs_enhanced.ingest_incremental(self.ei_dir.parent, ei_db), [])
+
+    def test_export_of_an_uploaded_night_is_a_duplicate(self):
+        self.assertEqual(parse_logs_enhanced.session_damage_key(self.ei_dir),
+                         parse_logs_enhanced.session_damage_key(self.markup_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Tests for the download stage of sync_logs and its HTTP cache, against a
+local HTTP server standing in for the log aggregate site.
+"""
+
+import hashlib
+import io
+import json
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+# Add project root and src to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'src'))
+
+from gw2_leaderboard.utils import sync_logs, sync_pipeline, watch
+from tests.session_fixtures import make_players, tiddlywiki_html, write_session, write_sessions
+
+SESSION_COUNT = 5
+# Served with a 503 on its first request so the retry path is exercised
+FLAKY_FILE = '202507032000.zip'
+
+
+def session_zips(logs_dir: Path):
+    """Zip each fixture session directory, returning {file name: zip bytes}."""
+    zips = {}
+    for timestamp in write_sessions(logs_dir, SESSION_COUNT):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            for path in sorted((logs_dir / timestamp).iterdir()):
+                archive.write(path, path.name)
+        zips[f'{timestamp}.zip'] = buffer.getvalue()
+    return zips
+
+
+class LogSite:
+    """
+    Serves an index page linking to fixture ZIPs, tracking concurrent requests.
+
+    Pages in ``pages`` carry an ETag and are answered with a 304 when the
+    client already has the current version.
+    """
+
+    def __init__(self, zips):
+        self.zips = zips
+        links = ''.join(f'<a href="{n}">{n}</a>\n' for n in sorted(zips))
+        self.pages = {'': f'<html><body>{links}</body></html>'.encode('utf-8')}
+        self.lock = threading.Lock()
+        self.requests = []
+        self.not_modified = []
+        self.active = 0
+        self.max_active = 0
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def handle(self, request):
+        name = request.path.lstrip('/')
+        with self.lock:
+            self.requests.append(name)
+            first_try = self.requests.count(name) == 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if name in self.pages:
+                body = self.pages[name]
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if request.headers.get('If-None-Match') == etag:
+                    with self.lock:
+                        self.not_modified.append(name)
+                    self.send(request, 304, b'')
+                else:
+                    self.send(request, 200, body, etag)
+            elif name == FLAKY_FILE and first_try:
+                self.send(request, 503, b'busy')
+            elif name in self.zips:
+                # Hold the connection briefly so parallel downloads overlap
+                time.sleep(0.1)
+                self.send(request, 200, self.zips[name])
+            else:
+                self.send(request, 404, b'not found')
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    @staticmethod
+    def send(request, status, body, etag=None):
+        request.send_response(status)
+        if etag:
+            request.send_header('ETag', etag)
+        if status != 304:
+            request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ConcurrentDownloadTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.zips = session_zips(self.root / 'fixtures')
+        self.site = LogSite(self.zips)
+        # Each test gets its own pooled session
+        sync_logs._http_session = None
+
+    def tearDown(self):
+        self.site.close()
+        sync_logs._http_session = None
+        sync_logs.configure_http_cache(None)
+        self.temp_dir.cleanup()
+
+    def assert_extracted(self, extracted_dir: Path):
+        for name in self.zips:
+            timestamp = name[:12]
+            self.assertTrue((extracted_dir / timestamp / f'{timestamp}-Damage.json').exists())
+            self.assertTrue((extracted_dir / timestamp / 'summary.json').exists())
+
+    def test_download_logs_is_bounded_and_retries(self):
+        with redirect_stdout(io.StringIO()):
+            logs = sync_logs.fetch_available_logs(self.site.url)
+            downloaded = sync_logs.download_logs(logs, str(self.root / 'extracted_logs'), max_workers=2)
+
+        self.assertEqual(downloaded, logs)
+        self.assert_extracted(self.root / 'extracted_logs')
+        self.assertEqual(self.site.requests.count(FLAKY_FILE), 2)
+        self.assertLessEqual(self.site.max_active, 2)
+        self.assertEqual(self.site.max_active, 2)
+
+    def test_pool_grows_for_more_workers(self):
+        session = sync_logs.get_http_session()
+        self.assertIs(sync_logs.get_http_session(pool_size=16), session)
+        self.assertEqual(session.get_adapter(self.site.url)._pool_maxsize, 16)
+        sync_logs.get_http_session(pool_size=4)
+        self.assertEqual(session.get_adapter(self.site.url)._pool_maxsize, 16)
+        self.assertEqual(session.get_adapter(self.site.url).max_retries.total, sync_logs.HTTP_RETRIES)
+
+    def test_failed_download_is_reported_and_skipped(self):
+        with redirect_stdout(io.StringIO()) as output:
+            logs = sync_logs.fetch_available_logs(self.site.url)
+            missing = dict(logs[0], timestamp='202507312000', url=self.site.url + 'missing.zip', filename='missing.zip')
+            downloaded = sync_logs.download_logs(logs + [missing], str(self.root / 'extracted_logs'), max_workers=3)
+
+        self.assertEqual(downloaded, logs)
+        self.assertIn('❌ Failed to process missing.zip', output.getvalue())
+
+    def test_main_downloads_new_logs(self):
+        extracted_dir = self.root / 'extracted_logs'
+        config_path = self.root / 'sync_config.json'
+        config = dict(sync_logs.DEFAULT_CONFIG, log_aggregate_url=self.site.url,
+                      extracted_logs_dir=str(extracted_dir), max_logs_per_run=10,
+                      database_path=str(self.root / 'gw2.db'),
+                      http_cache_dir=str(self.root / 'http_cache'))
+        config_path.write_text(json.dumps(config), encoding='utf-8')
+
+        argv = ['sync_logs.py', '--config', str(config_path), '--download-only',
+                '--auto-confirm', '--download-workers', '3']
+        with mock.patch.object(sys, 'argv', argv), \
+                mock.patch.object(sync_logs, 'CONFIG_FILE', sync_logs.CONFIG_FILE), \
+                redirect_stdout(io.StringIO()):
+            self.assertEqual(sync_logs.main(), 0)
+
+        self.assert_extracted(extracted_dir)
+        self.assertLessEqual(self.site.max_active, 3)
+
+    def test_download_only_does_not_ingest_directly(self):
+        timestamps = sorted(name[:12] for name in self.zips)
+        self.site.pages['wiki.html'] = tiddlywiki_html(timestamps).encode('utf-8')
+        extracted_dir = self.root / 'extracted_logs'
+        db_path = self.root / 'gw2.db'
+        config_path = self.root / 'sync_config.json'
+        config = dict(sync_logs.DEFAULT_CONFIG, log_aggregate_url=self.site.url + 'wiki.html',
+                      extracted_logs_dir=str(extracted_dir), max_logs_per_run=10,
+                      database_path=str(db_path), http_cache_dir=str(self.root / 'http_cache'))
+        config_path.write_text(json.dumps(config), encoding='utf-8')
+
+        argv = ['sync_logs.py', '--config', str(config_path), '--download-only', '--direct',
+                '--no-archive', '--auto-confirm']
+        try:
+            with mock.patch.object(sys, 'argv', argv), redirect_stdout(io.StringIO()):
+                self.assertEqual(sync_logs.main(), 0)
+        finally:
+            sync_logs._tiddlywiki_cache.update(url=None, sessions=None)
+
+        self.assertFalse(db_path.exists())
+        self.assert_extracted(extracted_dir)
+
+
+class HttpCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.site = LogSite(session_zips(self.root / 'fixtures'))
+        self.timestamps = sorted(name[:12] for name in self.site.zips)
+        self.site.pages['wiki.html'] = tiddlywiki_html(self.timestamps).encode('utf-8')
+        self.wiki_url = self.site.url + 'wiki.html'
+        sync_logs._http_session = None
+        sync_logs.configure_http_cache(str(self.root / 'http_cache'))
+
+    def tearDown(self):
+        self.site.close()
+        sync_logs._http_session = None
+        sync_logs.configure_http_cache(None)
+        sync_logs._tiddlywiki_cache.update(url=None, sessions=None)
+        self.temp_dir.cleanup()
+
+    def wiki_logs(self):
+        with redirect_stdout(io.StringIO()):
+            return sync_logs.fetch_available_logs(self.wiki_url)
+
+    def wiki_sessions(self):
+        # Start from an empty in-process cache, as a new sync run would
+        sync_logs._tiddlywiki_cache.update(url=None, sessions=None)
+        with redirect_stdout(io.StringIO()):
+            return sync_logs.get_tiddlywiki_sessions(self.wiki_url)
+
+    def test_unchanged_log_list_is_revalidated_not_downloaded(self):
+        with redirect_stdout(io.StringIO()):
+            first = sync_logs.fetch_available_logs(self.site.url)
+            second = sync_logs.fetch_available_logs(self.site.url)
+
+        self.assertEqual(len(first), len(self.site.zips))
+        self.assertEqual(second, first)
+        self.assertEqual(self.site.not_modified, [''])
+
+    def test_tiddler_index_is_reused_until_the_wiki_changes(self):
+        logs = self.wiki_logs()
+        self.assertTrue(set(self.timestamps) <= {log['timestamp'] for log in logs})
+        self.assertEqual(self.wiki_logs(), logs)
+        self.assertEqual(self.site.not_modified, ['wiki.html'])
+
+        self.site.pages['wiki.html'] = tiddlywiki_html(self.timestamps[:2]).encode('utf-8')
+        changed = {log['timestamp'] for log in self.wiki_logs()}
+        self.assertIn(self.timestamps[1], changed)
+        self.assertNotIn(self.timestamps[2], changed)
+        self.assertEqual(self.site.not_modified, ['wiki.html'])
+
+    def test_tiddler_contents_are_not_cached(self):
+        self.wiki_logs()
+        cached = sorted((self.root / 'http_cache').iterdir())
+        sessions = self.wiki_sessions()
+        self.assertTrue(set(self.timestamps) <= set(sessions))
+        self.assertEqual(sorted((self.root / 'http_cache').iterdir()), cached)
+
+    def test_damaged_cache_entry_falls_back_to_full_download(self):
+        logs = self.wiki_logs()
+        for payload in (self.root / 'http_cache').glob('*.json'):
+            if not payload.name.endswith('.meta.json'):
+                payload.write_text('{broken', encoding='utf-8')
+
+        self.assertEqual(self.wiki_logs(), logs)
+        self.assertEqual(self.site.requests.count('wiki.html'), 3)
+
+    def test_disabled_cache_always_downloads(self):
+        sync_logs.configure_http_cache(None)
+        self.wiki_logs()
+        self.wiki_logs()
+        self.assertEqual(self.site.not_modified, [])
+        self.assertFalse((self.root / 'http_cache').exists())
+
+
+class ProcessNewLogsTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.logs_dir = self.root / 'extracted_logs'
+        self.db_path = str(self.root / 'gw2.db')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def process(self, new_timestamps):
+        with redirect_stdout(io.StringIO()) as output:
+            self.assertTrue(sync_logs.process_new_logs(str(self.logs_dir), self.db_path, new_timestamps))
+        return output.getvalue()
+
+    def ratings(self, db_path):
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute('SELECT account_name, profession, metric_category, rating, rd, games_played '
+                            'FROM glicko_ratings ORDER BY 1, 2, 3').fetchall()
+        conn.close()
+        return rows
+
+    def rated_timestamps(self):
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute('SELECT DISTINCT timestamp FROM player_rating_history ORDER BY timestamp').fetchall()
+        conn.close()
+        return [row[0] for row in rows]
+
+    def test_only_new_sessions_are_parsed_and_rated(self):
+        timestamps = write_sessions(self.logs_dir, 3, first_day=10)
+        self.assertIn('rebuild', self.process(timestamps))
+        self.assertEqual(self.rated_timestamps(), timestamps)
+
+        # A later session is added on top of the existing history
+        newer = write_sessions(self.logs_dir, 1, first_day=20)
+        with mock.patch.object(sync_logs, 'ingest_sessions', wraps=sync_logs.ingest_sessions) as ingest:
+            self.assertIn('incremental', self.process(newer))
+        self.assertEqual([s.timestamp for s in ingest.call_args[0][0]], newer)
+        self.assertEqual(self.rated_timestamps(), timestamps + newer)
+
+        rebuilt_db = str(self.root / 'rebuilt.db')
+        shutil.copy(self.db_path, rebuilt_db)
+        with redirect_stdout(io.StringIO()):
+            sync_logs.update_ratings_for_sessions(rebuilt_db, timestamps)
+        self.assertEqual(self.ratings(self.db_path), self.ratings(rebuilt_db))
+
+        # A backfilled older session reorders history, so ratings are rebuilt
+        older = '202507012000'
+        write_session(self.logs_dir, older, make_players(seed=50))
+        self.assertIn('rebuild', self.process([older]))
+        self.assertEqual(self.rated_timestamps(), [older] + timestamps + newer)
+
+
+class StreamingSyncTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.site = LogSite(session_zips(self.root / 'fixtures'))
+        self.logs_dir = self.root / 'extracted_logs'
+        self.db_path = str(self.root / 'gw2.db')
+        sync_logs._http_session = None
+
+    def tearDown(self):
+        self.site.close()
+        sync_logs._http_session = None
+        self.temp_dir.cleanup()
+
+    def rating_rows(self, db_path):
+        conn = sqlite3.connect(db_path)
+        ratings = conn.execute('SELECT account_name, profession, metric_category, rating, rd, games_played '
+                               'FROM glicko_ratings ORDER BY 1, 2, 3').fetchall()
+        history = conn.execute('SELECT DISTINCT timestamp FROM player_rating_history ORDER BY 1').fetchall()
+        conn.close()
+        return ratings, [row[0] for row in history]
+
+    def stream(self):
+        with redirect_stdout(io.StringIO()):
+            logs = sync_logs.fetch_available_logs(self.site.url)
+            stored = sync_pipeline.run_streaming_sync(logs, str(self.logs_dir), self.db_path,
+                                                      sync_logs.download_and_extract_log, download_workers=3)
+        return logs, stored
+
+    def test_streamed_sessions_are_rated_in_timestamp_order(self):
+        earlier = ['202506012000', '202506022000']
+        for i, timestamp in enumerate(earlier):
+            write_session(self.logs_dir, timestamp, make_players(seed=40 + i))
+        with redirect_stdout(io.StringIO()):
+            sync_logs.process_new_logs(str(self.logs_dir), self.db_path, earlier)
+        phased_db = str(self.root / 'phased.db')
+        shutil.copy(self.db_path, phased_db)
+
+        with mock.patch.object(sync_pipeline, 'calculate_glicko_ratings_for_session',
+                               wraps=sync_pipeline.calculate_glicko_ratings_for_session) as rate:
+            logs, stored = self.stream()
+        new = sorted(log['timestamp'] for log in logs)
+        self.assertEqual(sorted(stored), new)
+        self.assertEqual([c.args[1] for c in rate.call_args_list], new)
+
+        # Same ratings as downloading everything first and then processing it
+        with redirect_stdout(io.StringIO()):
+            sync_logs.process_new_logs(str(self.logs_dir), phased_db, new)
+        self.assertEqual(self.rating_rows(self.db_path), self.rating_rows(phased_db))
+        self.assertEqual(self.rating_rows(self.db_path)[1], earlier + new)
+
+    def test_without_rating_history_ratings_are_rebuilt(self):
+        logs, stored = self.stream()
+        self.assertEqual(len(stored), len(logs))
+        self.assertEqual(self.rating_rows(self.db_path)[1], sorted(stored))
+
+
+class WatchTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.site = LogSite(session_zips(self.root / 'fixtures'))
+        self.logs_dir = self.root / 'extracted_logs'
+        self.db_path = str(self.root / 'gw2.db')
+        self.config = dict(sync_logs.DEFAULT_CONFIG, log_aggregate_url=self.site.url,
+                           extracted_logs_dir=str(self.logs_dir), database_path=self.db_path,
+                           web_ui_output=str(self.root / 'web_ui'), http_cache_dir=str(self.root / 'http_cache'))
+        sync_logs._http_session = None
+        # The published web UI is not under test here
+        patcher = mock.patch.object(watch, 'build_web_ui')
+        self.build_web_ui = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.site.close()
+        sync_logs._http_session = None
+        sync_logs.configure_http_cache(None)
+        self.temp_dir.cleanup()
+
+    def rated_timestamps(self):
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute('SELECT DISTINCT timestamp FROM player_rating_history ORDER BY timestamp').fetchall()
+        conn.close()
+        return [row[0] for row in rows]
+
+    def poll(self, watcher):
+        with redirect_stdout(io.StringIO()):
+            return watcher.poll()
+
+    def test_new_remote_and_local_sessions_are_published(self):
+        watcher = watch.LeaderboardWatcher(self.config, remote_interval=0)
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(watcher.start(), [])
+        remote = sorted(name[:12] for name in self.site.zips)
+        self.assertEqual(self.poll(watcher), remote)
+        self.assertEqual(self.rated_timestamps(), remote)
+        self.build_web_ui.assert_called_once()
+
+        # Nothing new: the log list is revalidated and no session is parsed again
+        with mock.patch.object(watch, 'ingest_sessions') as ingest:
+            self.assertEqual(self.poll(watcher), [])
+        ingest.assert_not_called()
+        self.assertIn('', self.site.not_modified)
+
+        # A session dropped into extracted_logs by another tool is rated on top
+        local = write_sessions(self.logs_dir, 1, first_day=20)
+        self.assertEqual(self.poll(watcher), local)
+        self.assertEqual(self.rated_timestamps(), remote + local)
+        self.assertEqual(self.build_web_ui.call_count, 2)
+
+    def test_incomplete_and_failed_sessions_are_retried(self):
+        watcher = watch.LeaderboardWatcher(self.config, remote_interval=None)
+        with redirect_stdout(io.StringIO()):
+            watcher.start()
+
+        # Without summary.json a session is only taken once it stops changing
+        log_dir = write_session(self.logs_dir, '202507202000', make_players(seed=7))
+        (log_dir / 'summary.json').unlink()
+        self.assertEqual(self.poll(watcher), [])
+        with mock.patch.object(watch, 'ingest_sessions', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                self.poll(watcher)
+        self.assertEqual(self.poll(watcher), ['202507202000'])
+        self.assertEqual(self.poll(watcher), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,6 +16,7 @@ Common usage:
     python workflow.py --parse-only      # Only parse existing logs
     python workflow.py --ui-only         # Only generate web UI
     python workflow.py --refresh-guild   # Refresh guild member cache
+    python workflow.py --watch           # Keep running, publishing new logs as they arrive
 """
 
 import json
@@ -36,6 +37,7 @@ from gw2_leaderboard.parsers.parse_logs_enhanced import main as parse_logs_enhan
 from gw2_leaderboard.core.glicko_rating_system import main as glicko_rating_system_main
 from gw2_leaderboard.web.generate_web_ui import main as generate_web_ui_main
 from gw2_leaderboard.core.guild_manager import main as guild_manager_main
+from gw2_leaderboard.utils.watch import DEFAULT_POLL_INTERVAL, DEFAULT_REMOTE_INTERVAL, LeaderboardWatcher
 
 CONFIG_FILE = "sync_config.json"
 
@@ -43,6 +45,7 @@ DEFAULT_CONFIG = {
     "log_aggregate_url": "https://pyrogw2.github.io",
     "database_path": "gw2_comprehensive.db",
     "extracted_logs_dir": "extracted_logs",
+    "parse_cache_dir": "parse_cache",
     "web_ui_output": "web_ui_output",
     "auto_confirm": False,
     "max_logs_per_run": 5,
@@ -204,8 +207,8 @@ def download_and_extract_logs(config: Dict, latest_only: bool = False) -> bool:
     return success
 
 
-def parse_logs(config: Dict) -> bool:
-    """Parse logs using parse_logs_enhanced.py."""
+def parse_logs(config: Dict, incremental: bool = True) -> bool:
+    """Parse logs using parse_logs_enhanced.py (only new or changed sessions when incremental)."""
     print_step("2", "Parsing extracted logs")
     
     extracted_dir = config['extracted_logs_dir']
@@ -218,6 +221,10 @@ def parse_logs(config: Dict) -> bool:
     # Prepare arguments for parse_logs_enhanced_main
     sys_argv_backup = sys.argv[:]
     sys.argv = ['parse_logs_enhanced.py', extracted_dir, '-d', db_path]
+    if incremental:
+        sys.argv.append('--incremental')
+    if config.get('parse_cache_dir'):
+        sys.argv.extend(['--cache-dir', config['parse_cache_dir']])
     
     try:
         parse_logs_enhanced_main()
@@ -308,6 +315,13 @@ def main():
                         help='Only create/update configuration')
     parser.add_argument('--refresh-guild', action='store_true',
                         help='Refresh guild member cache')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and parse, rate and publish each new log as it arrives')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f'With --watch, seconds between scans of extracted_logs (default {DEFAULT_POLL_INTERVAL})')
+    parser.add_argument('--remote-interval', type=float, default=DEFAULT_REMOTE_INTERVAL,
+                        help=f'With --watch, seconds between checks of the log site; 0 disables '
+                             f'(default {DEFAULT_REMOTE_INTERVAL})')
     
     args = parser.parse_args()
     
@@ -382,6 +396,17 @@ def main():
         finally:
             sys.argv = sys_argv_backup
     
+    if args.watch:
+        print_step("👀", "Watching for new logs")
+        watcher = LeaderboardWatcher(config, poll_interval=args.poll_interval,
+                                     remote_interval=args.remote_interval or None)
+        try:
+            watcher.run()
+        except Exception as e:
+            print(f"\n❌ Watch failed: {e}")
+            return 1
+        return 0
+    
     # Determine what operations to run
     operations = []
     
@@ -425,7 +450,7 @@ def main():
                 print("⚠️  Download failed, but continuing with remaining operations...")
         
         if 'parse' in operations:
-            if parse_logs(config):
+            if parse_logs(config, incremental=not args.force_rebuild):
                 success_count += 1
             else:
                 print("❌ Parse failed. Stopping workflow.")
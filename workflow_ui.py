@@ -70,6 +70,7 @@ DEFAULT_CONFIG = {
     "log_aggregate_url": "https://pyrogw2.github.io",
     "database_path": "gw2_comprehensive.db",
     "extracted_logs_dir": "extracted_logs",
+    "parse_cache_dir": "parse_cache",
     "web_ui_output": "web_ui_output",
     "auto_confirm": False,
     "max_logs_per_run": 5,
@@ -406,6 +407,10 @@ class App(tk.Tk):
         print("\n--- Step 2: Parsing extracted logs ---\n")
         sys_argv_backup = sys.argv[:]
         sys.argv = ['parse_logs_enhanced.py', config['extracted_logs_dir'], '-d', config['database_path']]
+        if not self.force_rebuild_var.get():
+            sys.argv.append('--incremental')
+        if config.get('parse_cache_dir'):
+            sys.argv.extend(['--cache-dir', config['parse_cache_dir']])
         parse_logs_enhanced_main()
         sys.argv = sys_argv_backup
 